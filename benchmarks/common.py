@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""Timing, memory measurement and reporting helpers shared by the benchmarks."""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, Any, Optional
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def arg_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Number of items in each payload. Up to 1000000 is supported.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs. The best time is reported.')
+    parser.add_argument('--only', nargs='+', help='Run only the benchmarks whose names start with these prefixes.')
+    parser.add_argument('--json', action='store_true', help='Report results as JSON lines, for comparing runs.')
+    return parser
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    """ Returns the best time of repeated runs of fn in seconds and the peak memory allocated by a single run in bytes """
+    best = None
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        del result
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+class Reporter:
+    def __init__(self, as_json: bool, only: Optional[list[str]] = None):
+        self.as_json = as_json
+        self.only = only
+        if not as_json:
+            print(f"{'benchmark':<40} {'items':>9} {'total ms':>10} {'us/item':>9} {'peak MB':>9}")
+
+    def wanted(self, name: str) -> bool:
+        return self.only is None or any(name.startswith(x) for x in self.only)
+
+    def run(self, name: str, items: int, fn: Callable[[], Any], repeat: int) -> None:
+        if not self.wanted(name):
+            return
+        elapsed, peak = measure(fn, repeat)
+        if self.as_json:
+            print(json.dumps({"benchmark": name, "items": items, "seconds": elapsed, "peak_bytes": peak}))
+        else:
+            print(f"{name:<40} {items:>9} {elapsed * 1000:>10.1f} {elapsed * 1e6 / items:>9.2f} {peak / 1e6:>9.1f}")
@@ -0,0 +1,108 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+Memory benchmark for the model classes. Reports the number of bytes retained per object for:
+- dict: a dictionary with the model fields, like the decoded JSON
+- dataclass: a regular dataclass with the same fields (with a per-instance __dict__)
+- slots: the model class as shipped, which uses __slots__
+
+Field values are shared with the payload and are not counted, so the numbers show the overhead of each representation.
+Firmware objects also hold the Upgrade objects decoded from their "Upgrades" payload, which is counted for both dataclasses.
+
+Usage:
+    python3 benchmarks/memory.py --sizes 100000 1000000
+    python3 benchmarks/memory.py --only firmware upgrade --json
+"""
+
+import dataclasses
+import gc
+import json
+import tracemalloc
+
+import common
+import payloads
+from avnet.iotconnect.restapi.lib import decoder
+from avnet.iotconnect.restapi.lib.command import Command
+from avnet.iotconnect.restapi.lib.device import Device
+from avnet.iotconnect.restapi.lib.entity import Entity
+from avnet.iotconnect.restapi.lib.firmware import Firmware
+from avnet.iotconnect.restapi.lib.template import Template
+from avnet.iotconnect.restapi.lib.upgrade import Upgrade
+
+
+def _commands(count: int) -> list[dict]:
+    return [{
+        "guid": f"{i:032X}", "command": f"cmd{i}", "name": f"Command {i}", "requiredParam": True, "requiredAck": False,
+        "isOTACommand": False, "isTemplateCommandUsed": True, "updatedDate": None, "createdDate": None
+    } for i in range(count)]
+
+
+def _entities(count: int) -> list[dict]:
+    return [{"guid": f"{i:032X}", "name": f"Entity {i}", "parentEntityGuid": None} for i in range(count)]
+
+
+def _upgrades(count: int) -> list[dict]:
+    return payloads.upgrades(0, count)
+
+
+def _unslotted(dc: type) -> type:
+    """ Returns a regular dataclass with the same fields as dc, which converts nested objects the same way """
+    namespace = {'__post_init__': dc.__post_init__} if hasattr(dc, '__post_init__') else None
+    return dataclasses.make_dataclass(
+        dc.__name__,
+        [(f.name, f.type, dataclasses.field(default=f.default)) if f.default is not dataclasses.MISSING else (f.name, f.type) for f in dataclasses.fields(dc)],
+        namespace=namespace
+    )
+
+
+def retained(build, repeat: int) -> int:
+    """ Returns the smallest number of bytes allocated by build() that are still held by its result, over repeated runs """
+    return min(_retained(build) for _ in range(max(1, repeat)))
+
+
+def _retained(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main() -> None:
+    args = common.arg_parser(__doc__).parse_args()
+    models = [
+        (Device, payloads.devices),
+        (Template, payloads.templates),
+        (Firmware, payloads.firmwares),
+        (Upgrade, _upgrades),
+        (Command, _commands),
+        (Entity, _entities),
+    ]
+    if not args.json:
+        print(f"{'model':<10} {'items':>9} {'dict B':>8} {'dataclass B':>12} {'slots B':>8} {'saved':>6}")
+    for size in args.sizes:
+        for dc, generate in models:
+            if args.only is not None and not any(dc.__name__.lower().startswith(x.lower()) for x in args.only):
+                continue
+            items = generate(size)
+            names = [f.name for f in dataclasses.fields(dc)]
+            regular = _unslotted(dc)
+            as_dict = retained(lambda: [{k: x[k] for k in names if k in x} for x in items], args.repeat) / size
+            as_dataclass = retained(lambda: decoder.decode_list(regular, items), args.repeat) / size
+            as_slots = retained(lambda: decoder.decode_list(dc, items), args.repeat) / size
+            if args.json:
+                print(json.dumps({"benchmark": f"memory.{dc.__name__}", "items": size, "dict_bytes": as_dict, "dataclass_bytes": as_dataclass, "slots_bytes": as_slots}))
+                continue
+            print(f"{dc.__name__:<10} {size:>9} {as_dict:>8.0f} {as_dataclass:>12.0f} {as_slots:>8.0f} {1 - as_slots / as_dataclass:>6.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+Benchmarks for the response hot path: JSON decoding, JMESPath evaluation, key filtering and dataclass construction.
+Each layer is measured separately with synthetic payloads and reports the best time and the peak traced memory.
+
+Usage:
+    python3 benchmarks/parse.py
+    python3 benchmarks/parse.py --sizes 1000 1000000 --only response parser.get
+"""
+
+from collections import Counter
+
+import common
+import payloads
+from avnet.iotconnect.restapi.lib import util, apirequest, decoder, jsonstream, queryplan, device
+from avnet.iotconnect.restapi.lib.apirequest import Response, Parser
+from avnet.iotconnect.restapi.lib.device import Device, DeviceTable
+from avnet.iotconnect.restapi.lib.firmware import Firmware
+from avnet.iotconnect.restapi.lib.template import Template
+
+
+def run(size: int, repeat: int, reporter: common.Reporter) -> None:
+    device_items = payloads.devices(size)
+    template_items = payloads.templates(size)
+    firmware_items = payloads.firmwares(size)
+
+    device_response = payloads.http_response(payloads.envelope(device_items))
+    firmware_response = payloads.http_response(payloads.envelope(firmware_items))
+    # the payload is decoded on first access of data or body
+    reporter.run('response.decode.devices', size, lambda: Response(device_response).data, repeat)
+    reporter.run('response.decode.firmwares', size, lambda: Response(firmware_response).data, repeat)
+    # calls that discard the result, like deletes, only check the status
+    reporter.run('response.discard.devices', size, lambda: Response(device_response).ensure_success(), repeat)
+
+    # each installed JSON backend, on the same payloads
+    selected = apirequest.json_backend
+    for backend in apirequest.JSON_BACKENDS:
+        try:
+            apirequest.set_json_backend(backend)
+        except ImportError:
+            continue
+        loads, dumps = apirequest.json_loads, apirequest.json_dumps
+        reporter.run(f'json.{backend}.loads.devices', size, lambda: loads(device_response.content), repeat)
+        reporter.run(f'json.{backend}.loads.firmwares', size, lambda: loads(firmware_response.content), repeat)
+        reporter.run(f'json.{backend}.dumps.devices', size, lambda: dumps(device_items), repeat)
+    apirequest.set_json_backend(selected)
+
+    # all devices decoded at once, as query() does, against one at a time from an incrementally parsed payload
+    payload = memoryview(device_response.content)
+    chunks = lambda: (payload[i:i + jsonstream.CHUNK_SIZE] for i in range(0, len(payload), jsonstream.CHUNK_SIZE))
+    decode = decoder.get_decoder(Device)
+    reporter.run('query.devices', size, lambda: len(Response(device_response).data.get(dc=Device)), repeat)
+    reporter.run('stream.devices', size, lambda: sum(1 for _ in map(decode, jsonstream.iter_items(chunks()))), repeat)
+    # a lookup by uniqueId, filtered locally on the whole listing against the listing filtered by the server
+    expr, params = "[?uniqueId==param('duid')]", {'duid': device_items[-1]['uniqueId']}
+    reporter.run('query.local_filter.devices', size, lambda: Response(device_response).data.get(expr, dc=Device, params=params), repeat)
+    match_response = payloads.http_response(payloads.envelope(device_items[-1:]))
+    reporter.run('query.pushdown.devices', size, lambda: Response(match_response).data.get(expr, dc=Device, params=params), repeat)
+    reporter.run('queryplan.server_params', size, lambda: [queryplan.server_params(expr, params, device.FILTER_PARAMS) for _ in range(size)], repeat)
+    del device_response, firmware_response
+
+    devices = Parser(device_items)
+    reporter.run('parser.get.all.devices', size, lambda: devices.get(), repeat)
+    reporter.run('parser.get.filter.devices', size, lambda: devices.get('[?isActive==`true`]'), repeat)
+    reporter.run('parser.get.key.devices', size, lambda: devices.get('[*].uniqueId'), repeat)
+    # many small responses evaluated with the same parameterized expression, like entity.get_by_name()
+    entities = [{"guid": str(i), "name": f"Entity {i}", "parentEntityGuid": None} for i in range(20)]
+    reporter.run(
+        'parser.get.param.entities', size,
+        lambda: [Parser(entities).get("[?name==param('name')]", params={"name": "Entity 7"}) for _ in range(size)],
+        repeat
+    )
+    reporter.run('parser.get.dc.devices', size, lambda: devices.get(dc=Device), repeat)
+    reporter.run('parser.get.dc.templates', size, lambda: Parser(template_items).get(dc=Template), repeat)
+    reporter.run('parser.get.dc.firmwares', size, lambda: Parser(firmware_items).get(dc=Firmware), repeat)
+
+    # analytics over the device inventory: active devices per template
+    reporter.run('table.build.devices', size, lambda: DeviceTable.from_items(device_items), repeat)
+    table = DeviceTable.from_items(device_items)
+    reporter.run('table.count_by_template.devices', size, lambda: table.count_by_template(table.active()), repeat)
+    objects = devices.get(dc=Device)
+    reporter.run('list.count_by_template.devices', size, lambda: Counter(d.deviceTemplateGuid for d in objects if d.isActive), repeat)
+    del table, objects
+
+    reporter.run(
+        'util.filter_normalize.devices', size,
+        lambda: [util.normalize_keys(util.filter_dict_to_dataclass_fields(x, Device)) for x in device_items],
+        repeat
+    )
+    reporter.run('util.deserialize_dataclass.devices', size, lambda: util.deserialize_dataclass(list[Device], device_items), repeat)
+    reporter.run('util.deserialize_dataclass.templates', size, lambda: util.deserialize_dataclass(list[Template], template_items), repeat)
+
+    # construction only, so that the Upgrades expansion in __post_init__ dominates
+    firmware_args = [util.normalize_keys(util.filter_dict_to_dataclass_fields(x, Firmware)) for x in firmware_items]
+    reporter.run('firmware.post_init', size, lambda: [Firmware(**x) for x in firmware_args], repeat)
+
+
+def main() -> None:
+    args = common.arg_parser(__doc__).parse_args()
+    reporter = common.Reporter(args.json, args.only)
+    for size in args.sizes:
+        run(size, args.repeat, reporter)
+
+
+if __name__ == '__main__':
+    main()
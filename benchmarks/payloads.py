@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""Synthetic IoTConnect payloads that resemble the responses returned by the REST API."""
+
+import json
+import uuid
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+_ISO_DATE = '2025-03-17T18:53:11.483Z'
+
+
+def _guid(i: int, kind: int) -> str:
+    return str(uuid.UUID(int=(kind << 64) | i)).upper()
+
+
+def devices(count: int) -> list[dict]:
+    return [{
+        "guid": _guid(i, 1),
+        "uniqueId": f"device{i:07d}",
+        "displayName": f"Device {i}",
+        "isAcquired": i % 2,
+        "isActive": i % 10 != 0,
+        "isEdgeSupport": False,
+        "isParentAcquired": False,
+        "deviceTemplateGuid": _guid(i % 20, 2),
+        "messageVersion": "2.1",
+        "entityGuid": _guid(i % 5, 3),
+        "entityName": f"Entity {i % 5}",
+        "deviceTemplateName": f"Template {i % 20}",
+        "deviceCertificate": None,
+        "createdDate": _ISO_DATE,
+    } for i in range(count)]
+
+
+def templates(count: int) -> list[dict]:
+    return [{
+        "guid": _guid(i, 2),
+        "templateCode": f"tpl{i:07d}",
+        "templateName": f"Template {i}",
+        "isEdgeSupport": False,
+        "isIotEdgeEnable": False,
+        "authType": 2,
+        "tag": None,
+        "messageVersion": "2.1",
+        "greenGrass": False,
+        "attributeCount": 3,
+        "deviceCount": i % 100,
+        "createdDate": _ISO_DATE,
+    } for i in range(count)]
+
+
+def upgrades(firmware_index: int, count: int) -> list[dict]:
+    return [{
+        "guid": _guid(firmware_index * 16 + j, 5),
+        "software": f"1.{j}.0",
+        "description": None,
+        "isDraft": "Draft" if j == count - 1 else "Released",
+        "createdDate": _ISO_DATE,
+        "createdBy": _guid(0, 6),
+        "updatedDate": _ISO_DATE,
+        "updatedBy": _guid(0, 6),
+        "fileName": None,
+        "fileUrl": None,
+        "urls": [{"name": "firmware.zip", "url": f"https://storage.example.com/firmware/{_guid(firmware_index * 16 + j, 7)}.zip"}],
+        "firmwareguid": _guid(firmware_index, 4),
+        "name": f"FW{firmware_index}",
+        "hardware": "1.0",
+    } for j in range(count)]
+
+
+def firmwares(count: int, upgrades_per_firmware: int = 3) -> list[dict]:
+    return [{
+        "guid": _guid(i, 4),
+        "name": f"FW{i}",
+        "hardware": "1.0",
+        "isDeprecated": False,
+        "deviceTemplateGuid": _guid(i % 20, 2),
+        "deviceTemplateCode": f"tpl{i % 20:07d}",
+        "deviceTemplateName": f"Template {i % 20}",
+        "releaseCount": upgrades_per_firmware - 1,
+        "draftCount": 1,
+        "description": None,
+        "createdDate": _ISO_DATE,
+        "createdby": _guid(0, 6),
+        "updatedDate": _ISO_DATE,
+        "updatedby": _guid(0, 6),
+        "Upgrades": upgrades(i, upgrades_per_firmware),
+    } for i in range(count)]
+
+
+def envelope(data: list[dict]) -> dict:
+    """ Wrap the data in the standard response body """
+    return {"data": data, "status": 200, "message": "Success", "count": len(data)}
+
+
+def http_response(body: dict) -> requests.Response:
+    """ Returns a requests.Response with the given body, as if it was received from the server """
+    r = requests.Response()
+    r.status_code = 200
+    r.encoding = 'utf-8'
+    r.headers = CaseInsensitiveDict({'Content-Type': 'application/json; charset=utf-8'})
+    r._content = json.dumps(body).encode('utf-8')
+    return r
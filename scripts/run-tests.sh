@@ -7,6 +7,12 @@ cd "$(dirname "$0")/../"
 python3 -m pip install iotconnect-sdk-lite
 
 pushd tests 2>/dev/null
+python3 fakebackend.py # offline test against the in-process fake backend
+python3 hedging.py    # offline
+python3 aio.py        # offline, requires httpx
+python3 table.py      # offline
+python3 decoder.py    # offline
+python3 bulk.py       # offline
 python3 command.py    # run this first - the command test will generate some files that we need
 python3 template.py
 python3 user.py
@@ -3,10 +3,10 @@ import json
 from dataclasses import dataclass, field
 from typing import Optional
 
-from . import config, util
+from . import util
 
 
-@dataclass
+@dataclass(slots=True)
 class AccessTokenUser:
     id: str
     companyId: str
@@ -19,7 +19,7 @@ class AccessTokenUser:
     reviewStatus: str = field(default=None) # NOTE: Not available on the access token obtained from refresh!
     isCpidOptional: bool = field(default=None) # true if is dedicated instance. NOTE: Not available on the access token obtained from refresh!
 
-@dataclass
+@dataclass(slots=True)
 class AccessToken:
     exp: int
     iss: str
@@ -28,10 +28,12 @@ class AccessToken:
 
 
 def decode_access_token() -> Optional[AccessToken]:
-    if config.access_token is None:
+    from .client import current  # avoid circular dependency
+    token = current().access_token
+    if token is None:
         return None
     # without needing to add jwt package...
-    parts = config.access_token.split('.')
+    parts = token.split('.')
     if len(parts) != 3:
         return None
     payload = parts[1]
@@ -0,0 +1,6 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+# Asyncio API. Each module mirrors the module with the same name in the parent lib package,
+# sharing its dataclasses and errors. Requires the httpx package (see the "async" optional dependency).
@@ -0,0 +1,321 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+Asyncio counterpart of lib.apirequest.request().
+Responses are wrapped into the same apirequest.Response class and raise the same errors as the blocking API.
+
+Requests go through the same rate limits, circuit breakers, concurrency windows, response cache and hedging
+as the blocking API, and identical GET requests of the tasks of an event loop share one response.
+The default transport of a client is replaced by an httpx client for each event loop. Other transports,
+like the fake backend, are called in a worker thread, and their responses are read as a whole, also by stream().
+"""
+
+import asyncio
+import weakref
+from http import HTTPStatus, HTTPMethod
+from typing import Optional, Any, AsyncIterator
+
+import requests
+
+try:
+    import httpx
+except ImportError as _ex:
+    raise ImportError(
+        'The asyncio API requires the httpx package. Install it with: python3 -m pip install "iotconnect-rest-api[async]"'
+    ) from _ex
+
+from .. import config, ratelimit, circuitbreaker, concurrency, singleflight, httpcache, hedging, deadline, jsonstream, client as _client
+from ..apirequest import Response, _default_method, _trace_request, _encode_json, _is_auth_failure, _replay_headers, _account_of_headers
+from ..transport import RequestsTransport
+from ..error import ConfigError, DeadlineExceededError
+
+MAX_CONNECTIONS = 100  # maximum number of concurrent connections per event loop
+MAX_KEEPALIVE_CONNECTIONS = 20  # maximum number of idle keep-alive connections per event loop
+
+# httpx clients are bound to the event loop that created them, so we keep one client per loop
+_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+# identical GET requests currently in flight, for each event loop
+_in_flight: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, singleflight.AsyncGroup] = weakref.WeakKeyDictionary()
+
+
+def _get_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+            transport=httpx.AsyncHTTPTransport(retries=3),
+            timeout=httpx.Timeout(deadline.DEFAULT_READ_TIMEOUT, connect=deadline.DEFAULT_CONNECT_TIMEOUT)
+        )
+        _clients[loop] = client
+    return client
+
+
+async def aclose() -> None:
+    """ Close the connections used by the current event loop. Call this before your event loop is shut down. """
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def _get_auth_headers() -> dict[str, str]:
+    from .. import credentials
+    headers = credentials.cached_auth_headers()
+    if headers is None:
+        # building the headers may refresh the token, which is blocking and writes the config file, so keep it off the event loop
+        headers = await asyncio.to_thread(credentials.auth_headers)
+    return headers
+
+
+async def _renew_headers(headers: dict[str, str]) -> Optional[dict[str, str]]:
+    """ See apirequest._replay_headers(). The token refresh is blocking, so it is kept off the event loop. """
+    return await asyncio.to_thread(_replay_headers, headers)
+
+
+def _get_in_flight() -> singleflight.AsyncGroup:
+    loop = asyncio.get_running_loop()
+    group = _in_flight.get(loop)
+    if group is None:
+        group = _in_flight[loop] = singleflight.AsyncGroup()
+    return group
+
+
+def _to_httpx(r: requests.Response, method: HTTPMethod, url: str) -> httpx.Response:
+    """ Converts the response of a Transport. Its payload is already decoded, so the encoding headers are dropped. """
+    headers = [(k, v) for k, v in r.headers.items() if k.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')]
+    return httpx.Response(r.status_code, headers=headers, content=r.content, request=httpx.Request(method, url))
+
+
+async def _send(
+        breaker: Optional[circuitbreaker.CircuitBreaker],
+        window: Optional[concurrency.AdaptiveLimit],
+        method: HTTPMethod,
+        url: str,
+        content: Optional[bytes],
+        data: Optional[dict],
+        json: Optional[dict],
+        params: Optional[dict],
+        headers: dict[str, str],
+        files,
+        timeout: tuple[float, float],
+        stream: bool
+) -> httpx.Response:
+    """ See apirequest._send() """
+    if breaker is not None:
+        breaker.before_call()
+    start = None
+    if window is not None:
+        start = await window.acquire_async(deadline.remaining())
+        if start is None:
+            if breaker is not None:
+                breaker.cancel()  # the request was not sent, so it must not hold a half-open trial slot
+            raise DeadlineExceededError("Deadline exceeded while waiting for a concurrency slot")
+    status = None
+    try:
+        transport = _client.current().transport
+        if isinstance(transport, RequestsTransport):
+            client = _get_client()
+            request_ = client.build_request(
+                method, url, content=content, data=data, json=json, params=params, headers=headers, files=files,
+                timeout=httpx.Timeout(timeout[1], connect=timeout[0])
+            )
+            r = await client.send(request_, stream=stream)
+        else:
+            r = _to_httpx(await asyncio.to_thread(
+                transport.send, method, url, params=params, data=content if content is not None else data, json=json,
+                headers=headers, files=files, timeout=timeout
+            ), method, url)
+        status = r.status_code
+        return r
+    finally:
+        if window is not None:
+            window.release(start, status)
+        if breaker is not None:
+            breaker.record(status)
+
+
+async def _execute(
+        endpoint: str,
+        path: str,
+        method: HTTPMethod,
+        content: Optional[bytes],
+        data: Optional[dict],
+        json: Optional[dict],
+        params: Optional[dict],
+        headers: dict[str, str],
+        files,
+        stream: bool = False
+) -> httpx.Response:
+    """ Send the request, waiting for rate limits and retrying throttled requests """
+    limiter = ratelimit.get_limiter()
+    bucket = limiter.get_bucket(endpoint)
+    breaker = circuitbreaker.get_breakers().get_breaker(endpoint) if circuitbreaker.enabled else None
+    window = concurrency.get_controller().get_limit(endpoint) if concurrency.enabled else None
+    attempt = 0
+    while True:
+        wait = bucket.reserve()
+        if wait > 0:
+            left = deadline.remaining()
+            if left is not None and wait >= left:
+                raise DeadlineExceededError(f"Deadline exceeded. A wait of {wait:.1f} seconds was required.")
+            await asyncio.sleep(wait)
+        timeout = deadline.timeouts_for(endpoint)
+        try:
+            r = await _send(breaker, window, method, endpoint + path, content, data, json, params, headers, files, timeout, stream)
+        except (httpx.TimeoutException, requests.exceptions.Timeout) as ex:
+            left = deadline.remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceededError("Deadline exceeded while waiting for the response") from ex
+            raise
+        delay = limiter.on_response(endpoint, r.status_code, r.headers)
+        # file uploads cannot be replayed as their file objects are already consumed
+        if delay is None or files is not None or attempt >= ratelimit.MAX_THROTTLE_RETRIES:
+            break
+        left = deadline.remaining()
+        if left is not None and delay >= left:
+            break  # not enough budget left to wait for the retry. Report the throttled response.
+        attempt += 1
+        if config.api_trace_enabled:
+            print("Throttled with status %d. Retrying in %.1f seconds" % (r.status_code, delay))
+        await r.aclose()
+    return r
+
+
+async def _get(key: tuple, endpoint: str, path: str, params: Optional[dict], headers: dict[str, str], hedge: bool) -> Response:
+    """ See apirequest._get() """
+    async def send(headers: dict[str, str]) -> httpx.Response:
+        if hedge:
+            return await hedging.call_async(endpoint, lambda: _execute(endpoint, path, HTTPMethod.GET, None, None, None, params, headers, None))
+        return await _execute(endpoint, path, HTTPMethod.GET, None, None, None, params, headers, None)
+
+    if not httpcache.enabled:
+        return Response(await send(headers))
+
+    cache = _client.current().cache
+    entry = cache.get(key)
+    if entry is not None:
+        if entry.is_fresh():
+            return Response(entry.response)
+        headers = dict(headers, **entry.validators())
+    r = await send(headers)
+    if entry is not None and r.status_code == HTTPStatus.NOT_MODIFIED.value:
+        if config.api_trace_enabled:
+            print("Response: status=%d (using cached response)" % r.status_code)
+        cache.refresh(key)
+        return Response(entry.response)
+    if r.status_code == HTTPStatus.OK.value:
+        cache.store(key, endpoint, path, r.status_code, r.headers, r.content)
+    return Response(r)
+
+
+async def request(
+        endpoint: str,
+        path: str,
+        json: Optional[dict] = None, # same as post data, but forces content type application/json
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        headers: dict[str, str] = None,
+        method: Optional[HTTPMethod] = None,
+        allow_failure=False,
+        files=None,
+        codes_ok = frozenset([HTTPStatus.OK]),
+        hedge=False  # for idempotent lookups only. See the hedging module
+) -> Optional[Response]:
+
+    # Catch all for unconfigured API
+    if endpoint is None:
+        raise ConfigError("API has not been configured!")
+
+    deadline.check()
+
+    default_headers = headers is None
+    if headers is None:  # default headers
+        headers = await _get_auth_headers()
+
+    if method is None:  # figure out default method
+        method = _default_method(json, data, files)
+
+    if config.api_trace_enabled:
+        _trace_request(method, endpoint, path, json, data, params)
+
+    content = None
+    if json is not None:
+        content, headers = _encode_json(json, headers)
+        json = None
+
+    async def send(headers: dict[str, str]) -> Response:
+        if method == HTTPMethod.GET and content is None and data is None and files is None:
+            # see apirequest.request()
+            account = _account_of_headers(headers) if default_headers else None
+            key = (endpoint, path, repr(sorted(params.items())) if params else None, account or tuple(sorted(headers.items())))
+            if singleflight.enabled:
+                led = False
+
+                async def lead() -> Response:
+                    nonlocal led
+                    led = True
+                    return await _get(key, endpoint, path, params, headers, hedge)
+
+                try:
+                    response = await _get_in_flight().do(key, lead, timeout=deadline.remaining())
+                    return response if led else Response(response.response)
+                except TimeoutError:
+                    raise DeadlineExceededError("Deadline exceeded while waiting for an identical request in flight")
+                except DeadlineExceededError:
+                    left = deadline.remaining()
+                    if led or (left is not None and left <= 0):
+                        raise
+            return await _get(key, endpoint, path, params, headers, hedge)
+        response = Response(await _execute(endpoint, path, method, content, data, json, params, headers, files))
+        if httpcache.enabled and response.status < HTTPStatus.BAD_REQUEST.value:
+            _client.current().cache.invalidate(endpoint, '/' + path.lstrip('/').split('/', 1)[0])
+        return response
+
+    response = await send(headers)
+    # replay once with a renewed token. File uploads cannot be replayed as their file objects are already consumed.
+    if default_headers and files is None and _is_auth_failure(response):
+        headers = await _renew_headers(headers)
+        if headers is not None:
+            response = await send(headers)
+    if not allow_failure:
+        response.ensure_success(codes_ok=codes_ok)
+    return response
+
+
+async def stream(endpoint: str, path: str, params: Optional[dict] = None, headers: dict[str, str] = None, key: str = 'data') -> AsyncIterator[Any]:
+    """ See apirequest.stream() """
+    if endpoint is None:
+        raise ConfigError("API has not been configured!")
+
+    deadline.check()
+
+    default_headers = headers is None
+    if headers is None:
+        headers = await _get_auth_headers()
+
+    if config.api_trace_enabled:
+        _trace_request(HTTPMethod.GET, endpoint, path, None, None, params)
+
+    r = await _execute(endpoint, path, HTTPMethod.GET, None, None, None, params, headers, None, stream=True)
+    if r.status_code == HTTPStatus.FORBIDDEN.value:
+        await r.aread()  # the message tells whether the token was rejected
+    if default_headers and r.status_code != HTTPStatus.OK.value and _is_auth_failure(Response(r)):
+        headers = await _renew_headers(headers)
+        if headers is not None:
+            await r.aclose()
+            r = await _execute(endpoint, path, HTTPMethod.GET, None, None, None, params, headers, None, stream=True)
+    try:
+        if r.status_code != HTTPStatus.OK.value:
+            await r.aread()
+            Response(r).ensure_success()  # raises for the error payload
+        parser = jsonstream.ItemParser(key)
+        async for chunk in r.aiter_bytes(jsonstream.CHUNK_SIZE):
+            for item in parser.feed(chunk):
+                yield item
+        for item in parser.close():
+            yield item
+    finally:
+        # release the connection, also when the caller stops early
+        await r.aclose()
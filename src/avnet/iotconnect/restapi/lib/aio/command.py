@@ -0,0 +1,48 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+from typing import List, Optional
+
+from .. import apiurl
+from ..command import Command
+from ..error import UsageError, ConflictResponseError
+from .apirequest import request
+
+
+async def get_all(template_guid: str) -> List[Command]:
+    """ See command.get_all() """
+    if template_guid is None:
+        raise UsageError('get_by_template_guid: get_by_template_guid argument is required')
+
+    try:
+        response = await request(apiurl.ep_device, f'/template-command/{template_guid}')
+        return response.data.get(dc=Command)
+    except ConflictResponseError:
+        return []
+
+
+async def get_with_name(template_guid: str, command: str) -> Optional[Command]:
+    """ See command.get_with_name() """
+    for cmd in await get_all(template_guid):
+        if cmd.command == command:
+            return cmd
+    return None
+
+
+async def send(command_guid: str, device_guid: str, parameters: str = None) -> None:
+    """ See command.send() """
+
+    if command_guid is None:
+        raise UsageError('command_guid: device_guid argument is required')
+    if device_guid is None:
+        raise UsageError('execute: device_guid argument is required')
+
+    if parameters is None:
+        parameters = ""
+
+    data = {
+        "commandGuid": command_guid,
+        "parameterValue": parameters
+    }
+    await request(apiurl.ep_device, f'/template-command/device/{device_guid}/send', json=data)
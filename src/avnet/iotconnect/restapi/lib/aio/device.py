@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+import asyncio
+from http import HTTPMethod
+from typing import Optional, Union, Dict, AsyncIterator
+
+from . import apirequest, entity, paging
+from .. import apiurl, decoder, queryplan
+from ..device import Device, DeviceTable, DeviceCreateResult, FILTER_PARAMS, _read_certificate, _create_data
+from ..error import UsageError, NotFoundResponseError, ConflictResponseError
+from .apirequest import request
+
+
+async def query(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> list[Device]:
+    response = await request(apiurl.ep_device, '/Device', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return response.data.get(query_str, dc=Device, params=params)
+
+
+async def stream() -> AsyncIterator[Device]:
+    """ See device.stream() """
+    decode = decoder.get_decoder(Device)
+    async for item in apirequest.stream(apiurl.ep_device, '/Device'):
+        if item is not None:
+            yield decode(item)
+
+
+async def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> AsyncIterator[Device]:
+    """ See device.iter_all() """
+    async for item in paging.iter_items(apiurl.ep_device, '/Device', Device, page_size, prefetch=prefetch):
+        yield item
+
+
+async def query_table(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> DeviceTable:
+    response = await request(apiurl.ep_device, '/Device', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return DeviceTable.from_items(response.data.get(query_str, params=params))
+
+
+async def get_by_guid(guid:str) -> Optional[Device]:
+    """Lookup a device by device GUID"""
+    if guid is None:
+        raise UsageError('get_by_duid: The device Unique ID (DUID) argument is missing')
+    try:
+        response = await request(apiurl.ep_device, f'/Device/{guid}', hedge=True)
+        return response.data.get_one(dc=Device)
+    except ConflictResponseError:
+        return None
+
+
+async def get_by_duid(duid:str) -> Optional[Device]:
+    """Lookup a device by uniqueId"""
+    if duid is None:
+        raise UsageError('get_by_duid: The device Unique ID (DUID) argument is missing')
+    try:
+        response = await request(apiurl.ep_device, f'/Device/uniqueId/{duid}', hedge=True)
+        return response.data.get_one(dc=Device)
+    except ConflictResponseError:
+        return None
+
+
+async def create(
+        template_guid: str,
+        duid: str,
+        device_certificate: Optional[Union[str, bytes]] = None,
+        name: Optional[str] = None,
+        is_ca_auth=False,
+        entity_guid: Optional[str] = None
+) -> DeviceCreateResult:
+    """ See device.create() """
+    cert_str = await asyncio.to_thread(_read_certificate, template_guid, duid, device_certificate, is_ca_auth)  # may read a file
+
+    # assign entity guid to root entity if not provided
+    if entity_guid is None:
+        entity_guid = (await entity.get_root_entity()).guid
+
+    data = _create_data(template_guid, duid, cert_str, name, entity_guid)
+    response = await request(apiurl.ep_device, '/Device', json=data)
+    return response.data.get_one(dc=DeviceCreateResult)
+
+
+async def delete_match_guid(guid: str) -> None:
+    """ See device.delete_match_guid() """
+    if guid is None:
+        raise UsageError('delete_match_guid: The device guid argument is missing')
+    await request(apiurl.ep_device, f'/Device/{guid}', method=HTTPMethod.DELETE)
+
+
+async def delete_match_duid(duid: str) -> None:
+    """ See device.delete_match_duid() """
+    if duid is None:
+        raise UsageError('delete_match_duid: The device duid argument is missing')
+    device = await get_by_duid(duid)
+    if device is None:
+        raise NotFoundResponseError(f'delete_match_duid: Device with DUID "{duid}" not found')
+    await request(apiurl.ep_device, f'/Device/{device.guid}', method=HTTPMethod.DELETE)
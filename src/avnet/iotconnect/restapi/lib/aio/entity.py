@@ -0,0 +1,32 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+from typing import Optional
+
+from .. import apiurl
+from ..entity import Entity
+from ..error import UsageError
+from .apirequest import request
+
+
+async def query(query_str: str = '[*]', params: Optional[dict] = None) -> list[Entity]:
+    response = await request(apiurl.ep_user, "/Entity/lookup")
+    return response.data.get(query_str, dc=Entity, params=params)
+
+
+async def query_expect_one(query_str: str = '[*]', params: Optional[dict] = None) -> Entity:
+    response = await request(apiurl.ep_user, '/Entity/lookup')
+    return response.data.get_one(query_str, dc=Entity, params=params)
+
+
+async def get_by_name(name) -> Entity:
+    """Lookup an entity by name"""
+    if name is None:
+        raise UsageError('get_by_name: The entity name argument is missing')
+    return await query_expect_one("[?name==param('name')]", params={"name": name})
+
+
+async def get_root_entity() -> Entity:
+    """Find root entity for the account"""
+    return await query_expect_one('[?parentEntityGuid == null]')
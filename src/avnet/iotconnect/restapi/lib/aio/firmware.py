@@ -0,0 +1,82 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+from http import HTTPMethod, HTTPStatus
+from typing import Optional, Dict, AsyncIterator
+
+from .. import apiurl, decoder, queryplan
+from ..error import UsageError, NotFoundResponseError
+from ..firmware import Firmware, FirmwareCreateResult, FILTER_PARAMS, _validate_firmware_name, _create_data
+from . import apirequest, paging
+from .apirequest import request
+
+
+async def query(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> list[Firmware]:
+    response = await request(apiurl.ep_firmware, '/Firmware', params=queryplan.server_params(query_str, params, FILTER_PARAMS), codes_ok=[HTTPStatus.NO_CONTENT])
+    return response.data.get(query_str, dc=Firmware, params=params)
+
+
+async def stream() -> AsyncIterator[Firmware]:
+    """ See firmware.stream() """
+    decode = decoder.get_decoder(Firmware)
+    async for item in apirequest.stream(apiurl.ep_firmware, '/Firmware'):
+        if item is not None:
+            yield decode(item)
+
+
+async def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> AsyncIterator[Firmware]:
+    """ See firmware.iter_all() """
+    async for item in paging.iter_items(apiurl.ep_firmware, '/Firmware', Firmware, page_size, prefetch=prefetch):
+        yield item
+
+
+async def get_by_name(name: str) -> Optional[Firmware]:
+    """ Lookup a firmware by name - unique template ID supplied during creation """
+    if name is None or len(name) == 0:
+        raise UsageError('get_by_name: The firmware name parameter is missing')
+    response = await request(apiurl.ep_firmware, '/Firmware', params={"Name": name}, codes_ok=[HTTPStatus.NO_CONTENT])
+    return response.data.get_one(dc=Firmware)
+
+
+async def get_by_guid(guid: str) -> Optional[Firmware]:
+    """ Lookup a firmware by GUID """
+    if guid is None or len(guid) == 0:
+        raise UsageError('get_by_guid: The firmware guid argument is missing')
+    try:
+        response = await request(apiurl.ep_firmware, f'/Firmware/{guid}', hedge=True)
+        return response.data.get_one(dc=Firmware)
+    except NotFoundResponseError:
+        return None
+
+
+async def create(
+        template_guid: str,
+        name: str,
+        hw_version: str,
+        initial_sw_version: str = None,
+        description: Optional[str] = None,
+        upgrade_description: Optional[str] = None,
+) -> FirmwareCreateResult:
+    """ See firmware.create() """
+    data = _create_data(template_guid, name, hw_version, initial_sw_version, description, upgrade_description)
+    response = await request(apiurl.ep_firmware, '/Firmware', json=data)
+    return response.data.get_one(dc=FirmwareCreateResult)
+
+
+async def deprecate_match_guid(guid: str) -> None:
+    """ See firmware.deprecate_match_guid() """
+    if guid is None:
+        raise UsageError('delete_match_guid: The template guid argument is missing')
+    await request(apiurl.ep_firmware, f'/Firmware/{guid}/deprecate', method=HTTPMethod.PUT)
+
+
+async def deprecate_match_name(name: str) -> None:
+    """ See firmware.deprecate_match_name() """
+    if name is None:
+        raise UsageError('delete_match_name: The firmware name argument is missing')
+    _validate_firmware_name(name)
+    fw = await get_by_name(name)
+    if fw is None:
+        raise NotFoundResponseError(f'delete_match_name: Firmware with name "{name}" not found')
+    await deprecate_match_guid(fw.guid)
@@ -0,0 +1,30 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+from http import HTTPMethod
+from typing import Optional, List
+
+from . import entity
+from .. import apiurl
+from ..ota import _entity_push_data, _device_push_data
+from .apirequest import request
+
+
+async def push_to_entity(upgrade_guid: str, entity_guid: Optional[str] = None, force: bool = True, scheduled_on: str = None):
+    """ See ota.push_to_entity() """
+
+    if entity_guid is None:
+       entity_guid = (await entity.get_root_entity()).guid
+
+    data = _entity_push_data(upgrade_guid, entity_guid, force, scheduled_on)
+    response = await request(apiurl.ep_firmware, '/ota-update', method=HTTPMethod.POST, json=data)
+    return response.data.get_one()
+
+
+async def push_to_device(upgrade_guid: str, device_guids: List[str], is_draft=False, force: bool = True, scheduled_on: str = None):
+    """ See ota.push_to_device() """
+
+    data = _device_push_data(upgrade_guid, device_guids, is_draft, force)
+    response = await request(apiurl.ep_firmware, '/ota-update', method=HTTPMethod.POST, json=data)
+    return response.data.get_one()
@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+Asyncio counterpart of the paging module. The next page is requested by a task while the caller processes the current page.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Optional
+
+from .. import decoder
+from ..paging import DEFAULT_PAGE_SIZE, PAGE_NO_PARAM, PAGE_SIZE_PARAM
+from .apirequest import request
+
+
+async def _fetch(endpoint: str, path: str, params: Optional[dict], page_no: int, page_size: int) -> tuple[list, Optional[int]]:
+    response = await request(endpoint, path, params=dict(params or {}, **{PAGE_NO_PARAM: page_no, PAGE_SIZE_PARAM: page_size}))
+    items = response.data.value if isinstance(response.data.value, list) else []
+    count = response.body.get_object_value('count')
+    return items, count if isinstance(count, int) else None
+
+
+async def iter_pages(
+        endpoint: str,
+        path: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        params: Optional[dict] = None,
+        prefetch: bool = True
+) -> AsyncIterator[list[dict]]:
+    """ See paging.iter_pages() """
+    if page_size < 1:
+        raise ValueError('page_size must be at least 1')
+    page_no = 1
+    pending: Optional[asyncio.Task] = None
+    previous: Optional[tuple[Any, Any]] = None  # first and last item of the previous page
+    try:
+        items, count = await _fetch(endpoint, path, params, page_no, page_size)
+        while True:
+            if len(items) and (items[0], items[-1]) == previous:
+                return  # the server ignored pageNo and returned the previous page again
+            last = len(items) != page_size or (count is not None and page_no * page_size >= count)
+            if not last and prefetch:
+                pending = asyncio.create_task(_fetch(endpoint, path, params, page_no + 1, page_size))
+            if len(items):
+                yield items
+            if last:
+                return
+            previous = items[0], items[-1]
+            page_no += 1
+            if pending is not None:
+                items, count = await pending
+                pending = None
+            else:
+                items, count = await _fetch(endpoint, path, params, page_no, page_size)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def iter_items(
+        endpoint: str,
+        path: str,
+        dc: Optional[type] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        params: Optional[dict] = None,
+        prefetch: bool = True
+) -> AsyncIterator[Any]:
+    """ See paging.iter_items() """
+    decode: Callable[[dict], Any] = decoder.get_decoder(dc) if dc is not None else (lambda item: item)
+    async for page in iter_pages(endpoint, path, page_size, params, prefetch):
+        for item in page:
+            if item is not None:
+                yield decode(item)
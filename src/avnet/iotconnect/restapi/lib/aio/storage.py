@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+import asyncio
+from http import HTTPMethod
+from typing import List
+
+from .. import apiurl, util
+from ..error import UsageError, ConflictResponseError
+from ..storage import File, FILE_MODULE_TYPES
+from .apirequest import request
+
+
+async def get_files(module_type: str, file_ref_guid: str) -> List[File]:
+    """ See storage.get_files() """
+    if file_ref_guid is None:
+        raise UsageError('get_by_module_type_and_guid: file_ref_guid argument is required')
+    if module_type is None:
+        raise UsageError('get_by_module_type_and_guid: module_type argument is required')
+    if module_type not in FILE_MODULE_TYPES:
+       raise UsageError('get_by_module_type_and_guid: module_type argument is invalid')
+
+    try:
+        response = await request(apiurl.ep_file, f'/File/{module_type}/{file_ref_guid}')
+        return response.data.get(expr='fileData', dc=File)
+    except ConflictResponseError:
+        return []
+
+
+async def create(
+        module_type: str,
+        file_ref_guid: str,
+        file_path: str,
+        tag: str = None
+):
+    """ See storage.create() """
+
+    if tag is None:
+        tag = await asyncio.to_thread(util.file_md5, file_path)
+    with open(file_path, 'rb') as f:
+        fw_file = {
+            'fileData': f
+        }
+        data = {
+            "Tag" : tag,
+            "fileRefGuid": file_ref_guid,
+            "ModuleType": module_type
+        }
+        response = await request(apiurl.ep_file, '/File',  method=HTTPMethod.POST, files=fw_file, data=data)
+        return response.data.get_one()
+
+
+async def delete_match_guid(module_type: str, file_guid: str) -> None:
+    """ See storage.delete_match_guid() """
+    if file_guid is None:
+        raise UsageError('delete_match_guid: The template guid argument is missing')
+    await request(apiurl.ep_file, f'/File/{module_type}/{file_guid}', method=HTTPMethod.DELETE)
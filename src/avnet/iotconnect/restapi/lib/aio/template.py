@@ -0,0 +1,121 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+import asyncio
+import io
+from http import HTTPMethod
+from typing import Optional, Dict, AsyncIterator
+
+from .. import apiurl, decoder, queryplan
+from ..error import UsageError, ConflictResponseError, NotFoundResponseError
+from ..template import Template, TemplateTable, TemplateCreateResult, FILTER_PARAMS, _validate_template_code, _prepare_template_json
+from . import apirequest, paging
+from .apirequest import request
+
+
+async def query(query_str: str = '[*]', params: Optional[Dict[str,any]] = None) -> list[Template]:
+    response = await request(apiurl.ep_device, '/device-template', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return response.data.get(query_str, dc=Template, params=params)
+
+
+async def stream() -> AsyncIterator[Template]:
+    """ See template.stream() """
+    decode = decoder.get_decoder(Template)
+    async for item in apirequest.stream(apiurl.ep_device, '/device-template'):
+        if item is not None:
+            yield decode(item)
+
+
+async def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> AsyncIterator[Template]:
+    """ See template.iter_all() """
+    async for item in paging.iter_items(apiurl.ep_device, '/device-template', Template, page_size, prefetch=prefetch):
+        yield item
+
+
+async def query_table(query_str: str = '[*]', params: Optional[Dict[str,any]] = None) -> TemplateTable:
+    response = await request(apiurl.ep_device, '/device-template', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return TemplateTable.from_items(response.data.get(query_str, params=params))
+
+
+async def get(params: dict[str, any]) -> Optional[Template]:
+    try:
+        response = await request(apiurl.ep_device, '/device-template', params=params)
+        return response.data.get_one(dc=Template)
+    except ConflictResponseError:
+        return None
+
+
+async def get_by_template_code(template_code: str) -> Optional[Template]:
+    """ Lookup an template by template code - unique template ID supplied during creation """
+    _validate_template_code(template_code)
+    try:
+        response = await request(apiurl.ep_device, f'/device-template/template-code/{template_code}')
+        return response.data.get_one(dc=Template)
+    except ConflictResponseError:
+        return None
+
+
+async def get_by_guid(guid: str) -> Optional[Template]:
+    """ Lookup a template by GUID """
+    try:
+        response = await request(apiurl.ep_device, f'/device-template/{guid}', hedge=True)
+        return response.data.get_one(dc=Template)
+    except NotFoundResponseError:
+        return None
+
+
+async def create(
+        template_json_path: str,
+        new_template_code: Optional[str] = None,
+        new_template_name: Optional[str] = None
+
+) -> TemplateCreateResult:
+    """ See template.create() """
+    try:
+        json_data = await asyncio.to_thread(_read_text, template_json_path)
+    except OSError:
+        raise UsageError(f'Could not open file {template_json_path}')
+    return await create_from_json_str(json_data, new_template_code, new_template_name)
+
+
+def _read_text(path: str) -> str:
+    with open(path, 'r') as f:
+        return f.read()
+
+
+async def create_from_json_str(
+        template_json_string: str,
+        new_template_code: Optional[str] = None,
+        new_template_name: Optional[str] = None
+) -> TemplateCreateResult:
+    """ See template.create_from_json_str() """
+    new_template_str = _prepare_template_json(template_json_string, new_template_code, new_template_name)
+
+    # httpx only accepts binary file uploads
+    with io.BytesIO(new_template_str.encode('utf-8')) as template_file:
+        f = {"file": ("file", template_file)}
+        response = await request(apiurl.ep_device, '/device-template/quick', files=f)
+    res = response.data.get_one(dc=TemplateCreateResult)
+    if res is not None and res.deviceTemplateGuid is not None:
+        res.deviceTemplateGuid = res.deviceTemplateGuid.upper()
+    return res
+
+
+async def delete_match_guid(guid: str) -> None:
+    """ See template.delete_match_guid() """
+    if guid is None:
+        raise UsageError('delete_match_guid: The template guid argument is missing')
+
+    await request(apiurl.ep_device, f'/device-template/{guid}', method=HTTPMethod.DELETE)
+
+
+async def delete_match_code(code: str) -> None:
+    """ See template.delete_match_code() """
+    if code is None:
+        raise UsageError('delete_match_code: The template code argument is missing')
+    _validate_template_code(code)
+    t = await get_by_template_code(code)
+    if t is None:
+        raise NotFoundResponseError(f'delete_match_code: Template with code "{code}" not found')
+    await delete_match_guid(t.guid)
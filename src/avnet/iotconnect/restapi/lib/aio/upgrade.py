@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+import os
+from http import HTTPMethod
+from typing import Optional, Dict, AsyncIterator
+
+from .. import apiurl, decoder, queryplan
+from ..error import UsageError, NotFoundResponseError
+from ..upgrade import Upgrade, UpgradeTable, UpgradeCreateResult, UploadResult, FILTER_PARAMS, _create_data
+from . import apirequest, paging
+from .apirequest import request
+
+
+async def query(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> list[Upgrade]:
+    response = await request(apiurl.ep_firmware, '/firmware-upgrade', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return response.data.get(query_str, dc=Upgrade, params=params)
+
+
+async def stream() -> AsyncIterator[Upgrade]:
+    """ See upgrade.stream() """
+    decode = decoder.get_decoder(Upgrade)
+    async for item in apirequest.stream(apiurl.ep_firmware, '/firmware-upgrade'):
+        if item is not None:
+            yield decode(item)
+
+
+async def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> AsyncIterator[Upgrade]:
+    """ See upgrade.iter_all() """
+    async for item in paging.iter_items(apiurl.ep_firmware, '/firmware-upgrade', Upgrade, page_size, prefetch=prefetch):
+        yield item
+
+
+async def query_table(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> UpgradeTable:
+    response = await request(apiurl.ep_firmware, '/firmware-upgrade', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return UpgradeTable.from_items(response.data.get(query_str, params=params))
+
+
+async def get_by_guid(guid: str) -> Optional[Upgrade]:
+    """ Lookup a firmware by GUID """
+    if guid is None or len(guid) == 0:
+        raise UsageError('get_by_guid: The firmware guid argument is missing')
+    try:
+        response = await request(apiurl.ep_firmware, f'/firmware-upgrade/{guid}')
+        return response.data.get_one(dc=Upgrade)
+    except NotFoundResponseError:
+        return None
+
+
+async def create(
+        firmware_guid: str,
+        sw_version: Optional[str] = None,
+        description: Optional[str] = None,
+) -> UpgradeCreateResult:
+    """ See upgrade.create() """
+    data = _create_data(firmware_guid, sw_version, description)
+    response = await request(apiurl.ep_firmware, '/firmware-upgrade', json=data)
+    return response.data.get_one(dc=UpgradeCreateResult)
+
+
+async def upload(upgrade_guid: str, file_path: str, file_name: Optional[str] = None, file_open_mode='rb') -> None:
+    """ See upgrade.upload() """
+
+    if file_name is None:
+        file_name = os.path.basename(file_path)
+
+    with open(file_path, file_open_mode) as f:
+        fw_file = {
+            'fileData': (file_name, f)
+        }
+        data = {
+            'fileRefGuid': upgrade_guid,
+            'ModuleType': 'firmware',
+        }
+        response = await request(apiurl.ep_file, '/File', method=HTTPMethod.POST, files=fw_file, data=data)
+        return response.data.get_one(dc=UploadResult)
+
+
+async def publish(upgrade_guid: str) -> None:
+    """ See upgrade.publish() """
+
+    await request(apiurl.ep_firmware, f'/firmware-upgrade/{upgrade_guid}/publish', method=HTTPMethod.PUT)
+
+
+async def delete_match_guid(guid: str) -> None:
+    """ See upgrade.delete_match_guid() """
+    if guid is None:
+        raise UsageError('delete_match_guid: The template guid argument is missing')
+    await request(apiurl.ep_firmware, f'/firmware-upgrade/{guid}', method=HTTPMethod.DELETE)
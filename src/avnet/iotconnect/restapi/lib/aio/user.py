@@ -0,0 +1,56 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+from http import HTTPStatus
+from typing import Optional, Dict, AsyncIterator
+
+from .. import apiurl, accesstoken, queryplan
+from ..error import UsageError, ConflictResponseError, NotFoundResponseError
+from ..user import User, FILTER_PARAMS
+from . import paging
+from .apirequest import request
+
+
+async def query(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> list[User]:
+    response = await request(apiurl.ep_user, '/User', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return response.data.get(query_str, dc=User, params=params)
+
+
+async def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> AsyncIterator[User]:
+    """ See user.iter_all() """
+    async for item in paging.iter_items(apiurl.ep_user, '/User', User, page_size, prefetch=prefetch):
+        yield item
+
+
+async def get_own_user() -> Optional[User]:
+    """ Lookup the currently logged-in user """
+    at = accesstoken.decode_access_token()
+    if at is None:
+        raise UsageError('get_by_email: The user is not logged in. Please configure the API first.')
+    return await get_by_guid(at.user.id)
+
+
+async def get_by_email(email: str) -> Optional[User]:
+    """ Lookup a user by their email (username) """
+    if email is None or len(email) == 0:
+        raise UsageError('get_by_email: The email parameter is missing')
+    try:
+        response = await request(apiurl.ep_user, f'/User/{email}/availability', codes_ok=[HTTPStatus.NO_CONTENT])
+        u = response.data.get_one()
+        if u is None:
+            return None
+        # we have to re-fetch because the availability result is missing the CPID!
+        response = await request(apiurl.ep_user, f'/User/{u.get("guid")}', codes_ok=[HTTPStatus.NO_CONTENT])
+        return response.data.get_one(dc=User)
+    except ConflictResponseError:
+        return None
+
+
+async def get_by_guid(guid: str) -> Optional[User]:
+    """ Lookup a template by GUID """
+    try:
+        response = await request(apiurl.ep_user, f'/User/{guid}')
+        return response.data.get_one(dc=User)
+    except NotFoundResponseError:
+        return None
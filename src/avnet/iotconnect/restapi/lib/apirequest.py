@@ -2,19 +2,21 @@
 # Copyright (C) 2025 Avnet
 # Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
 
+import json as _json
+import re
 from http import HTTPStatus, HTTPMethod
-from typing import Optional, TypeVar, Union, Any
+from typing import Optional, TypeVar, Union, Any, Callable, Iterator
 
-import jmespath
 import requests
-from requests.adapters import HTTPAdapter
 from requests.exceptions import RetryError
-from urllib3 import Retry
 
-from . import config, util
-from .error import ResponseError, AuthError, ApiException, SingleValueExpected, ValueExpected, ConflictResponseError, NotFoundResponseError, ConfigError
+from . import config, util, decoder, expression, jsonstream, client, ratelimit, concurrency, circuitbreaker, singleflight, httpcache, deadline, hedging
+from .error import ResponseError, AuthError, ApiException, SingleValueExpected, ValueExpected, ConflictResponseError, NotFoundResponseError, ConfigError, DeadlineExceededError
 
 _get_auth_headers = None  # avoid circular dependency
+_renew_auth_headers = None
+_account_of = None
+_in_flight = singleflight.Group()  # identical GET requests currently in flight
 
 
 class Headers(dict[str, str]):
@@ -26,6 +28,62 @@ class Headers(dict[str, str]):
 
 T = TypeVar('T', bound=util.DataclassInstance)
 
+# ------------
+# JSON backend for request and response payloads. orjson or msgspec is used if installed, as they are several times
+# faster than the json module on large listings. All backends raise ValueError for invalid JSON.
+
+
+def _stdlib_json_backend() -> tuple[Callable[[Union[bytes, str]], Any], Callable[[Any], bytes]]:
+    return _json.loads, lambda value: _json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def _orjson_backend() -> tuple[Callable[[Union[bytes, str]], Any], Callable[[Any], bytes]]:
+    import orjson
+    return orjson.loads, orjson.dumps  # orjson.JSONDecodeError is a ValueError
+
+
+def _msgspec_backend() -> tuple[Callable[[Union[bytes, str]], Any], Callable[[Any], bytes]]:
+    import msgspec
+    decoder_ = msgspec.json.Decoder()
+    encoder_ = msgspec.json.Encoder()
+
+    def loads(value: Union[bytes, str]) -> Any:
+        try:
+            return decoder_.decode(value)
+        except msgspec.DecodeError as ex:
+            raise ValueError(str(ex)) from ex
+
+    return loads, encoder_.encode
+
+
+JSON_BACKENDS = {'orjson': _orjson_backend, 'msgspec': _msgspec_backend, 'json': _stdlib_json_backend}
+
+json_backend = 'json'
+json_loads, json_dumps = _stdlib_json_backend()
+
+
+def set_json_backend(name: Optional[str] = None) -> str:
+    """
+    Select the JSON backend by name ("orjson", "msgspec" or "json"), or the first installed one in that order if name is None.
+    Returns the name of the selected backend. Raises ImportError if the requested backend is not installed.
+    """
+    global json_backend, json_loads, json_dumps
+    if name is not None:
+        if name not in JSON_BACKENDS:
+            raise ValueError(f'Unknown JSON backend "{name}". Use one of: {", ".join(JSON_BACKENDS)}')
+        json_loads, json_dumps = JSON_BACKENDS[name]()
+        json_backend = name
+        return name
+    for candidate in JSON_BACKENDS:
+        try:
+            return set_json_backend(candidate)
+        except ImportError:
+            pass
+    return json_backend
+
+
+set_json_backend()
+
 # ------------
 
 
@@ -33,53 +91,94 @@ class Parser:
     def __init__(self, value: Optional[dict]):
         self.value = value if value is not None else []
 
-    def get(self, expr: Optional[str] = '[*]', dc: Optional[T] = None) -> Union[list[dict], list[T]]:
-        ret = jmespath.search(expr, self.value)
+    def get(self, expr: Optional[str] = '[*]', dc: Optional[T] = None, params: Optional[dict] = None) -> Union[list[dict], list[T]]:
+        """
+        Evaluate the JMESPath expression and optionally convert the resulting items to the dataclass dc.
+
+        :param expr: JMESPath expression. See the expression module.
+        :param dc: Optional dataclass to convert the items to.
+        :param params: Values for the param() function used in the expression, like "[?name==param('name')]".
+        """
+        ret = expression.search(expr, self.value, params)
         if dc is None:
             return ret
 
-        # Instantiate the dataclass directly after normalizing keys
-        return [dc(**util.normalize_keys(util.filter_dict_to_dataclass_fields(item, dc))) for item in ret]
+        # the cached decoder of the dataclass picks the matching keys and instantiates it directly
+        return decoder.decode_list(dc, ret)
 
 
-    def get_one(self, expr='[*]', dc: Optional[T] = None) -> Optional[Union[dict, T]]:
-        values = self.get(expr, dc)
+    def get_one(self, expr='[*]', dc: Optional[T] = None, params: Optional[dict] = None) -> Optional[Union[dict, T]]:
+        values = self.get(expr, dc, params)
         if values is None or len(values) == 0:
             return None
         if len(values) > 1:
             raise SingleValueExpected
         return values[0]
 
-    def get_or_raise(self, expr='[*]', dc: Optional[T] = None) -> Optional[Union[dict, T]]:
-        ret = self.get_one(expr, dc)
+    def get_or_raise(self, expr='[*]', dc: Optional[T] = None, params: Optional[dict] = None) -> Optional[Union[dict, T]]:
+        ret = self.get_one(expr, dc, params)
         if ret is None:
             raise ValueExpected
         return ret
 
-    def get_object_value(self, expr) -> Any:
+    def get_object_value(self, expr, params: Optional[dict] = None) -> Any:
         """ Return value from content that is not an array """
-        return jmespath.search(expr, self.value)
+        return expression.search(expr, self.value, params)
 
 
 class Response:
     def __init__(self, response: requests.Response):
+        """
+        Wraps a requests.Response, an httpx.Response when used by the asyncio API in the aio package,
+        or an httpcache.StoredResponse. Each Response decodes its own copy of the payload.
+
+        The JSON payload is decoded when body or data is first accessed, so that responses of calls that
+        discard the result, like deletes, are never decoded. Use content or view() to get the payload as is.
+        """
         self.response = response
         self.status = response.status_code
-        self.body = Parser(None)
-        self.data = Parser(None)
-
+        self._parsed: Optional[tuple[Parser, Parser]] = None
+        if config.api_trace_enabled:
+            self._decode()  # trace the response when it is received
+
+    def _decode(self) -> tuple[Parser, Parser]:
+        # concurrent first accesses from several threads may decode twice, but yield equal results
+        parsed = self._parsed
+        if parsed is not None:
+            return parsed
         try:
-            self.body = Parser(response.json())
-            self.data = Parser(self.body.value.get("data"))
+            body = Parser(json_loads(self.response.content))
+            data = Parser(body.value.get("data"))
             if config.api_trace_enabled:
-                print("Response: status=%d body=%s" % (self.status, self.body.value))
-        except requests.exceptions.JSONDecodeError:
+                print("Response: status=%d body=%s" % (self.status, body.value))
+        except ValueError:  # JSONDecodeError raised by requests, httpx and the json module are all ValueError
             if config.api_trace_enabled:
-                print("Raw Response:", response)
+                print("Raw Response:", self.response)
             if self.status not in (HTTPStatus.NO_CONTENT.value, HTTPStatus.NOT_FOUND.value):
                 raise ApiException("API request failed. Status: %d (%s)" % (self.status, HTTPStatus(self.status).phrase), self.status)
-            else:
-                self.body.value = []
+            body = Parser([])
+            data = Parser(None)
+        self._parsed = parsed = (body, data)
+        return parsed
+
+    @property
+    def body(self) -> Parser:
+        """ The decoded JSON payload. Raises ApiException if the payload is not JSON, unless the status is 204 or 404. """
+        return self._decode()[0]
+
+    @property
+    def data(self) -> Parser:
+        """ The "data" value of the decoded JSON payload """
+        return self._decode()[1]
+
+    @property
+    def content(self) -> bytes:
+        """ The payload bytes as received, without decoding, for example to forward them verbatim """
+        return self.response.content
+
+    def view(self) -> memoryview:
+        """ Returns a read-only memoryview of the payload bytes, which can be sliced or written out without copying """
+        return memoryview(self.content)
 
     def ensure_success(self, codes_ok: Optional[list[int]] = None) -> None:
         """If status is bad - raise exception"""
@@ -124,6 +223,171 @@ class Response:
                     raise ResponseError("Bad HTTP response status: " + str(self.status), self.status)
 
 
+def _replay_headers(headers: dict[str, str]) -> Optional[dict[str, str]]:
+    """
+    Returns the headers for replaying a request with default headers that was rejected because of its token
+    (see _is_auth_failure()) after renewing the token, or None if it should not be replayed. See credentials.renew_auth_headers().
+    """
+    global _renew_auth_headers
+    if _renew_auth_headers is None:
+        from .credentials import renew_auth_headers
+        _renew_auth_headers = renew_auth_headers
+    renewed = _renew_auth_headers(headers)
+    if renewed is not None and Headers.N_CONTENT_TYPE in headers:
+        renewed = dict(renewed, **{Headers.N_CONTENT_TYPE: headers[Headers.N_CONTENT_TYPE]})
+    return renewed
+
+
+def _account_of_headers(headers: dict[str, str]) -> Optional[str]:
+    """ See credentials.account_of() """
+    global _account_of
+    if _account_of is None:
+        from .credentials import account_of
+        _account_of = account_of
+    return _account_of(headers)
+
+
+# a 403 message that blames the token rather than the permissions of the account
+_TOKEN_REJECTED = re.compile(r'token.*\b(expired|invalid|revoked)|\b(expired|invalid|revoked)\b.*token', re.IGNORECASE)
+
+
+def _is_auth_failure(response: Response) -> bool:
+    """
+    True if the request was rejected because of its token: 401, or 403 with a message that says
+    the token expired or is invalid. Other 403 responses are permission errors, which a new token would not fix.
+    """
+    if response.status == HTTPStatus.UNAUTHORIZED.value:
+        return True
+    if response.status != HTTPStatus.FORBIDDEN.value:
+        return False
+    try:
+        message = response.body.get_object_value('message')
+    except ApiException:
+        return False
+    return isinstance(message, str) and _TOKEN_REJECTED.search(message) is not None
+
+
+def _default_method(json: Optional[dict], data: Optional[dict], files) -> HTTPMethod:
+    if json is not None or data is not None or files is not None:
+        return HTTPMethod.POST
+    else:
+        return HTTPMethod.GET
+
+
+def _encode_json(json: Any, headers: dict[str, str]) -> tuple[bytes, dict[str, str]]:
+    """ Encode the JSON body with the selected JSON backend, rather than letting requests or httpx use the json module """
+    return json_dumps(json), dict(headers, **{Headers.N_CONTENT_TYPE: Headers.V_APP_JSON})
+
+
+def _trace_request(method: HTTPMethod, endpoint: str, path: str, json: Optional[dict], data: Optional[dict], params: Optional[dict]) -> None:
+    def remove_password(traced_data):
+        if isinstance(traced_data, dict) and traced_data.get('password') is not None:  # do not print passwords
+            traced_data = dict(traced_data)
+            traced_data['password'] = '*******'
+        return traced_data
+
+    print("%s %s%s json=%s data=%s params=%s" % (method, endpoint, path, remove_password(json), remove_password(data), params))
+
+
+def _send(
+        breaker: Optional[circuitbreaker.CircuitBreaker],
+        window: Optional[concurrency.AdaptiveLimit],
+        method: HTTPMethod,
+        url: str,
+        **kwargs
+) -> requests.Response:
+    """ Send the request through the endpoint's circuit breaker and concurrency window, if any, and record its outcome """
+    if breaker is not None:
+        breaker.before_call()
+    start = None
+    if window is not None:
+        start = window.acquire(deadline.remaining())
+        if start is None:
+            if breaker is not None:
+                breaker.cancel()  # the request was not sent, so it must not hold a half-open trial slot
+            raise DeadlineExceededError("Deadline exceeded while waiting for a concurrency slot")
+    status = None
+    try:
+        r = client.current().transport.send(method, url, **kwargs)
+        status = r.status_code
+        return r
+    finally:
+        if window is not None:
+            window.release(start, status)
+        if breaker is not None:
+            breaker.record(status)
+
+
+def _execute(
+        endpoint: str,
+        path: str,
+        method: HTTPMethod,
+        json: Optional[dict],
+        data: Optional[dict],
+        params: Optional[dict],
+        headers: dict[str, str],
+        files,
+        stream: bool = False
+) -> requests.Response:
+    """ Send the request, waiting for rate limits and retrying throttled requests """
+    limiter = ratelimit.get_limiter()
+    bucket = limiter.get_bucket(endpoint)
+    breaker = circuitbreaker.get_breakers().get_breaker(endpoint) if circuitbreaker.enabled else None
+    window = concurrency.get_controller().get_limit(endpoint) if concurrency.enabled else None
+    # only pass stream when needed, so that custom transports without streaming support keep working for other requests
+    extra = {'stream': True} if stream else {}
+    attempt = 0
+    while True:
+        deadline.sleep(bucket.reserve())
+        timeout = deadline.timeouts_for(endpoint)
+        try:
+            r = _send(breaker, window, method, endpoint + path, data=data, json=json, params=params, headers=headers, files=files, timeout=timeout, **extra)
+        except requests.exceptions.Timeout as ex:
+            left = deadline.remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceededError("Deadline exceeded while waiting for the response") from ex
+            raise
+        delay = limiter.on_response(endpoint, r.status_code, r.headers)
+        # file uploads cannot be replayed as their file objects are already consumed
+        if delay is None or files is not None or attempt >= ratelimit.MAX_THROTTLE_RETRIES:
+            break
+        left = deadline.remaining()
+        if left is not None and delay >= left:
+            break  # not enough budget left to wait for the retry. Report the throttled response.
+        attempt += 1
+        if config.api_trace_enabled:
+            print("Throttled with status %d. Retrying in %.1f seconds" % (r.status_code, delay))
+        r.close()
+    return r
+
+
+def _get(key: tuple, endpoint: str, path: str, params: Optional[dict], headers: dict[str, str], hedge: bool) -> Response:
+    """ Send a GET request, using the response cache to revalidate or reuse a previous response if possible """
+    def send() -> requests.Response:
+        if hedge:
+            return hedging.call(endpoint, lambda: _execute(endpoint, path, HTTPMethod.GET, None, None, params, headers, None))
+        return _execute(endpoint, path, HTTPMethod.GET, None, None, params, headers, None)
+
+    if not httpcache.enabled:
+        return Response(send())
+
+    cache = client.current().cache
+    entry = cache.get(key)
+    if entry is not None:
+        if entry.is_fresh():
+            return Response(entry.response)
+        headers = dict(headers, **entry.validators())
+    r = send()
+    if entry is not None and r.status_code == HTTPStatus.NOT_MODIFIED.value:
+        if config.api_trace_enabled:
+            print("Response: status=%d (using cached response)" % r.status_code)
+        cache.refresh(key)
+        return Response(entry.response)
+    if r.status_code == HTTPStatus.OK.value:
+        cache.store(key, endpoint, path, r.status_code, r.headers, r.content)
+    return Response(r)
+
+
 def request(
         endpoint: str,
         path: str,
@@ -134,44 +398,115 @@ def request(
         method: Optional[HTTPMethod] = None,
         allow_failure=False,
         files=None,
-        codes_ok = frozenset([HTTPStatus.OK])
+        codes_ok = frozenset([HTTPStatus.OK]),
+        hedge=False  # for idempotent lookups only. See the hedging module
 ) -> Optional[Response]:
 
     # Catch all for unconfigured API
     if endpoint is None:
         raise ConfigError("API has not been configured!")
 
-    s = requests.Session()
-    retries = Retry(total=3, backoff_factor=0.1)
-    s.mount('https://', HTTPAdapter(max_retries=retries))
-
+    deadline.check()
 
+    default_headers = headers is None
     if headers is None:  # default headers
         # avoid circular dependency
         global _get_auth_headers
         if _get_auth_headers is None:
-            from .credentials import get_auth_headers
-            _get_auth_headers = get_auth_headers
-        headers = _get_auth_headers()
+            from .credentials import auth_headers
+            _get_auth_headers = auth_headers
+        headers = _get_auth_headers()  # shared, not modified by the request
 
     if method is None:  # figure out default method
-        if json is not None or data is not None or files is not None:
-            method = HTTPMethod.POST
-        else:
-            method = HTTPMethod.GET
+        method = _default_method(json, data, files)
 
     if config.api_trace_enabled:
-        def remove_password(traced_data):
-            if isinstance(traced_data, dict) and traced_data.get('password') is not None:  # do not print passwords
-                traced_data = dict(traced_data)
-                traced_data['password'] = '*******'
-
-        print("%s %s%s json=%s data=%s params=%s" % (method, endpoint, path, remove_password(json), remove_password(data), params))
+        _trace_request(method, endpoint, path, json, data, params)
+
+    if json is not None:
+        data, headers = _encode_json(json, headers)
+        json = None
+
+    def send(headers: dict[str, str]) -> Response:
+        if method == HTTPMethod.GET and json is None and data is None and files is None:
+            # the key includes the account of the default headers, so that it does not change when the token is refreshed,
+            # or otherwise the headers, which carry the auth identity
+            account = _account_of_headers(headers) if default_headers else None
+            key = (endpoint, path, repr(sorted(params.items())) if params else None, account or tuple(sorted(headers.items())))
+            if singleflight.enabled:
+                led = False
+
+                def lead() -> Response:
+                    nonlocal led
+                    led = True
+                    return _get(key, endpoint, path, params, headers, hedge)
+
+                # identical GET requests that are already in flight share one response
+                try:
+                    response = _in_flight.do(key, lead, timeout=deadline.remaining())
+                    # callers that waited for the shared request decode their own copy of the payload
+                    return response if led else Response(response.response)
+                except TimeoutError:
+                    raise DeadlineExceededError("Deadline exceeded while waiting for an identical request in flight")
+                except DeadlineExceededError:
+                    left = deadline.remaining()
+                    if led or (left is not None and left <= 0):
+                        raise
+                    # the shared request ran out of the deadline of the caller that sent it. This caller has time left.
+            return _get(key, endpoint, path, params, headers, hedge)
+        response = Response(_execute(endpoint, path, method, json, data, params, headers, files))
+        if httpcache.enabled and response.status < HTTPStatus.BAD_REQUEST.value:
+            # a modification may affect cached lookups of the same resource type, like /device-template/...
+            client.current().cache.invalidate(endpoint, '/' + path.lstrip('/').split('/', 1)[0])
+        return response
 
     try:
-        response = Response(s.request(method, endpoint + path, data=data, json=json, params=params, headers=headers, files=files))
+        response = send(headers)
+        # the token may have expired or been revoked. Replay once with a renewed token.
+        # File uploads cannot be replayed as their file objects are already consumed.
+        if default_headers and files is None and _is_auth_failure(response):
+            headers = _replay_headers(headers)
+            if headers is not None:
+                response = send(headers)
         if not allow_failure:
             response.ensure_success(codes_ok=codes_ok)
         return response
     except RetryError as ex:
         raise
+
+
+def stream(endpoint: str, path: str, params: Optional[dict] = None, headers: dict[str, str] = None, key: str = 'data') -> Iterator[Any]:
+    """
+    Send a GET request and yield the items of the "key" array of the JSON response one at a time, as they are received.
+    Unlike request(), the payload is parsed incrementally, so memory use does not depend on the number of items.
+    The request is sent when the iteration starts. Responses are not cached or shared with identical requests.
+    """
+    if endpoint is None:
+        raise ConfigError("API has not been configured!")
+
+    deadline.check()
+
+    default_headers = headers is None
+    if headers is None:
+        global _get_auth_headers
+        if _get_auth_headers is None:
+            from .credentials import auth_headers
+            _get_auth_headers = auth_headers
+        headers = _get_auth_headers()  # shared, not modified by the request
+
+    if config.api_trace_enabled:
+        _trace_request(HTTPMethod.GET, endpoint, path, None, None, params)
+
+    r = _execute(endpoint, path, HTTPMethod.GET, None, None, params, headers, None, stream=True)
+    if default_headers and r.status_code != HTTPStatus.OK.value and _is_auth_failure(Response(r)):
+        headers = _replay_headers(headers)
+        if headers is not None:
+            r.close()
+            r = _execute(endpoint, path, HTTPMethod.GET, None, None, params, headers, None, stream=True)
+    try:
+        if r.status_code != HTTPStatus.OK.value:
+            Response(r).ensure_success()  # reads the error payload and raises
+        yield from jsonstream.iter_items(r.iter_content(jsonstream.CHUNK_SIZE), key)
+    finally:
+        # release the connection, also when the caller stops early
+        r.close()
@@ -1,10 +1,11 @@
 # SPDX-License-Identifier: MIT
 # Copyright (C) 2025 Avnet
 # Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
-import json
+import sys
+import types
+from dataclasses import dataclass
 from http import HTTPMethod
-
-import requests
+from typing import Optional
 
 from avnet.iotconnect.restapi.lib.error import ConfigError
 
@@ -14,36 +15,91 @@ from avnet.iotconnect.restapi.lib.error import ConfigError
 
 
 
-ep_master = None
-ep_auth = None
-ep_user = None
-ep_device = None
-ep_firmware = None
-ep_event = None
-ep_telemetry = None
-ep_file = None
+DISCOVERY_URL = 'https://discovery.iotconnect.io'
 
-def configure_using_discovery():
-    from . import apirequest, config
-    global ep_master, ep_auth, ep_user, ep_device, ep_firmware, ep_event, ep_telemetry, ep_file
-    if config.skey is None:
+
+@dataclass(slots=True)
+class Endpoints:
+    """ API base URLs of a solution, obtained with discovery """
+    ep_master: Optional[str] = None
+    ep_auth: Optional[str] = None
+    ep_user: Optional[str] = None
+    ep_device: Optional[str] = None
+    ep_firmware: Optional[str] = None
+    ep_event: Optional[str] = None
+    ep_telemetry: Optional[str] = None
+    ep_file: Optional[str] = None
+
+
+_ENDPOINT_NAMES = frozenset(Endpoints.__slots__)
+
+# Endpoints of the default client, configured by configure_using_discovery()
+default_endpoints = Endpoints()
+
+_current_client = None  # avoid circular dependency
+
+
+def __getattr__(name: str):
+    """ ep_device and other endpoints are those of the client that is active in the current context. See the client module. """
+    global _current_client
+    if name in _ENDPOINT_NAMES:
+        if _current_client is None:
+            from .client import current
+            _current_client = current
+        return getattr(_current_client().endpoints, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _Module(types.ModuleType):
+    def __setattr__(self, name: str, value) -> None:
+        """
+        Assigning ep_device or another endpoint of this module sets the endpoint of the default client, as it did before
+        clients were introduced, rather than creating a module attribute that would hide the endpoints of all clients.
+        """
+        if name in _ENDPOINT_NAMES:
+            setattr(default_endpoints, name, value)
+        else:
+            super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Module
+
+
+def endpoint_key(endpoint: str) -> str:
+    """ Normalized endpoint URL used to key per-endpoint state, like rate limits """
+    return endpoint.rstrip('/').lower()
+
+
+def discover(skey: Optional[str], pf: Optional[str], env: Optional[str], transport) -> Optional[Endpoints]:
+    """ Returns the endpoints of the solution, or None if the solution key is not configured """
+    if skey is None:
         # nothing we can do until the user gives us the information
         # must return silently, and then we can fail when using API URL if this is wrong
-        return
-    version = '2.1' if config.pf == 'aws' else '2'
-    from . import config
+        return None
+    version = '2.1' if pf == 'aws' else '2'
     # do a low level request here without using request local module in order to avoid circular dependencies
-    response = requests.request(method=HTTPMethod.GET, url=f'https://discovery.iotconnect.io/api/uisdk/solutionkey/{config.skey}/env/{config.env}', params={'version': version, 'pf':config.pf}, headers={})
+    response = transport.send(HTTPMethod.GET, f'{DISCOVERY_URL}/api/uisdk/solutionkey/{skey}/env/{env}', params={'version': version, 'pf': pf}, headers={})
     if response.status_code != 200:
-        raise ConfigError(f'Unable to resolve API URLS for platform={config.pf} env={config.env} SKEY={config.skey}. Response code {response.status_code}, body: {response.text}')
+        raise ConfigError(f'Unable to resolve API URLS for platform={pf} env={env} SKEY={skey}. Response code {response.status_code}, body: {response.text}')
 
     d = response.json().get('data')
 
-    ep_master = d.get("masterBaseUrl")
-    ep_auth = d.get("authBaseUrl")
-    ep_user = d.get("userBaseUrl")
-    ep_device = d.get("deviceBaseUrl")
-    ep_firmware = d.get("firmwareBaseUrl")
-    ep_event = d.get("eventBaseUrl")
-    ep_telemetry = d.get("telemetryBaseUrl")
-    ep_file = d.get("fileBaseUrl")
+    return Endpoints(
+        ep_master=d.get("masterBaseUrl"),
+        ep_auth=d.get("authBaseUrl"),
+        ep_user=d.get("userBaseUrl"),
+        ep_device=d.get("deviceBaseUrl"),
+        ep_firmware=d.get("firmwareBaseUrl"),
+        ep_event=d.get("eventBaseUrl"),
+        ep_telemetry=d.get("telemetryBaseUrl"),
+        ep_file=d.get("fileBaseUrl")
+    )
+
+
+def configure_using_discovery():
+    """ Configure the endpoints of the client that is active in the current context (by default, using the config module) """
+    from .client import current
+    client = current()
+    endpoints = discover(client.skey, client.pf, client.env, client.transport)
+    if endpoints is not None:
+        client.endpoints = endpoints
@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides a bounded-concurrency executor for running many API calls in parallel.
+
+Operations are plain callables that take no arguments. Use op() to bind a module function with its arguments:
+
+    results = bulk.run(bulk.op(device.get_by_duid, duid) for duid in duids)
+    for r in results:
+        print(r.index, r.value if r.ok() else r.error)
+
+The operations iterable is consumed lazily and only a limited number of operations is queued at any time,
+so very large (or generated) inputs do not get materialized in memory all at once.
+For best results, keep the max_workers value at or below the sessionpool pool size of the hosts involved.
+"""
+
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+DEFAULT_MAX_WORKERS = 8
+
+Operation = Callable[[], Any]
+
+
+@dataclass
+class BulkResult:
+    index: int  # index of the operation in the input iterable
+    value: Any = field(default=None)  # return value of the operation, if successful
+    error: Optional[Exception] = field(default=None)  # exception raised by the operation, if any
+
+    def ok(self) -> bool:
+        return self.error is None
+
+    def get(self) -> Any:
+        """ Returns the operation return value or raises the exception that the operation raised """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def op(fn: Callable, *args, **kwargs) -> Operation:
+    """ Bind a function and its arguments into an operation. For example: op(device.delete_match_duid, "my-duid") """
+    return functools.partial(fn, *args, **kwargs)
+
+
+def _call(index: int, operation: Operation) -> BulkResult:
+    try:
+        return BulkResult(index, value=operation())
+    except Exception as ex:
+        return BulkResult(index, error=ex)
+
+
+class BulkExecutor:
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_queued: Optional[int] = None):
+        """
+        :param max_workers: Maximum number of operations to run concurrently.
+        :param max_queued: Maximum number of operations submitted but not yet completed. Defaults to twice the max_workers.
+            The operations iterable is not advanced while this many operations are pending.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.max_queued = max_queued or max_workers * 2
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='iotc-bulk')
+
+    def _submit(self, index: int, operation: Operation) -> Future:
+        # run each operation in a copy of the caller's context so that context variables (like deadlines) carry over
+        ctx = contextvars.copy_context()
+        return self._executor.submit(ctx.run, _call, index, operation)
+
+    def as_completed(self, operations: Iterable[Operation]) -> Iterator[BulkResult]:
+        """ Run the operations and yield their results in the order in which they complete """
+        pending: set[Future] = set()
+        it = enumerate(operations)
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.max_queued:
+                    try:
+                        index, operation = next(it)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(self._submit(index, operation))
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    yield f.result()
+        finally:
+            # the caller stopped early. Do not start operations that have not started yet
+            for f in pending:
+                f.cancel()
+
+    def ordered(self, operations: Iterable[Operation]) -> Iterator[BulkResult]:
+        """ Run the operations and yield their results in input order, as soon as each becomes available """
+        results: dict[int, BulkResult] = {}
+        next_index = 0
+        for r in self.as_completed(operations):
+            results[r.index] = r
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+
+    def run(self, operations: Iterable[Operation], ordered: bool = True) -> list[BulkResult]:
+        """
+        Run the operations and return the list of their results.
+
+        :param operations: Iterable of operations (callables taking no arguments). See op().
+        :param ordered: If True, the results are returned in input order. Otherwise, they are in the order of completion.
+        """
+        if ordered:
+            return list(self.ordered(operations))
+        return list(self.as_completed(operations))
+
+    def shutdown(self, wait_for_completion: bool = True) -> None:
+        self._executor.shutdown(wait=wait_for_completion)
+
+
+_default_executor: Optional[BulkExecutor] = None
+_default_lock = threading.Lock()
+
+
+def get_executor() -> BulkExecutor:
+    """ Returns the shared executor, creating it with DEFAULT_MAX_WORKERS if needed """
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = BulkExecutor()
+        return _default_executor
+
+
+def configure(max_workers: int = DEFAULT_MAX_WORKERS, max_queued: Optional[int] = None) -> None:
+    """
+    Replace the shared executor with one that has a different concurrency limit.
+    This should be called before starting any bulk work. Operations already submitted to the previous executor will complete.
+    """
+    global _default_executor
+    with _default_lock:
+        old = _default_executor
+        _default_executor = BulkExecutor(max_workers, max_queued)
+    if old is not None:
+        old.shutdown(wait_for_completion=False)
+
+
+def run(operations: Iterable[Operation], ordered: bool = True) -> list[BulkResult]:
+    return get_executor().run(operations, ordered)
+
+
+def as_completed(operations: Iterable[Operation]) -> Iterator[BulkResult]:
+    return get_executor().as_completed(operations)
+
+
+def ordered(operations: Iterable[Operation]) -> Iterator[BulkResult]:
+    return get_executor().ordered(operations)
@@ -0,0 +1,175 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides a circuit breaker for each API endpoint (like apiurl.ep_file).
+
+When an endpoint fails (5xx, connection errors or timeouts) too many times in a row, its circuit opens
+and requests to it fail immediately with CircuitOpenError instead of waiting for retries and timeouts.
+After the reset timeout, a limited number of trial requests are let through (half-open state).
+If they succeed, the circuit closes again. If they fail, the circuit opens again.
+Other endpoints are not affected.
+"""
+
+import threading
+import time
+from http import HTTPStatus
+from typing import Optional
+
+from . import apiurl
+from .error import CircuitOpenError
+
+enabled = True  # set to False to disable circuit breakers
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+DEFAULT_FAILURE_THRESHOLD = 5  # consecutive failures that open the circuit
+DEFAULT_RESET_TIMEOUT = 30.0  # seconds to wait in open state before trying again
+DEFAULT_HALF_OPEN_MAX_CALLS = 1  # number of concurrent trial requests allowed in half-open state
+DEFAULT_SUCCESS_THRESHOLD = 1  # successful trial requests needed to close the circuit
+
+
+def _is_failure(status: Optional[int]) -> bool:
+    """ None status indicates a connection error or a timeout """
+    return status is None or status >= HTTPStatus.INTERNAL_SERVER_ERROR.value
+
+
+class CircuitBreaker:
+    """ Thread-safe circuit breaker for a single endpoint """
+
+    def __init__(
+            self,
+            name: str = "",
+            failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+            reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+            half_open_max_calls: int = DEFAULT_HALF_OPEN_MAX_CALLS,
+            success_threshold: int = DEFAULT_SUCCESS_THRESHOLD
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.success_threshold = success_threshold
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._successes = 0
+        self._trial_calls = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def _update_state(self) -> None:
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = STATE_HALF_OPEN
+            self._successes = 0
+            self._trial_calls = 0
+
+    def _open(self) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._failures = 0
+
+    def before_call(self) -> None:
+        """ Raises CircuitOpenError if the request should not be sent """
+        with self._lock:
+            self._update_state()
+            if self._state == STATE_OPEN:
+                remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+                raise CircuitOpenError(f'Circuit breaker for {self.name} is open. Retry in {remaining:.1f} seconds.')
+            if self._state == STATE_HALF_OPEN:
+                if self._trial_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError(f'Circuit breaker for {self.name} is half-open and waiting for trial requests to complete.')
+                self._trial_calls += 1
+
+    def record(self, status: Optional[int]) -> None:
+        """
+        Record the outcome of a request that was allowed by before_call().
+
+        :param status: HTTP status of the response, or None if the request failed with a connection error or a timeout.
+        """
+        failed = _is_failure(status)
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._trial_calls -= 1
+                if failed:
+                    self._open()
+                else:
+                    self._successes += 1
+                    if self._successes >= self.success_threshold:
+                        self._state = STATE_CLOSED
+                        self._failures = 0
+            elif self._state == STATE_CLOSED:
+                if failed:
+                    self._failures += 1
+                    if self._failures >= self.failure_threshold:
+                        self._open()
+                else:
+                    self._failures = 0
+            # in open state, late results of requests sent before the circuit opened are ignored
+
+    def cancel(self) -> None:
+        """ Release a request that was allowed by before_call() but was not sent, without recording an outcome """
+        with self._lock:
+            if self._state == STATE_HALF_OPEN and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    def reset(self) -> None:
+        """ Force the circuit to the closed state """
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+
+
+class CircuitBreakers:
+    """ Thread-safe registry of circuit breakers keyed by endpoint """
+
+    def __init__(self, **breaker_args):
+        """ :param breaker_args: Arguments that will be passed to each CircuitBreaker created by this registry """
+        self._breaker_args = breaker_args
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def configure(self, endpoint: str, **breaker_args) -> None:
+        """ Replace the circuit breaker of the given endpoint with one that has the given CircuitBreaker arguments """
+        key = apiurl.endpoint_key(endpoint)
+        with self._lock:
+            self._breakers[key] = CircuitBreaker(key, **breaker_args)
+
+    def get_breaker(self, endpoint: str) -> CircuitBreaker:
+        key = apiurl.endpoint_key(endpoint)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = CircuitBreaker(key, **self._breaker_args)
+                    self._breakers[key] = breaker
+        return breaker
+
+    def states(self) -> dict[str, str]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {k: v.state for k, v in breakers.items()}
+
+
+_default_breakers = CircuitBreakers()
+
+
+def get_breakers() -> CircuitBreakers:
+    return _default_breakers
+
+
+def configure(endpoint: str, **breaker_args) -> None:
+    _default_breakers.configure(endpoint, **breaker_args)
+
+
+def get_state(endpoint: str) -> str:
+    return _default_breakers.get_breaker(endpoint).state
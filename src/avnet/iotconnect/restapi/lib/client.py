@@ -0,0 +1,191 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides Client objects, which let one process make API calls for several IoTConnect solutions.
+
+A Client owns the solution key, platform and environment of a solution, its discovered endpoints,
+its access token (with the cached authorization headers and the background token refresher),
+its connection pool and its response cache. The API functions of this package use the client that is active
+in the current thread or asyncio task, which is set with Client.use():
+
+    tenant = client.Client(skey='...', pf='aws', env='poc')
+    tenant.authenticate(username, password)
+    with tenant.use():
+        devices = device.query()
+
+Different threads and tasks can use different clients at the same time. Background work started by an API call,
+like hedged requests, prefetched pages and bulk operations, uses the client of the caller.
+The asyncio API of the aio package uses the transport and the response cache of the active client as well,
+except that a client with the default transport sends asyncio requests with an httpx client of each event loop.
+
+Without an active client, the API functions use the default client, which is made of the module-level
+configuration: the config module (with its configuration file), apiurl.default_endpoints, transport.get_transport()
+and httpcache.get_cache(). Tokens of Client objects are kept in memory only.
+Rate limits, circuit breakers and concurrency windows are kept per endpoint and are shared by all clients.
+"""
+
+import contextlib
+import contextvars
+import threading
+from typing import Optional, Iterator, ContextManager
+
+from . import apiurl, config, httpcache, sessionpool
+from .transport import Transport, RequestsTransport, get_transport
+
+
+class Client:
+    """ Configuration, endpoints, tokens, connection pool and response cache of an IoTConnect solution """
+
+    def __init__(
+            self,
+            skey: str,
+            pf: str = config.PF_AWS,
+            env: str = config.ENV_POC,
+            access_token: Optional[str] = None,
+            refresh_token: Optional[str] = None,
+            token_expiry: float = 0,
+            token_time: float = 0,
+            username: Optional[str] = None,
+            transport: Optional[Transport] = None,
+            cache: Optional[httpcache.ResponseCache] = None
+    ):
+        """
+        :param skey: Solution key.
+        :param pf: Platform. See config.PF_CHOICES.
+        :param env: Environment. See config.ENV_CHOICES.
+        :param access_token: Access token obtained earlier, along with refresh_token, token_expiry and token_time
+            (timestamps). If not provided, call authenticate() before making API calls.
+        :param username: Recorded for looking up the current user, like config.username.
+        :param transport: Transport used for the API calls. If not provided, the client uses a connection pool of its own.
+        :param cache: Response cache. If not provided, the client uses a cache of its own.
+        """
+        self.skey = skey
+        self.pf = pf
+        self.env = env
+        self.username = username
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.token_expiry = token_expiry
+        self.token_time = token_time
+        self._owns_transport = transport is None
+        self.transport = transport if transport is not None else RequestsTransport(sessionpool.SessionPool())
+        self.cache = cache if cache is not None else httpcache.ResponseCache()
+        self._endpoints: Optional[apiurl.Endpoints] = None
+        self._endpoints_lock = threading.Lock()
+        self._init_auth()
+
+    def _init_auth(self) -> None:
+        # state of the credentials module for this client
+        self._auth_state = None
+        self._refresher = None
+        self._refresher_lock = threading.Lock()
+
+    @property
+    def endpoints(self) -> apiurl.Endpoints:
+        """ API endpoints of the solution, discovered on first use """
+        if self._endpoints is None:
+            with self._endpoints_lock:
+                if self._endpoints is None:
+                    self._endpoints = apiurl.discover(self.skey, self.pf, self.env, self.transport) or apiurl.Endpoints()
+        return self._endpoints
+
+    @endpoints.setter
+    def endpoints(self, endpoints: apiurl.Endpoints) -> None:
+        self._endpoints = endpoints
+
+    def write(self) -> bool:
+        """ Store the tokens after they changed. Tokens of clients are kept in memory only. """
+        return True
+
+    def reload_tokens(self) -> bool:
+        """ Adopt tokens stored by other processes. Returns True if the tokens were replaced. See config.reload_tokens(). """
+        return False
+
+    def refresh_lease(self) -> ContextManager[bool]:
+        """ Lease for refreshing the token, shared with other processes. See config.refresh_lease(). """
+        return contextlib.nullcontext(True)
+
+    @contextlib.contextmanager
+    def use(self) -> Iterator['Client']:
+        """ Make the API functions use this client in the current thread or asyncio task until the block exits """
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def authenticate(self, username: str, password: str) -> None:
+        """ Obtain an access token for this client. See credentials.authenticate(). """
+        from . import credentials
+        with self.use():
+            credentials.authenticate(username, password)
+
+    def close(self) -> None:
+        """ Stop the background token refresher of this client and close its connections """
+        from . import credentials
+        with self.use():
+            credentials.stop_refresher()
+        if self._owns_transport:
+            self.transport.close()
+
+
+def _config_property(name: str) -> property:
+    return property(lambda self: getattr(config, name), lambda self, value: setattr(config, name, value))
+
+
+class _DefaultClient(Client):
+    """ The client made of the module-level configuration """
+
+    skey = _config_property('skey')
+    pf = _config_property('pf')
+    env = _config_property('env')
+    username = _config_property('username')
+    access_token = _config_property('access_token')
+    refresh_token = _config_property('refresh_token')
+    token_expiry = _config_property('token_expiry')
+    token_time = _config_property('token_time')
+
+    # noinspection PyMissingConstructor
+    def __init__(self):
+        self._init_auth()
+
+    @property
+    def endpoints(self) -> apiurl.Endpoints:
+        return apiurl.default_endpoints
+
+    @endpoints.setter
+    def endpoints(self, endpoints: apiurl.Endpoints) -> None:
+        apiurl.default_endpoints = endpoints
+
+    @property
+    def transport(self) -> Transport:
+        return get_transport()
+
+    @property
+    def cache(self) -> httpcache.ResponseCache:
+        return httpcache.get_cache()
+
+    def write(self) -> bool:
+        return config.write()
+
+    def reload_tokens(self) -> bool:
+        return config.reload_tokens()
+
+    def refresh_lease(self) -> ContextManager[bool]:
+        return config.refresh_lease()
+
+    def close(self) -> None:
+        from . import credentials
+        with self.use():
+            credentials.stop_refresher()
+
+
+default = _DefaultClient()
+_current: contextvars.ContextVar[Client] = contextvars.ContextVar('iotc_client', default=default)
+
+
+def current() -> Client:
+    """ Returns the client used by API calls in the current context """
+    return _current.get()
@@ -10,7 +10,7 @@ from .apirequest import request
 from .error import UsageError, ConflictResponseError
 
 
-@dataclass
+@dataclass(slots=True)
 class Command:
     guid: str
     command: str
@@ -36,8 +36,7 @@ def get_all(template_guid: str) -> List[Command]:
 
     try:
         response = request(apiurl.ep_device, f'/template-command/{template_guid}')
-        ret = response.data.get()
-        return [Command(**x) for x in ret]
+        return response.data.get(dc=Command)
     except ConflictResponseError:
         return []
 
@@ -78,5 +77,4 @@ def send(command_guid: str, device_guid: str, parameters: str = None) -> None:
         "commandGuid": command_guid,
         "parameterValue": parameters
     }
-    response = request(apiurl.ep_device, f'/template-command/device/{device_guid}/send', json=data)
-    return response.data.get_one()
+    request(apiurl.ep_device, f'/template-command/device/{device_guid}/send', json=data)
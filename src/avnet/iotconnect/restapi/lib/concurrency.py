@@ -0,0 +1,237 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides adaptive (AIMD) concurrency control for each API endpoint (like apiurl.ep_device).
+
+Each endpoint has a concurrency window, which is the number of requests that may be in flight at the same time.
+The window grows additively (by about one request per window of completed requests) while the p95 latency
+and the error rate stay healthy, and it is halved when the server throttles us (429), fails (5xx) or times out.
+Callers that exceed the window wait until another request to the same endpoint completes.
+The window starts at DEFAULT_INITIAL_WINDOW requests, so an application that sends more concurrent requests
+to one endpoint is held back until the window grows. Set enabled to False to send all requests right away.
+
+Use get_window() or stats() to monitor the current state.
+"""
+
+import asyncio
+import math
+import statistics
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from typing import Optional
+
+from . import apiurl
+
+enabled = True  # set to False to disable concurrency control
+
+DEFAULT_INITIAL_WINDOW = 16
+DEFAULT_MIN_WINDOW = 1
+DEFAULT_MAX_WINDOW = 256
+SAMPLE_SIZE = 100  # number of recent requests used to compute latency percentiles and error rates
+LATENCY_TOLERANCE = 3.0  # p95 latency is considered healthy if it is within this factor of the best observed median latency
+MAX_ERROR_RATE = 0.05  # the error rate above which the window will not grow
+
+
+def _is_failure(status: Optional[int]) -> bool:
+    """ Returns True if the status (or a missing status, for a connection error or timeout) indicates an overloaded server """
+    return status is None or status == HTTPStatus.TOO_MANY_REQUESTS.value or status >= HTTPStatus.INTERNAL_SERVER_ERROR.value
+
+
+class AdaptiveLimit:
+    """ Thread-safe AIMD concurrency window for a single endpoint """
+
+    def __init__(
+            self,
+            initial_window: int = DEFAULT_INITIAL_WINDOW,
+            min_window: int = DEFAULT_MIN_WINDOW,
+            max_window: int = DEFAULT_MAX_WINDOW,
+            max_p95: Optional[float] = None
+    ):
+        """
+        :param initial_window: Initial number of concurrent requests.
+        :param min_window: The window will never shrink below this value.
+        :param max_window: The window will never grow above this value.
+        :param max_p95: Optional p95 latency in seconds above which the window will not grow.
+            If not provided, LATENCY_TOLERANCE times the best observed median latency is used.
+        """
+        self.min_window = min_window
+        self.max_window = max_window
+        self.max_p95 = max_p95
+        self._window = float(max(min_window, min(initial_window, max_window)))
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._latencies: deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self._failures: deque[bool] = deque(maxlen=SAMPLE_SIZE)
+        self._failure_count = 0  # number of failures in _failures
+        self._best_median: Optional[float] = None
+        self._last_decrease = 0.0
+        self._healthy = True
+        self._last_check = 0.0
+
+    @property
+    def window(self) -> int:
+        return int(self._window)
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Wait for a free slot in the window.
+
+        :param timeout: Maximum number of seconds to wait. None means wait forever.
+        :return: The start time that should be passed to release(), or None if the timeout expired.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._in_flight < int(self._window), timeout):
+                return None
+            self._in_flight += 1
+        return time.monotonic()
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> Optional[float]:
+        """ Asyncio counterpart of acquire(), which waits for a free slot without blocking the event loop """
+        loop = asyncio.get_running_loop()
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._in_flight < int(self._window):
+                    self._in_flight += 1
+                    return time.monotonic()
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, None if end is None else max(0.0, end - time.monotonic()))
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                with self._cond:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+    def release(self, start: float, status: Optional[int]) -> None:
+        """
+        Record the outcome of a request and free its slot.
+
+        :param start: Value returned by acquire().
+        :param status: HTTP status of the response, or None if the request failed with a connection error or a timeout.
+        """
+        now = time.monotonic()
+        latency = now - start
+        failed = _is_failure(status)
+        with self._cond:
+            self._in_flight -= 1
+            if len(self._failures) == SAMPLE_SIZE:
+                self._failure_count -= self._failures[0]
+            self._failures.append(failed)
+            self._failure_count += failed
+            if failed:
+                # decrease at most once per latency period, so that a burst of failures from requests
+                # that were all sent with the same window does not collapse the window entirely
+                if now - self._last_decrease > latency:
+                    self._window = max(float(self.min_window), self._window / 2)
+                    self._last_decrease = now
+            else:
+                self._latencies.append(latency)
+                # only grow if the window is actually being used
+                if self._in_flight + 1 >= int(self._window) and self._check_health(now, latency):
+                    self._window = min(float(self.max_window), self._window + 1.0 / self._window)
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # the event loop of the waiter was closed
+
+    def _p95(self) -> Optional[float]:
+        if len(self._latencies) < 2:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def _check_health(self, now: float, latency: float) -> bool:
+        # the percentiles change little with each request, so they are recomputed at most once per latency period
+        if now - self._last_check > latency:
+            self._healthy = self._is_healthy()
+            self._last_check = now
+        return self._healthy
+
+    def _is_healthy(self) -> bool:
+        if len(self._failures) and self._failure_count / len(self._failures) > MAX_ERROR_RATE:
+            return False
+        p95 = self._p95()
+        if p95 is None:
+            return True
+        median = statistics.median(self._latencies)
+        if self._best_median is None or median < self._best_median:
+            self._best_median = median
+        threshold = self.max_p95 if self.max_p95 is not None else self._best_median * LATENCY_TOLERANCE
+        return p95 <= threshold
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "window": int(self._window),
+                "in_flight": self._in_flight,
+                "p95": self._p95(),
+                "error_rate": self._failure_count / len(self._failures) if len(self._failures) else 0.0,
+            }
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class ConcurrencyController:
+    """ Thread-safe registry of adaptive concurrency windows keyed by endpoint """
+
+    def __init__(self, **limit_args):
+        """ :param limit_args: Arguments that will be passed to each AdaptiveLimit created by this controller """
+        self._limit_args = limit_args
+        self._lock = threading.Lock()
+        self._limits: dict[str, AdaptiveLimit] = {}
+
+    def configure(self, endpoint: str, **limit_args) -> None:
+        """ Replace the window of the given endpoint with one that has the given AdaptiveLimit arguments """
+        with self._lock:
+            self._limits[apiurl.endpoint_key(endpoint)] = AdaptiveLimit(**limit_args)
+
+    def get_limit(self, endpoint: str) -> AdaptiveLimit:
+        key = apiurl.endpoint_key(endpoint)
+        limit = self._limits.get(key)
+        if limit is None:
+            with self._lock:
+                limit = self._limits.get(key)
+                if limit is None:
+                    limit = AdaptiveLimit(**self._limit_args)
+                    self._limits[key] = limit
+        return limit
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            limits = dict(self._limits)
+        return {k: v.stats() for k, v in limits.items()}
+
+
+_default_controller = ConcurrencyController()
+
+
+def get_controller() -> ConcurrencyController:
+    return _default_controller
+
+
+def configure(endpoint: str, **limit_args) -> None:
+    _default_controller.configure(endpoint, **limit_args)
+
+
+def get_window(endpoint: str) -> int:
+    """ Returns the current concurrency window for the given endpoint """
+    return _default_controller.get_limit(endpoint).window
+
+
+def stats() -> dict[str, dict]:
+    """ Returns window, in-flight request count, p95 latency and error rate for each endpoint """
+    return _default_controller.stats()
@@ -7,8 +7,9 @@ import datetime
 import json
 import os
 import pathlib
+import threading
 from collections.abc import MutableMapping
-from typing import Optional, Tuple
+from typing import Optional, Tuple, ContextManager
 
 import platformdirs
 from cryptography import x509
@@ -16,7 +17,7 @@ from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.x509.oid import NameOID
 
-from . import apiurl, accesstoken
+from . import apiurl, accesstoken, filelock, transport
 
 # Environment constants
 PF_AZ = "az"
@@ -33,6 +34,11 @@ SECTION_DEFAULT = 'default'
 SECTION_SETTINGS = 'settings'
 SECTION_USER = 'user'
 
+# The configuration file is shared by all processes of the user. It is replaced atomically while holding a lock,
+# and token refreshes are coordinated with a lease, so that one process refreshes the token and the others read it.
+WRITE_LOCK_TIMEOUT = 10  # seconds to wait for the configuration file lock before writing without it
+REFRESH_LEASE_TIMEOUT = 60  # seconds to wait for another process to complete a token refresh
+
 # -- BEGIN CONFIGURABLE VALUES --- #
 
 # credentials and environment setup ------
@@ -56,6 +62,7 @@ _cp = configparser.ConfigParser()
 _app_config_dir = platformdirs.AppDirs(appname="iotconnect").user_config_dir
 _app_config_file = os.path.join(_app_config_dir, "apicfg.ini")
 _is_initialized = False
+_file_stamp: Optional[tuple[int, int, int]] = None  # (mtime, size, inode) of the file when it was last read or written
 
 def init() -> None:
     global _is_initialized, api_trace_enabled
@@ -79,6 +86,8 @@ def init() -> None:
         print("File %s is not Writeable" % _app_config_file)
         return
     _cp.read(_app_config_file)
+    global _file_stamp
+    _file_stamp = _stamp()
 
     # override only if environment variable is not set by manually setting it in config
     if not api_trace_enabled:
@@ -95,7 +104,8 @@ def init() -> None:
         token_time = int(section['token_time'])
         token_expiry = int(section['token_expiry'])
 
-        apiurl.configure_using_discovery()
+        # the endpoints of the default client. See the client module.
+        apiurl.default_endpoints = apiurl.discover(skey, env=env, pf=pf, transport=transport.get_transport())
 
 
 
@@ -104,8 +114,16 @@ def is_valid() -> bool:
 
 
 def write() -> bool:
+    """ Store the configuration. Returns False if the file could not be written. """
+    global _file_stamp
+    temp_file = f'{_app_config_file}.{os.getpid()}.{threading.get_ident()}.tmp'
     try:
-        with open(_app_config_file, 'w') as app_config_file:
+        with filelock.locked(_app_config_file + '.lock', WRITE_LOCK_TIMEOUT):
+            # keep the sections and settings that other processes wrote since this process last read the file
+            try:
+                _cp.read(_app_config_file)
+            except configparser.Error:
+                pass
             if not _cp.has_section(SECTION_DEFAULT):
                 _cp.add_section(SECTION_DEFAULT)
             default = get_section(SECTION_DEFAULT)
@@ -123,12 +141,69 @@ def write() -> bool:
             section['token_time'] = str(round(token_time))
             section['token_expiry'] = str(round(token_expiry))
 
-            # PyCharm seems to get this wrong: Expected type 'SupportsWrite[str]', got 'TextIO' instead
-            # noinspection PyTypeChecker
-            _cp.write(app_config_file)
+            # write a new file and replace the old one, so that other processes never read a partially written file
+            with open(os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as app_config_file:
+                # PyCharm seems to get this wrong: Expected type 'SupportsWrite[str]', got 'TextIO' instead
+                # noinspection PyTypeChecker
+                _cp.write(app_config_file)
+                app_config_file.flush()
+                os.fsync(app_config_file.fileno())
+            os.replace(temp_file, _app_config_file)
+            _file_stamp = _stamp()
         return True
     except OSError:
         print("Could not write to %s" % _app_config_file)
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        return False
+
+
+def _stamp() -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(_app_config_file)
+        return st.st_mtime_ns, st.st_size, st.st_ino
+    except OSError:
+        return None
+
+
+def reload_tokens() -> bool:
+    """
+    Adopt the tokens from the configuration file if another process wrote new tokens of the same account
+    since this process last read or wrote it. The file is only parsed if its modification time, size or inode changed,
+    so this is cheap to call often. Returns True if the tokens were replaced.
+    """
+    global _file_stamp, access_token, refresh_token, token_time, token_expiry
+    stamp = _stamp()
+    if stamp is None or stamp == _file_stamp:
+        return False
+    cp = configparser.ConfigParser()
+    try:
+        cp.read(_app_config_file)
+    except configparser.Error:
+        return False
+    _file_stamp = stamp
+    if not cp.has_section(SECTION_USER):
+        return False
+    section = cp[SECTION_USER]
+    if section.get('access_token') is None or (section.get('skey'), section.get('env'), section.get('pf')) != (skey, env, pf):
+        return False  # not the account that this process uses
+    if section['access_token'] == access_token and section.get('refresh_token') == refresh_token:
+        return False
+    access_token = section['access_token']
+    refresh_token = section.get('refresh_token')
+    token_time = int(section['token_time'])
+    token_expiry = int(section['token_expiry'])
+    return True
+
+
+def refresh_lease() -> ContextManager[bool]:
+    """
+    Returns a context manager that holds the token refresh lease of the processes that share the configuration file.
+    It yields False if the lease could not be acquired in time, in which case the caller may refresh anyway.
+    """
+    return filelock.locked(_app_config_file + '.refresh', REFRESH_LEASE_TIMEOUT)
 
 
 # user can call this to lazy init section in preparation for read or write of individual section values
@@ -146,7 +221,8 @@ def is_dedicated_instance() -> bool:
         return is_dedicated
     else:
         # temporary workaround for issue https://avnet.iotconnect.io/support-info/2025012718120357
-        return pf == PF_AWS and env == ENV_PROD
+        from .client import current
+        return current().pf == PF_AWS and current().env == ENV_PROD
 
 
 def get_mqtt_client_id(duid: str) -> str:
@@ -163,11 +239,12 @@ def generate_device_json(duid: str, auth_type: int = 2) -> str:
     :param auth_type: 2 for Self-signed. 1 for CA-Signed authentication.
     :return:
     """
+    from .client import current
     device_json = {
         "ver": "2.1",
-        "pf": pf,
+        "pf": current().pf,
         "cpid": accesstoken.decode_access_token().user.cpId,
-        "env": env,
+        "env": current().env,
         "uid": duid,
         "did": get_mqtt_client_id(duid),
         "at": auth_type,
@@ -2,87 +2,312 @@
 # Copyright (C) 2025 Avnet
 # Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
 
-"""This module provides IoTConnect authentication functionality."""
-import datetime
+"""
+This module provides IoTConnect authentication functionality.
+
+The functions of this module use the client that is active in the current context. See the client module.
+
+The authorization headers of API requests are built once per access token and reused by all requests.
+A background thread renews the access token shortly before it would otherwise be refreshed by check(),
+so that API calls do not wait for the token refresh.
+
+Token refreshes are single-flight: when several threads need to refresh the same token at the same time,
+one of them refreshes it and the others wait for the new token. Across processes that share the configuration file,
+a refresh lease ensures that one process refreshes the token and the others read the new token from the file. Requests that are rejected because their
+token expired or was revoked are replayed once with a renewed token. See renew_auth_headers().
+"""
 import os
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Optional
 
-from . import apiurl, config
+from . import accesstoken, apiurl, client, config, singleflight
 from .apirequest import Headers, request
-from .error import UsageError, AuthError
+from .error import UsageError, AuthError, ApiException
+
+REFRESH_INTERVAL = 3600  # check() refreshes tokens older than this many seconds
+REFRESH_AHEAD = 300  # the background refresher renews the token this many seconds before check() would
+REFRESH_RETRY_INTERVAL = 30  # seconds between attempts of the background refresher after a failure
+REFRESH_RETRY_MAX_INTERVAL = 3600  # the background refresher backs off up to this many seconds while the server rejects the refresh token
+REAUTH_MIN_AGE = 60  # a rejected request does not cause a refresh of a token that is younger than this many seconds
+
+# set to False to only refresh the token when check() requires it, during an API call
+background_refresh = True
+
+
+@dataclass(slots=True, frozen=True)
+class _AuthState:
+    token: str
+    headers: dict[str, str]  # shared by requests. Must not be modified.
+    valid_until: float  # timestamp after which check() must be called again
+    account: str  # identifies the account of the token. See account_of().
+
+
+_refreshes = singleflight.Group()  # token refreshes in flight, keyed by the refresh token
 
 
 def _ts_now():
-    return datetime.datetime.now(datetime.timezone.utc).timestamp()
+    return time.time()
+
+
+def _refresh_disabled() -> bool:
+    return os.environ.get('IOTC_API_NO_TOKEN_REFRESH') is not None
 
 
 def check() -> None:
-    if config.access_token is None:
+    c = client.current()
+    if c.access_token is None:
         raise UsageError("No access token configured. Please configure the API.")
     else:
-        if config.token_expiry < _ts_now():
-            raise AuthError("Token expired")
+        token = c.refresh_token  # read first, so that a refresh completed meanwhile by another thread is not repeated
+        if c.token_expiry < _ts_now():
+            if c.refresh_token is None or _refresh_disabled():
+                raise AuthError("Token expired")
+            # the refresh token may outlive the access token, for example after the process was suspended
+            try:
+                _refresh_once(token)
+            except ApiException as ex:
+                raise AuthError("Token expired") from ex
+            return
         if should_refresh():
             # It's been longer than an hour since we refreshed the token. We should refresh it now.
-            refresh()
+            _refresh_once(token)
 
 
 def authenticate(username: str, password: str) -> None:
     """Record access token from IoT Connect and return it. Entrance point to this module"""
+    c = client.current()
     missing_args = []
     if username is None:
         missing_args.append("Username")
     if password is None:
         missing_args.append("Password")
-    if config.skey is None:
+    if c.skey is None:
         missing_args.append("Solution Key")
     if len(missing_args):
         raise UsageError('authenticate: The following arguments are missing: %s' % ", ".join(missing_args))
     if config.api_trace_enabled:
-        print(f"Solution Key: {config.skey}")
+        print(f"Solution Key: {c.skey}")
     basic_token = _get_basic_token()
     headers = {
         Headers.N_ACCEPT: Headers.V_APP_JSON,
         Headers.N_AUTHORIZATION: 'Basic %s' % basic_token,
-        "Solution-key": config.skey
+        "Solution-key": c.skey
     }
     data = {
         "username": username,
         "password": password
     }
     response = request(apiurl.ep_auth, "/Auth/login", json=data, headers=headers)
-    config.access_token = response.body.get_object_value("access_token")
-    config.refresh_token = response.body.get_object_value("refresh_token")
+    c.access_token = response.body.get_object_value("access_token")
+    c.refresh_token = response.body.get_object_value("refresh_token")
     expires_in = response.body.get_object_value("expires_in")
-    config.token_time = _ts_now()
-    config.token_expiry = config.token_time + expires_in
-    config.username = username
-    config.write()
+    c.token_time = _ts_now()
+    c.token_expiry = c.token_time + expires_in
+    c.username = username
+    c.write()
+    _wake_refresher()
 
 
 def should_refresh() -> bool:
-    return config.token_time + 3600 < _ts_now() and os.environ.get('IOTC_API_NO_TOKEN_REFRESH') is None
+    return client.current().token_time + REFRESH_INTERVAL < _ts_now() and not _refresh_disabled()
 
 
 def refresh() -> None:
-    data = {
-        "refreshtoken": config.refresh_token
-    }
-    response = request(apiurl.ep_auth, "/Auth/refresh-token", json=data, headers={})
-    config.access_token = response.body.get_object_value("access_token")
-    config.refresh_token = response.body.get_object_value("refresh_token")
-    expires_in = response.body.get_object_value("expires_in")
-    config.token_time = _ts_now()
-    config.token_expiry = config.token_time + expires_in
-    config.write()
+    """ Refresh the access token. If a refresh of the same token is already in flight, wait for it instead. """
+    _refresh_once(client.current().refresh_token)
+
+
+def _refresh_once(token: Optional[str]) -> None:
+    """ Refresh the given refresh token, unless another thread is refreshing it or has already refreshed it """
+    _refreshes.do(token, lambda: _refresh(token))
+
+
+def _refresh(token: Optional[str]) -> None:
+    c = client.current()
+    with c.refresh_lease():
+        # another process may have refreshed the token while this one waited for the lease
+        c.reload_tokens()
+        if token != c.refresh_token:
+            _wake_refresher()
+            return  # already refreshed
+        data = {
+            "refreshtoken": token
+        }
+        response = request(apiurl.ep_auth, "/Auth/refresh-token", json=data, headers={})
+        c.access_token = response.body.get_object_value("access_token")
+        c.refresh_token = response.body.get_object_value("refresh_token")
+        expires_in = response.body.get_object_value("expires_in")
+        c.token_time = _ts_now()
+        c.token_expiry = c.token_time + expires_in
+        c.write()
+    _wake_refresher()
+
+
+def auth_headers() -> dict[str, str]:
+    """
+    Returns the headers used to authenticate API calls with the access token. The returned dictionary is shared and must not be modified.
+    The headers are rebuilt only when the access token changes or check() needs to be called again.
+    """
+    return cached_auth_headers() or _build_state().headers
 
 
 def get_auth_headers(accept=Headers.V_APP_JSON) -> dict[str, str]:
     """  Helper: Returns a shallow copy of headers used to authenticate other API call with the access token  """
-    check()
-    return dict({
-        Headers.N_ACCEPT: accept,
-        Headers.N_AUTHORIZATION: "Bearer " + config.access_token
-    })
+    return dict(auth_headers(), **{Headers.N_ACCEPT: accept})
+
+
+def renew_auth_headers(rejected: dict[str, str]) -> Optional[dict[str, str]]:
+    """
+    Called when the server rejects the token of a request that was sent with the given auth_headers(),
+    with 401, or with 403 and a message that says that the token expired or is invalid.
+    Refreshes the token, unless another thread renewed it after the request was sent,
+    and returns the headers for replaying the request. Returns None if the request should not be replayed,
+    because the token cannot be refreshed or was issued too recently for a refresh to help.
+    """
+    c = client.current()
+    token = c.refresh_token
+    try:
+        if c.access_token is not None and rejected.get(Headers.N_AUTHORIZATION) == "Bearer " + c.access_token:
+            # the rejected token is still the current one
+            if token is None or _refresh_disabled() or c.token_time + REAUTH_MIN_AGE > _ts_now():
+                return None
+            _refresh_once(token)
+        return auth_headers()
+    except ApiException as ex:
+        if config.api_trace_enabled:
+            print("Token renewal failed: %s" % ex)
+        return None
+
+
+def account_of(headers: dict[str, str]) -> Optional[str]:
+    """
+    Returns an identifier of the account (user and solution) of the access token in the given auth_headers(),
+    which does not change when the token is refreshed. Returns None if the headers are not the current auth_headers().
+    """
+    state = client.current()._auth_state
+    return state.account if state is not None and state.headers is headers else None
+
+
+def _account() -> str:
+    c = client.current()
+    try:
+        token = accesstoken.decode_access_token()
+    except (ValueError, TypeError, KeyError):
+        token = None
+    if token is None or token.user is None:
+        return c.access_token  # the account is not known, so every token is treated as a different account
+    return f'{token.user.solutionGuid}/{token.user.id}'
+
+
+def cached_auth_headers() -> Optional[dict[str, str]]:
+    """
+    Returns auth_headers() if they are already built for the current access token, or None if they need to be built,
+    which may refresh the token and write the configuration file. Unlike auth_headers(), this never blocks,
+    so it can be called from an event loop.
+    """
+    c = client.current()
+    state = c._auth_state
+    if state is None or state.token != c.access_token or state.valid_until <= _ts_now():
+        return None
+    return state.headers
+
+
+def _build_state() -> _AuthState:
+    c = client.current()
+    c.reload_tokens()  # another process may have refreshed the token
+    check()  # refreshes the token in the foreground only if the background refresher did not renew it in time
+    valid_until = c.token_expiry
+    if not _refresh_disabled():
+        valid_until = min(valid_until, c.token_time + REFRESH_INTERVAL)
+        if background_refresh:
+            start_refresher()
+    headers = {
+        Headers.N_ACCEPT: Headers.V_APP_JSON,
+        Headers.N_AUTHORIZATION: "Bearer " + c.access_token
+    }
+    account = _account()
+    if c._auth_state is not None and c._auth_state.account != account:
+        c.cache.clear()  # the cached responses of the previous account can no longer be used
+    c._auth_state = _AuthState(c.access_token, headers, valid_until, account)
+    return c._auth_state
+
+
+def start_refresher() -> None:
+    """ Start the background token refresher, if it is not running. It is started automatically by the first API call. """
+    c = client.current()
+    with c._refresher_lock:
+        if c._refresher is None or not c._refresher.is_alive():
+            c._refresher = _Refresher(c)
+            c._refresher.start()
+
+
+def stop_refresher(timeout: Optional[float] = None) -> None:
+    """ Stop the background token refresher and wait for it to exit. An API call made afterwards starts it again. """
+    c = client.current()
+    with c._refresher_lock:
+        refresher, c._refresher = c._refresher, None
+    if refresher is not None:
+        refresher.stopped = True
+        refresher.wake.set()
+        if refresher is not threading.current_thread():
+            refresher.join(timeout)
+
+
+def _wake_refresher() -> None:
+    """ Let the refresher reschedule after the token has changed """
+    refresher = client.current()._refresher
+    if refresher is not None:
+        refresher.wake.set()
+
+
+class _Refresher(threading.Thread):
+    def __init__(self, c: client.Client):
+        super().__init__(name='iotc-token-refresh', daemon=True)
+        self.client = c
+        self.wake = threading.Event()
+        self.stopped = False
+
+    def run(self) -> None:
+        with self.client.use():
+            self._run(self.client)
+
+    def _run(self, c: client.Client) -> None:
+        rejected = None  # the refresh token that was last rejected by the server
+        backoff = REFRESH_RETRY_INTERVAL
+        while not self.stopped:
+            self.wake.clear()
+            if c.access_token is None or not background_refresh or _refresh_disabled():
+                return
+            if rejected is not None and rejected != c.refresh_token:
+                rejected, backoff = None, REFRESH_RETRY_INTERVAL  # the token was replaced
+            # renew before check() would, and before the token expires, but not right after the previous refresh
+            due = min(c.token_time + REFRESH_INTERVAL, c.token_expiry) - REFRESH_AHEAD
+            delay = max(due, c.token_time + REFRESH_RETRY_INTERVAL) - _ts_now()
+            if delay > 0:
+                self.wake.wait(delay)
+                continue
+            token = c.refresh_token
+            try:
+                refresh()
+            except Exception as ex:
+                # check() still refreshes the token in the foreground if this keeps failing
+                if config.api_trace_enabled:
+                    print("Background token refresh failed: %s" % ex)
+                if isinstance(ex, ApiException) and _is_rejection(ex.status):
+                    # retrying soon will not help, unless the token is replaced, which wakes this thread
+                    rejected = token
+                    self.wake.wait(backoff)
+                    backoff = min(backoff * 2, REFRESH_RETRY_MAX_INTERVAL)
+                else:
+                    self.wake.wait(REFRESH_RETRY_INTERVAL)
+
+
+def _is_rejection(status: int) -> bool:
+    """ True if the server rejected the request for good, as opposed to a transient failure like throttling or a timeout """
+    return 400 <= status < 500 and status not in (HTTPStatus.REQUEST_TIMEOUT.value, HTTPStatus.TOO_MANY_REQUESTS.value)
 
 
 def _get_basic_token() -> str:
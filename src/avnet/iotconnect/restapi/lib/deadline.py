@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides request timeouts for each API endpoint and deadlines that limit the total time
+spent by a group of API calls.
+
+Every request is sent with connect and read timeouts. Deadlines are set with budget() and are inherited
+by all API calls made within the block, including nested budgets (which can only shorten the deadline),
+multi-request helper functions and operations submitted to the bulk module:
+
+    with deadline.budget(5.0):
+        device.delete_match_duid(duid)  # the lookup and the delete together must complete within 5 seconds
+
+Once the budget runs out, API calls raise DeadlineExceededError instead of waiting, retrying or sending more requests.
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Iterator, Optional
+
+from . import apiurl
+from .error import DeadlineExceededError
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+
+# monotonic time at which the current budget runs out, if any
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('iotc_deadline', default=None)
+
+_timeouts_lock = threading.Lock()
+_timeouts: dict[str, tuple[float, float]] = {}
+
+
+@contextlib.contextmanager
+def budget(seconds: float) -> Iterator[None]:
+    """ Limit the total time of all API calls made within this context to the given number of seconds """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None and current < at:
+        at = current
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """ Returns the number of seconds left in the current budget, or None if there is no deadline """
+    at = _deadline.get()
+    if at is None:
+        return None
+    return at - time.monotonic()
+
+
+def check() -> None:
+    """ Raises DeadlineExceededError if the current budget has run out """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError("Deadline exceeded")
+
+
+def sleep(seconds: float) -> None:
+    """ Sleep for the given number of seconds, or raise DeadlineExceededError if the budget would run out while sleeping """
+    if seconds <= 0:
+        return
+    left = remaining()
+    if left is not None and seconds >= left:
+        raise DeadlineExceededError(f"Deadline exceeded. A wait of {seconds:.1f} seconds was required.")
+    time.sleep(seconds)
+
+
+def configure_timeouts(endpoint: str, connect: float = DEFAULT_CONNECT_TIMEOUT, read: float = DEFAULT_READ_TIMEOUT) -> None:
+    """
+    Set the timeouts for requests to the given endpoint.
+
+    :param endpoint: Endpoint URL, like apiurl.ep_device.
+    :param connect: Maximum number of seconds to wait for a connection to be established.
+    :param read: Maximum number of seconds to wait for the server to send data.
+    """
+    with _timeouts_lock:
+        _timeouts[apiurl.endpoint_key(endpoint)] = (connect, read)
+
+
+def timeouts_for(endpoint: str) -> tuple[float, float]:
+    """ Returns (connect, read) timeouts for the endpoint, shortened to fit the current budget """
+    connect, read = _timeouts.get(apiurl.endpoint_key(endpoint), (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT))
+    left = remaining()
+    if left is None:
+        return connect, read
+    if left <= 0:
+        raise DeadlineExceededError("Deadline exceeded")
+    return min(connect, left), min(read, left)
@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides cached decoders that convert JSON objects (dictionaries) to dataclass instances.
+
+Each dataclass is analysed once, when its decoder is first requested, and a specialized function
+that passes the dictionary values directly to the dataclass constructor is generated for it.
+This avoids inspecting the dataclass fields and type hints for every decoded object.
+
+Two kinds of decoders are provided:
+- get_decoder() returns a decoder that keeps only the keys that match the dataclass fields, as used by apirequest.Parser.
+- get_deserializer() returns a decoder that also converts nested dataclasses and lists of dataclasses
+  according to the type hints, as used by util.deserialize_dataclass().
+
+A custom decoder can be registered for a dataclass with register().
+"""
+
+import dataclasses
+import threading
+import typing
+from typing import Any, Callable, Optional, Union, get_type_hints
+
+_lock = threading.Lock()
+_decoders: dict[Any, Callable[[dict], Any]] = {}
+_deserializers: dict[Any, Callable[[Any], Any]] = {}
+
+
+def _generate(cls: type, specs: list[tuple[dataclasses.Field, Optional[Callable[[Any], Any]]]]) -> Callable[[dict], Any]:
+    """
+    Generate a function that calls the cls constructor with the values of the dictionary keys that match the fields.
+    Missing keys of fields with defaults are not passed. Missing required fields raise KeyError.
+
+    :param specs: Fields to pass to the constructor, each with an optional function that converts the value.
+    """
+    namespace: dict[str, Any] = {'cls': cls}
+    args = []
+    for i, (f, convert) in enumerate(specs):
+        key = repr(f.name)
+        value = f"item[{key}]"
+        if convert is not None:
+            namespace[f'c{i}'] = convert
+            value = f"c{i}({value})"
+        if f.default is not dataclasses.MISSING:
+            namespace[f'd{i}'] = f.default
+            value = f"item.get({key}, d{i})" if convert is None else f"{value} if {key} in item else d{i}"
+        elif f.default_factory is not dataclasses.MISSING:
+            namespace[f'f{i}'] = f.default_factory
+            value = f"{value} if {key} in item else f{i}()"
+        args.append(f"{f.name}={value}")
+    source = f"def decode(item):\n    return cls({', '.join(args)})\n"
+    exec(source, namespace)
+    return namespace['decode']
+
+
+def _required(fields: list[dataclasses.Field]) -> frozenset[str]:
+    return frozenset(f.name for f in fields if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING)
+
+
+def _with_fallback(fast: Callable[[dict], Any], slow: Callable[[dict], Any], required: frozenset[str]) -> Callable[[dict], Any]:
+    def decode(item: dict) -> Any:
+        try:
+            return fast(item)
+        except KeyError:
+            if required.issubset(item):
+                raise  # raised by the constructor or a nested decoder, not by a missing field
+            # a required field is missing. Let the constructor report the error as it would without the decoder.
+            return slow(item)
+    return decode
+
+
+def register(dc: type, decode: Callable[[dict], Any]) -> None:
+    """ Use a custom function to decode dictionaries into instances of the dataclass dc in Parser.get() """
+    with _lock:
+        _decoders[dc] = decode
+
+
+def get_decoder(dc: type) -> Callable[[dict], Any]:
+    """ Returns a function that creates an instance of the dataclass dc from the dictionary keys that match its fields """
+    decode = _decoders.get(dc)
+    if decode is not None:
+        return decode
+    init_fields = [f for f in dataclasses.fields(dc) if f.init]
+    names = frozenset(f.name for f in init_fields)
+    decode = _with_fallback(
+        _generate(dc, [(f, None) for f in init_fields]),
+        lambda item: dc(**{k: v for k, v in item.items() if k in names}),
+        _required(init_fields)
+    )
+    with _lock:
+        return _decoders.setdefault(dc, decode)
+
+
+def decode_list(dc: type, items: list[dict]) -> list:
+    decode = get_decoder(dc)
+    return [decode(item) for item in items]
+
+
+def _is_list(tp: Any) -> bool:
+    return getattr(tp, '__origin__', None) in (list, typing.List)
+
+
+def _optional_arg(tp: Any) -> Optional[Any]:
+    """ Returns X for Optional[X], or None """
+    if getattr(tp, '__origin__', None) is Union:
+        args = [a for a in tp.__args__ if a is not type(None)]
+        if len(tp.__args__) == 2 and len(args) == 1:
+            return args[0]
+    return None
+
+
+def _items_converter(inner: Any) -> Optional[Callable[[Any], Any]]:
+    """ Converter for list values with items of the given type """
+    if not dataclasses.is_dataclass(inner):
+        return None
+    inner_convert = get_deserializer(inner)
+    return lambda value: [inner_convert(x) for x in value] if isinstance(value, list) else value
+
+
+def _field_converter(tp: Any) -> Optional[Callable[[Any], Any]]:
+    """ Returns the function that converts values of a field with the given type hint, or None if values are used as they are """
+    if dataclasses.is_dataclass(tp):
+        return get_deserializer(tp)
+    optional_of = _optional_arg(tp)
+    if optional_of is not None and dataclasses.is_dataclass(optional_of):
+        # Optional[X] values are converted only if they are lists of X
+        return _items_converter(optional_of)
+    if _is_list(tp) and len(getattr(tp, '__args__', ())):
+        return _items_converter(tp.__args__[0])
+    return None
+
+
+def get_deserializer(cls: Any) -> Callable[[Any], Any]:
+    """
+    Returns a function that converts a value to cls, which can be a dataclass or a list of dataclasses (like list[Device]).
+    Nested dataclasses and lists of dataclasses are converted according to the type hints.
+    Dictionary keys that do not match the type hints are ignored and values that do not match the expected types are returned as they are.
+    """
+    convert = _deserializers.get(cls)
+    if convert is not None:
+        return convert
+
+    if _is_list(cls) or (isinstance(getattr(cls, '__args__', None), tuple) and len(cls.__args__)):
+        inner_convert = _items_converter(cls.__args__[0])
+        convert = inner_convert if inner_convert is not None else (lambda value: value)
+    elif dataclasses.is_dataclass(cls):
+        # register a placeholder first, so that self-referencing dataclasses resolve to this decoder
+        decode = None
+        placeholder = lambda value: decode(value)
+        with _lock:
+            _deserializers.setdefault(cls, placeholder)
+        hints = get_type_hints(cls)
+        specs = [(f, _field_converter(hints[f.name])) for f in dataclasses.fields(cls) if f.init and f.name in hints]
+        converters = {f.name: c for f, c in specs}
+
+        def slow(item: dict) -> Any:
+            return cls(**{k: (converters[k](v) if converters[k] is not None else v) for k, v in item.items() if k in converters})
+
+        fast = _with_fallback(_generate(cls, specs), slow, _required([f for f, _ in specs]))
+        decode = lambda value: fast(value) if isinstance(value, dict) else value
+        convert = decode
+    else:
+        convert = lambda value: value
+
+    with _lock:
+        _deserializers[cls] = convert
+    return convert
+
+
+def deserialize(cls: Any, data: Any) -> Any:
+    return get_deserializer(cls)(data)
@@ -4,14 +4,14 @@
 
 from dataclasses import dataclass, field
 from http import HTTPMethod
-from typing import Optional, Union, Dict
+from typing import Optional, Union, Dict, Iterator
 
-from . import apiurl, entity
+from . import apiurl, apirequest, entity, table, decoder, paging, queryplan
 from .apirequest import request
 from .error import UsageError, NotFoundResponseError, ConflictResponseError
 
 
-@dataclass
+@dataclass(slots=True)
 class Device:
     guid: str
     uniqueId: str
@@ -24,7 +24,7 @@ class Device:
     messageVersion: str
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceCreateResult:
     # noinspection SpellCheckingInspection
     newid: str
@@ -36,9 +36,61 @@ class DeviceCreateResult:
     parentUniqueId: Optional[str] = field(default=None)
 
 
+class DeviceTable(table.Table):
+    """ Columnar table of devices. See the table module. """
+    model = Device
+    flags = ('isActive', 'isEdgeSupport', 'isParentAcquired')  # isAcquired is a number, so it is dictionary-encoded
+
+    def active(self) -> table.Mask:
+        return self.flag('isActive')
+
+    def acquired(self) -> table.Mask:
+        return self.isin('isAcquired', [v for v in self['isAcquired'].values if v])
+
+    def edge_supported(self) -> table.Mask:
+        return self.flag('isEdgeSupport')
+
+    def count_by_template(self, mask: Optional[table.Mask] = None) -> dict[str, int]:
+        """ Returns the number of devices for each template GUID, optionally only for the devices selected by the mask """
+        return self.count_by('deviceTemplateGuid', mask)
+
+
+# Fields of the devices that query() filters by on the server, mapped to the query parameters of the device listing.
+# See the queryplan module.
+FILTER_PARAMS = {
+    'uniqueId': 'uniqueId',
+    'deviceTemplateGuid': 'templateGuid',
+    'entityGuid': 'entityGuid',
+    'isActive': 'isActive',
+}
+
+
 def query(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> list[Device]:
-    response = request(apiurl.ep_firmware, '/Device')
-    return response.data.get(query_str=query_str, params=params, dc=Device)
+    response = request(apiurl.ep_device, '/Device', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return response.data.get(query_str, dc=Device, params=params)
+
+
+def stream() -> Iterator[Device]:
+    """
+    Same as query() without a query, but yields the devices one at a time while the listing is received and parsed,
+    so that memory use does not depend on the number of devices. Stop the iteration early to close the connection.
+    """
+    decode = decoder.get_decoder(Device)
+    return (decode(item) for item in apirequest.stream(apiurl.ep_device, '/Device') if item is not None)
+
+
+def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> Iterator[Device]:
+    """
+    Yields all devices, requesting them page_size at a time. While the devices of a page are processed,
+    the next page is requested in the background. See the paging module.
+    """
+    return paging.iter_items(apiurl.ep_device, '/Device', Device, page_size, prefetch=prefetch)
+
+
+def query_table(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> DeviceTable:
+    """ Same as query(), but returns the devices as a DeviceTable, without creating a Device for each item """
+    response = request(apiurl.ep_device, '/Device', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return DeviceTable.from_items(response.data.get(query_str, params=params))
 
 
 def get_by_guid(guid:str) -> Optional[Device]:
@@ -46,7 +98,7 @@ def get_by_guid(guid:str) -> Optional[Device]:
     if guid is None:
         raise UsageError('get_by_duid: The device Unique ID (DUID) argument is missing')
     try:
-        response = request(apiurl.ep_device, f'/Device/{guid}')
+        response = request(apiurl.ep_device, f'/Device/{guid}', hedge=True)
         return response.data.get_one(dc=Device)
     except ConflictResponseError:
         return None
@@ -57,12 +109,48 @@ def get_by_duid(duid:str) -> Optional[Device]:
     if duid is None:
         raise UsageError('get_by_duid: The device Unique ID (DUID) argument is missing')
     try:
-        response = request(apiurl.ep_device, f'/Device/uniqueId/{duid}')
+        response = request(apiurl.ep_device, f'/Device/uniqueId/{duid}', hedge=True)
         return response.data.get_one(dc=Device)
     except ConflictResponseError:
         return None
 
 
+def _read_certificate(template_guid: str, duid: str, device_certificate: Optional[Union[str, bytes]], is_ca_auth: bool) -> Optional[str]:
+    """ Validates create() arguments and returns the certificate PEM text, reading it from file if needed """
+    if template_guid is None:
+        raise UsageError('create_self_signed: Template GUID argument is missing')
+    if duid is None:
+        raise UsageError('create_self_signed:The device Unique ID (DUID) argument is missing')
+    if device_certificate is None:
+        if not is_ca_auth:
+            raise UsageError('create_self_signed: Device certificate argument is missing')
+        return None
+
+    if '-----BEGIN CERTIFICATE' in device_certificate:
+        return device_certificate
+    try:
+        with open(device_certificate, 'r') as cert_file:
+            cert_str = cert_file.read()
+            if '-----BEGIN CERTIFICATE' not in cert_str:
+                raise UsageError(f'Device certificate at what ought to be a path "{device_certificate}" does not appear to be valid')
+            return cert_str
+    except OSError:
+        raise UsageError(f'Could not open file at what ought to be a path at "{device_certificate}"')
+
+
+def _create_data(template_guid: str, duid: str, cert_str: Optional[str], name: Optional[str], entity_guid: str) -> dict:
+    data = {
+        "deviceTemplateGuid": template_guid,
+        "uniqueId": duid,
+        "displayName": name or duid,
+        "entityGuid": entity_guid
+    }
+
+    if cert_str is not None:
+        data['certificateText'] = cert_str
+    return data
+
+
 def create(
         template_guid: str,
         duid: str,
@@ -81,39 +169,13 @@ def create(
     :param is_ca_auth: Set this to true if template AT (auth type) is AT_CA_SIGNED.
     :param entity_guid: Specify GUID of the entity under which the device will be created. If not supplied, the account root entity will be used.
     """
-    if template_guid is None:
-        raise UsageError('create_self_signed: Template GUID argument is missing')
-    if duid is None:
-        raise UsageError('create_self_signed:The device Unique ID (DUID) argument is missing')
-    if device_certificate is None:
-        if not is_ca_auth:
-            raise UsageError('create_self_signed: Device certificate argument is missing')
-
-    if '-----BEGIN CERTIFICATE' in device_certificate:
-        cert_str = device_certificate
-    else:
-        try:
-            with open(device_certificate, 'r') as cert_file:
-                cert_str = cert_file.read()
-                if '-----BEGIN CERTIFICATE' not in cert_str:
-                    raise UsageError(f'Device certificate at what ought to be a path "{device_certificate}" does not appear to be valid')
-        except OSError:
-            raise UsageError(f'Could not open file at what ought to be a path at "{device_certificate}"')
+    cert_str = _read_certificate(template_guid, duid, device_certificate, is_ca_auth)
 
     # assign entity guid to root entity if not provided
     if entity_guid is None:
         entity_guid = entity.get_root_entity().guid
 
-    data = {
-        "deviceTemplateGuid": template_guid,
-        "uniqueId": duid,
-        "displayName": name or duid,
-        "entityGuid": entity_guid
-    }
-
-    if cert_str is not None:
-        data['certificateText'] = cert_str
-
+    data = _create_data(template_guid, duid, cert_str, name, entity_guid)
     response = request(apiurl.ep_device, '/Device', json=data)
     return response.data.get_one(dc=DeviceCreateResult)  # we expect data to be empty -- 'data': [] on success
 
@@ -126,8 +188,7 @@ def delete_match_guid(guid: str) -> None:
     """
     if guid is None:
         raise UsageError('delete_match_guid: The device guid argument is missing')
-    response = request(apiurl.ep_device, f'/Device/{guid}', method=HTTPMethod.DELETE)
-    response.data.get_one()  # we expect data to be empty -- 'data': [] on success
+    request(apiurl.ep_device, f'/Device/{guid}', method=HTTPMethod.DELETE)
 
 
 def delete_match_duid(duid: str) -> None:
@@ -141,5 +202,4 @@ def delete_match_duid(duid: str) -> None:
     device = get_by_duid(duid)
     if device is None:
         raise NotFoundResponseError(f'delete_match_duid: Device with DUID "{duid}" not found')
-    response = request(apiurl.ep_device, f'/Device/{device.guid}', method=HTTPMethod.DELETE)
-    response.data.get_one()  # we expect data to be empty -- 'data': [] on success
+    request(apiurl.ep_device, f'/Device/{device.guid}', method=HTTPMethod.DELETE)
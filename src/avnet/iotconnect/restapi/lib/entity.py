@@ -3,34 +3,35 @@
 # Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
 
 from dataclasses import dataclass
+from typing import Optional
 
 from . import apiurl
 from .apirequest import request
 from .error import UsageError
 
 
-@dataclass
+@dataclass(slots=True)
 class Entity:
     guid: str
     name: str
     parentEntityGuid: str
 
 
-def query(query_str: str = '[*]') -> list[Entity]:
+def query(query_str: str = '[*]', params: Optional[dict] = None) -> list[Entity]:
     response = request(apiurl.ep_user, "/Entity/lookup")
-    return response.data.get(query_str, dc=Entity)
+    return response.data.get(query_str, dc=Entity, params=params)
 
 
-def query_expect_one(query_str: str = '[*]') -> Entity:
+def query_expect_one(query_str: str = '[*]', params: Optional[dict] = None) -> Entity:
     response = request(apiurl.ep_user, '/Entity/lookup')
-    return response.data.get_one(query_str, dc=Entity)
+    return response.data.get_one(query_str, dc=Entity, params=params)
 
 
 def get_by_name(name) -> Entity:
     """Lookup an entity by name"""
     if name is None:
         raise UsageError('get_by_name: The entity name argument is missing')
-    return query_expect_one(f"[?name==`{name}`]")
+    return query_expect_one("[?name==param('name')]", params={"name": name})
 
 
 def get_root_entity() -> Entity:
@@ -25,6 +25,23 @@ class AuthError(ApiException):
     def __init__(self, message: str, http_status: int = HTTPStatus.UNAUTHORIZED):
         super().__init__(message, http_status)
 
+class CircuitOpenError(ApiException):
+    """
+    The endpoint has been failing repeatedly and the circuit breaker is open.
+    The request was not sent. The endpoint will be tried again after the circuit breaker reset timeout.
+    """
+
+    def __init__(self, message: str, http_status: int = HTTPStatus.SERVICE_UNAVAILABLE):
+        super().__init__(message, http_status)
+
+
+class DeadlineExceededError(ApiException):
+    """ The time budget of the current deadline (see the deadline module) ran out before the request could complete """
+
+    def __init__(self, message: str, http_status: int = HTTPStatus.GATEWAY_TIMEOUT):
+        super().__init__(message, http_status)
+
+
 class InvalidActionError(ApiException):
     """
     The REST API seems to have a flaw where when attempting to delete a resource of one type, for example,
@@ -0,0 +1,143 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides compiled JMESPath expressions for apirequest.Parser.
+
+Compiled expressions are kept in a bounded LRU cache, so that expressions used repeatedly are parsed only once.
+The default "[*]" expression, simple key selectors like "data", "access_token" or "[*].guid"
+and single key equality filters like "[?name==param('name')]" or "[?parentEntityGuid == null]"
+are evaluated directly, without JMESPath.
+
+Expressions with values that change between calls should use the param() function instead of
+formatting the value into the expression, so that a single compiled expression is reused:
+
+    response.data.get("[?name==param('name')]", params={"name": name})
+"""
+
+import functools
+import re
+from typing import Any, Callable, Optional
+
+import jmespath
+from jmespath import visitor
+
+MAX_CACHED_EXPRESSIONS = 512
+
+_FIELD = r'[A-Za-z_][A-Za-z0-9_]*'
+_FIELD_PATH_RE = re.compile(rf'^{_FIELD}(\.{_FIELD})*$')
+_PROJECTED_FIELD_RE = re.compile(rf'^\[\*\]\.({_FIELD})$')
+_EQUALS_FILTER_RE = re.compile(rf"^\[\?\s*({_FIELD})\s*==\s*(?:param\('([^']*)'\)|(null))\s*\]$")
+
+Search = Callable[[Any, Optional[dict]], Any]
+
+
+def _has_param(node: dict) -> bool:
+    if node.get('type') == 'function_expression' and node.get('value') == 'param':
+        return True
+    return any(_has_param(c) for c in node.get('children', ()) if isinstance(c, dict))
+
+
+def _bind(node: dict, params: dict) -> dict:
+    """ Returns a copy of the AST with param('name') calls replaced by literal parameter values """
+    if node.get('type') == 'function_expression' and node.get('value') == 'param':
+        children = node.get('children', [])
+        if len(children) != 1 or children[0].get('type') != 'literal' or not isinstance(children[0].get('value'), str):
+            raise jmespath.exceptions.JMESPathError("param() requires a single raw string argument, like param('name')")
+        name = children[0]['value']
+        if name not in params:
+            raise jmespath.exceptions.JMESPathError(f'Expression parameter "{name}" was not provided')
+        return {'type': 'literal', 'value': params[name], 'children': []}
+    if not _has_param(node):
+        return node
+    return dict(node, children=[_bind(c, params) if isinstance(c, dict) else c for c in node['children']])
+
+
+def _all(value: Any, _params: Optional[dict]) -> Any:
+    # "[*]" is a projection, which drops null values
+    if not isinstance(value, list):
+        return None
+    return [x for x in value if x is not None]
+
+
+def _field_path(keys: list[str]) -> Search:
+    def search(value: Any, _params: Optional[dict]) -> Any:
+        for key in keys:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    return search
+
+
+def _projected_field(key: str) -> Search:
+    def search(value: Any, _params: Optional[dict]) -> Any:
+        if not isinstance(value, list):
+            return None
+        return [v for v in (x.get(key) if isinstance(x, dict) else None for x in value) if v is not None]
+    return search
+
+
+def _equals(a: Any, b: Any) -> bool:
+    # JMESPath does not consider true equal to 1 or false equal to 0
+    return isinstance(a, bool) == isinstance(b, bool) and a == b
+
+
+def _equals_filter(key: str, name: Optional[str]) -> Search:
+    """ [?key==param('name')] or [?key==null] """
+    def search(value: Any, params: Optional[dict]) -> Any:
+        if name is None:
+            expected = None
+        elif params is None or name not in params:
+            raise jmespath.exceptions.JMESPathError(f'Expression parameter "{name}" was not provided')
+        else:
+            expected = params[name]
+        if not isinstance(value, list):
+            return None
+        # non-object items have a null key and null results are dropped by the projection
+        return [x for x in value if x is not None and _equals(x.get(key) if isinstance(x, dict) else None, expected)]
+    return search
+
+
+def _jmespath(expr: str) -> Search:
+    parsed = jmespath.compile(expr)
+    if not _has_param(parsed.parsed):
+        return lambda value, _params: parsed.search(value)
+
+    def search(value: Any, params: Optional[dict]) -> Any:
+        return visitor.TreeInterpreter().visit(_bind(parsed.parsed, params or {}), value)
+    return search
+
+
+@functools.lru_cache(maxsize=MAX_CACHED_EXPRESSIONS)
+def compile(expr: str) -> Search:
+    """
+    Returns a function that evaluates the expression against a value, with an optional dictionary
+    of parameters for the param() function. Raises jmespath.exceptions.ParseError if the expression is invalid.
+    """
+    if expr == '[*]':
+        return _all
+    if _FIELD_PATH_RE.match(expr):
+        return _field_path(expr.split('.'))
+    m = _PROJECTED_FIELD_RE.match(expr)
+    if m is not None:
+        return _projected_field(m.group(1))
+    m = _EQUALS_FILTER_RE.match(expr)
+    if m is not None:
+        return _equals_filter(m.group(1), m.group(2))
+    return _jmespath(expr)
+
+
+def search(expr: str, value: Any, params: Optional[dict] = None) -> Any:
+    """ Evaluate the expression against the value. Same as jmespath.search(), but uses the compiled expression cache. """
+    return compile(expr)(value, params)
+
+
+def cache_info():
+    """ Returns the hits, misses and size of the compiled expression cache """
+    return compile.cache_info()
+
+
+def clear() -> None:
+    compile.cache_clear()
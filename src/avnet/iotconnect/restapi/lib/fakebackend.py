@@ -0,0 +1,853 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides an in-process fake IoTConnect backend that can be installed as the API transport.
+
+The fake backend keeps entities, users, templates, commands, devices, firmwares, upgrades, OTA pushes and files in memory
+and implements the REST endpoints and the discovery URL used by the modules of this package.
+It can be used to run provisioning pipelines, tests and throughput or concurrency benchmarks without network access:
+
+    backend = fakebackend.install()  # replaces the transport, configures the endpoints and logs in
+    t = template.create('sample-device-template.json', new_template_code='bench01')
+    device.create(t.deviceTemplateGuid, 'dev01', device_certificate=cert_pem)
+
+Latency, errors and throttling can be injected at any time:
+
+    backend.latency = 0.05  # every request takes 50ms (plus up to latency_jitter seconds)
+    backend.capacity = 8  # at most 8 requests are processed at the same time and the rest wait in a queue
+    backend.error_rate = 0.01  # 1% of requests fail with 500 Internal Server Error
+    backend.throttle_rate = 0.02  # 2% of requests are throttled with 429 Too Many Requests
+    backend.rate_limit = 100  # requests per second above which requests are throttled
+    backend.fail_next(3, HTTPStatus.SERVICE_UNAVAILABLE)  # the next 3 requests fail with 503
+    backend.paging = fakebackend.PAGING_IGNORED  # listings are returned whole, regardless of pageNo and pageSize
+
+Note that installing the fake backend does not write the API configuration file.
+"""
+
+import base64
+import datetime
+import io
+import json as jsonlib
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from http import HTTPMethod, HTTPStatus
+from typing import Optional, Callable, Any
+from urllib.parse import urlsplit, unquote
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import apiurl, config, transport
+
+BASE_URL = 'https://fake.iotconnect.local'
+
+# how listings honour the pageNo and pageSize parameters
+PAGING_FULL = 'full'  # the requested page is returned along with the total "count" of items
+PAGING_SIZE_ONLY = 'size-only'  # pageNo is ignored, so every request returns the first page. No count is reported.
+PAGING_IGNORED = 'ignored'  # the whole listing is returned. No count is reported.
+
+# service name -> discovery key
+_SERVICES = {
+    'master': 'masterBaseUrl',
+    'auth': 'authBaseUrl',
+    'user': 'userBaseUrl',
+    'device': 'deviceBaseUrl',
+    'firmware': 'firmwareBaseUrl',
+    'event': 'eventBaseUrl',
+    'telemetry': 'telemetryBaseUrl',
+    'file': 'fileBaseUrl',
+}
+
+TOKEN_LIFETIME = 24 * 3600
+
+
+def _new_guid() -> str:
+    return str(uuid.uuid4()).upper()
+
+
+def _now_iso() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _b64(value: dict) -> str:
+    # accesstoken.decode_access_token() decodes with the standard alphabet
+    return base64.b64encode(jsonlib.dumps(value).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _read_file(value: Any) -> tuple[Optional[str], bytes]:
+    """ Returns the name and content of a file passed to requests in the files argument """
+    name = None
+    if isinstance(value, tuple):
+        name, value = value[0], value[1]
+    if hasattr(value, 'read'):
+        if name is None and isinstance(getattr(value, 'name', None), str):
+            name = value.name.replace('\\', '/').rsplit('/', 1)[-1]
+        value = value.read()
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return name, value
+
+
+class FakeRequest:
+    """ A request received by the fake backend """
+
+    def __init__(self, method: str, path: str, params: Optional[dict], data: Optional[dict], json: Optional[dict], headers: Optional[dict], files):
+        self.method = str(method).upper()
+        self.path = path
+        self.params = params or {}
+        self.data = data or {}
+        self.json = json
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.files = files or {}
+
+
+class FakeError(Exception):
+    """ Raised by route handlers to return an error response """
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class FakeBackend(transport.Transport):
+    """ Thread-safe in-memory IoTConnect backend that can be used as the API transport """
+
+    def __init__(self, skey: str = 'fakeskey', username: str = 'user@example.com', cpid: str = 'FAKECPID', seed: Optional[int] = None):
+        """
+        :param skey: Solution key accepted by the discovery URL.
+        :param username: Email of the user that owns the account.
+        :param cpid: Company ID of the account.
+        :param seed: Optional seed for the random number generator used for latency jitter, error and throttling injection.
+        """
+        self.skey = skey
+        self.cpid = cpid
+
+        # fault injection settings. These can be changed at any time.
+        self.latency = 0.0  # seconds added to every request
+        self.latency_jitter = 0.0  # up to this many seconds are randomly added to latency
+        self.capacity: Optional[int] = None  # number of requests processed at the same time. None means unlimited.
+        self.error_rate = 0.0  # probability that a request fails with 500 Internal Server Error
+        self.throttle_rate = 0.0  # probability that a request is throttled with 429 Too Many Requests
+        self.rate_limit: Optional[float] = None  # requests per second above which requests are throttled
+        self.retry_after = 1  # Retry-After header value of throttled responses
+        self.paging = PAGING_FULL  # see the PAGING_* constants
+
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+        self._capacity_cond = threading.Condition()
+        self._processing = 0
+        self._recent: deque[float] = deque()  # times of requests in the last second, for rate_limit
+        self._faults: deque[int] = deque()  # statuses of the upcoming failures requested with fail_next()
+        self.counts: Counter[str] = Counter()  # "METHOD /route" -> number of requests
+        self.status_counts: Counter[int] = Counter()  # status -> number of responses
+
+        self.company_guid = _new_guid()
+        self.solution_guid = _new_guid()
+        self.role_guid = _new_guid()
+        self.root_entity_guid = _new_guid()
+        self.user_guid = _new_guid()
+
+        self.entities: dict[str, dict] = {self.root_entity_guid: {"guid": self.root_entity_guid, "name": "Root", "parentEntityGuid": None}}
+        self.users: dict[str, dict] = {self.user_guid: {"userGuid": self.user_guid, "userId": username, "companyCpid": cpid}}
+        self.templates: dict[str, dict] = {}
+        self.commands: dict[str, list[dict]] = {}  # template guid -> commands
+        self.devices: dict[str, dict] = {}
+        self.firmwares: dict[str, dict] = {}
+        self.upgrades: dict[str, dict] = {}
+        self.files: dict[str, dict] = {}
+        self.ota_updates: list[dict] = []
+        self.sent_commands: list[dict] = []
+
+        self._access_tokens: dict[str, float] = {}  # token -> expiry
+        self._refresh_tokens: set[str] = set()
+
+        self._routes: list[tuple[str, re.Pattern, Callable]] = []
+        r = self._add_route
+        r('GET', '/Auth/basic-token', self._basic_token)
+        r('POST', '/Auth/login', self._login)
+        r('POST', '/Auth/refresh-token', self._refresh_token)
+        r('GET', '/Entity/lookup', self._entity_lookup)
+        r('GET', '/User', self._user_list)
+        r('GET', '/User/([^/]+)/availability', self._user_availability)
+        r('GET', '/User/([^/]+)', self._user_get)
+        r('GET', '/device-template', self._template_list)
+        r('POST', '/device-template/quick', self._template_create)
+        r('GET', '/device-template/template-code/([^/]+)', self._template_get_by_code)
+        r('GET', '/device-template/([^/]+)', self._template_get)
+        r('DELETE', '/device-template/([^/]+)', self._template_delete)
+        r('GET', '/template-command/([^/]+)', self._command_list)
+        r('POST', '/template-command/device/([^/]+)/send', self._command_send)
+        r('GET', '/Device', self._device_list)
+        r('POST', '/Device', self._device_create)
+        r('GET', '/Device/uniqueId/([^/]+)', self._device_get_by_duid)
+        r('GET', '/Device/([^/]+)', self._device_get)
+        r('DELETE', '/Device/([^/]+)', self._device_delete)
+        r('GET', '/Firmware', self._firmware_list)
+        r('POST', '/Firmware', self._firmware_create)
+        r('GET', '/Firmware/([^/]+)', self._firmware_get)
+        r('PUT', '/Firmware/([^/]+)/deprecate', self._firmware_deprecate)
+        r('GET', '/firmware-upgrade', self._upgrade_list)
+        r('POST', '/firmware-upgrade', self._upgrade_create)
+        r('GET', '/firmware-upgrade/([^/]+)', self._upgrade_get)
+        r('PUT', '/firmware-upgrade/([^/]+)/publish', self._upgrade_publish)
+        r('DELETE', '/firmware-upgrade/([^/]+)', self._upgrade_delete)
+        r('POST', '/ota-update', self._ota_update)
+        r('POST', '/File', self._file_create)
+        r('GET', '/File/([^/]+)/([^/]+)', self._file_list)
+        r('DELETE', '/File/([^/]+)/([^/]+)', self._file_delete)
+
+    def _add_route(self, method: str, pattern: str, handler: Callable) -> None:
+        self._routes.append((method, re.compile('^' + pattern + '$'), handler))
+
+    # ---- configuration and fault injection ----
+
+    def endpoints(self) -> dict[str, str]:
+        """ Returns the base URLs reported by the fake discovery URL """
+        return {key: f'{BASE_URL}/{name}/api/v2' for name, key in _SERVICES.items()}
+
+    def fail_next(self, count: int = 1, status: int = HTTPStatus.INTERNAL_SERVER_ERROR) -> None:
+        """ Make the next count requests fail with the given HTTP status """
+        with self._lock:
+            self._faults.extend([int(status)] * count)
+
+    def issue_token(self) -> tuple[str, str]:
+        """ Returns a new (access_token, refresh_token) pair that is accepted by the backend """
+        exp = time.time() + TOKEN_LIFETIME
+        payload = {
+            "exp": int(exp),
+            "iss": BASE_URL,
+            "aud": BASE_URL,
+            "user": {
+                "id": self.user_guid,
+                "companyId": self.company_guid,
+                "roleId": self.role_guid,
+                "roleName": "Admin",
+                "cpId": self.cpid,
+                "entityGuid": self.root_entity_guid,
+                "solutionGuid": self.solution_guid,
+                "solutionKey": self.skey,
+            }
+        }
+        access_token = '.'.join((_b64({"alg": "none", "typ": "JWT"}), _b64(payload), uuid.uuid4().hex))
+        refresh_token = uuid.uuid4().hex
+        with self._lock:
+            self._access_tokens[access_token] = exp
+            self._refresh_tokens.add(refresh_token)
+        return access_token, refresh_token
+
+    def revoke_tokens(self) -> None:
+        """ Invalidate all issued tokens. Subsequent requests made with them will fail with 401 Unauthorized. """
+        with self._lock:
+            self._access_tokens.clear()
+            self._refresh_tokens.clear()
+
+    def expire_access_tokens(self) -> None:
+        """ Invalidate the issued access tokens, as if they had expired. The refresh tokens remain valid. """
+        with self._lock:
+            self._access_tokens.clear()
+
+    def add_entity(self, name: str, parent_guid: Optional[str] = None) -> str:
+        """ Create an entity under the given parent entity (the root entity by default) and return its GUID """
+        guid = _new_guid()
+        with self._lock:
+            self.entities[guid] = {"guid": guid, "name": name, "parentEntityGuid": parent_guid or self.root_entity_guid}
+        return guid
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.counts.clear()
+            self.status_counts.clear()
+
+    # ---- transport ----
+
+    def send(self, method, url, params=None, data=None, json=None, headers=None, files=None, timeout=None, stream=False) -> requests.Response:
+        parts = urlsplit(url)
+        base = f'{parts.scheme}://{parts.netloc}'
+        if base == apiurl.DISCOVERY_URL:
+            path = parts.path
+        elif base == BASE_URL:
+            service_path = re.match(r'^/([^/]+)/api/v2(/.*)?$', parts.path)
+            if service_path is None or service_path.group(1) not in _SERVICES:
+                return self._response(url, HTTPStatus.NOT_FOUND, None)
+            path = service_path.group(2) or '/'
+        else:
+            raise requests.exceptions.ConnectionError(f'The fake backend cannot serve {url}')
+
+        if json is None and isinstance(data, (bytes, str)) and 'json' in CaseInsensitiveDict(headers or {}).get('Content-Type', ''):
+            json = jsonlib.loads(data)  # JSON bodies are encoded by apirequest
+            data = None
+        req = FakeRequest(method, unquote(path), params, data, json, headers, files)
+        queued = self._wait(timeout)
+        try:
+            status, body, response_headers = self._dispatch(base, req)
+        finally:
+            if queued:
+                self._release()
+        with self._lock:
+            self.status_counts[int(status)] += 1
+        return self._response(url, status, body, response_headers)
+
+    def _release(self) -> None:
+        with self._capacity_cond:
+            self._processing -= 1
+            self._capacity_cond.notify()
+
+    def _wait(self, timeout: Optional[tuple[float, float]]) -> bool:
+        """
+        Simulate queueing and processing time, raising requests.exceptions.Timeout like a real server would.
+        Returns True if a processing slot was taken, in which case _release() must be called.
+        """
+        start = time.monotonic()
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        capacity = self.capacity
+        if capacity is not None:
+            with self._capacity_cond:
+                if not self._capacity_cond.wait_for(lambda: self._processing < capacity, read_timeout):
+                    raise requests.exceptions.ReadTimeout('The fake backend did not respond in time')
+                self._processing += 1
+        delay = self.latency
+        if self.latency_jitter > 0:
+            with self._lock:
+                delay += self._random.uniform(0, self.latency_jitter)
+        left = None if read_timeout is None else read_timeout - (time.monotonic() - start)
+        if left is not None and delay > left:
+            time.sleep(max(0.0, left))
+            if capacity is not None:
+                self._release()
+            raise requests.exceptions.ReadTimeout('The fake backend did not respond in time')
+        if delay > 0:
+            time.sleep(delay)
+        return capacity is not None
+
+    def _inject_fault(self) -> Optional[tuple[int, dict, dict]]:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._faults):
+                status = self._faults.popleft()
+                headers = {'Retry-After': str(self.retry_after)} if status == HTTPStatus.TOO_MANY_REQUESTS else {}
+                return status, {"status": status, "message": HTTPStatus(status).phrase, "data": []}, headers
+            if self.rate_limit is not None:
+                while len(self._recent) and self._recent[0] <= now - 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    return self._throttled()
+                self._recent.append(now)
+            if self.throttle_rate > 0 and self._random.random() < self.throttle_rate:
+                return self._throttled()
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                status = HTTPStatus.INTERNAL_SERVER_ERROR
+                return status, {"status": status, "message": "Injected error", "data": []}, {}
+        return None
+
+    def _throttled(self) -> tuple[int, dict, dict]:
+        status = HTTPStatus.TOO_MANY_REQUESTS
+        return status, {"status": status, "message": "Too many requests", "data": []}, {'Retry-After': str(self.retry_after)}
+
+    def _dispatch(self, base: str, req: FakeRequest) -> tuple[int, Optional[dict], dict]:
+        if base == apiurl.DISCOVERY_URL:
+            with self._lock:
+                self.counts['GET discovery'] += 1
+            m = re.match(r'^/api/uisdk/solutionkey/([^/]+)/env/([^/]+)$', req.path)
+            if req.method != HTTPMethod.GET or m is None:
+                return HTTPStatus.NOT_FOUND, None, {}
+            if m.group(1) != self.skey:
+                return HTTPStatus.NOT_FOUND, {"status": HTTPStatus.NOT_FOUND, "message": "Solution not found", "data": None}, {}
+            return HTTPStatus.OK, {"status": HTTPStatus.OK, "message": "Success", "data": self.endpoints()}, {}
+
+        for method, pattern, handler in self._routes:
+            m = pattern.match(req.path)
+            if m is None or method != req.method:
+                continue
+            with self._lock:
+                self.counts[f'{method} {pattern.pattern[1:-1]}'] += 1
+            fault = self._inject_fault()
+            if fault is not None:
+                return fault
+            try:
+                if not req.path.startswith('/Auth/'):
+                    self._authorize(req)
+                with self._lock:
+                    ret = handler(req, *m.groups())
+                if isinstance(ret, tuple):
+                    return ret[0], ret[1], {}
+                body = {"status": HTTPStatus.OK.value, "message": "Success", "data": ret}
+                if isinstance(ret, list) and 'pageSize' in req.params:
+                    if self.paging == PAGING_FULL:
+                        body["data"], body["count"] = self._page(ret, req.params), len(ret)
+                    elif self.paging == PAGING_SIZE_ONLY:
+                        body["data"] = self._page(ret, dict(req.params, pageNo=1))
+                return HTTPStatus.OK, body, {}
+            except FakeError as ex:
+                return ex.status, {"status": int(ex.status), "message": ex.message, "data": []}, {}
+        return HTTPStatus.NOT_FOUND, {"status": HTTPStatus.NOT_FOUND, "message": f"No route for {req.method} {req.path}", "data": []}, {}
+
+    def _authorize(self, req: FakeRequest) -> None:
+        auth = req.headers.get('Authorization', '')
+        if not auth.startswith('Bearer '):
+            raise FakeError(HTTPStatus.UNAUTHORIZED, "Unauthorized")
+        with self._lock:
+            expiry = self._access_tokens.get(auth[len('Bearer '):])
+        if expiry is None or expiry < time.time():
+            raise FakeError(HTTPStatus.UNAUTHORIZED, "Unauthorized")
+
+    @staticmethod
+    def _response(url: str, status: int, body: Optional[dict], headers: Optional[dict] = None) -> requests.Response:
+        r = requests.Response()
+        r.status_code = int(status)
+        r.reason = HTTPStatus(status).phrase
+        r.url = url
+        r.encoding = 'utf-8'
+        r.headers = CaseInsensitiveDict(headers or {})
+        if body is None or status == HTTPStatus.NO_CONTENT:
+            r._content = b''
+        else:
+            r._content = jsonlib.dumps(body).encode('utf-8')
+            r.headers['Content-Type'] = 'application/json; charset=utf-8'
+        # the payload can also be read with iter_content(), like a streamed response
+        r._content_consumed = True
+        r.raw = io.BytesIO(r._content)
+        return r
+
+    # ---- Auth ----
+
+    def _basic_token(self, req: FakeRequest):
+        return base64.b64encode(f'{self.skey}:fake'.encode('utf-8')).decode('ascii')
+
+    def _tokens_body(self) -> tuple[int, dict]:
+        access_token, refresh_token = self.issue_token()
+        return HTTPStatus.OK, {"access_token": access_token, "refresh_token": refresh_token, "expires_in": TOKEN_LIFETIME}
+
+    def _login(self, req: FakeRequest):
+        if not req.headers.get('Authorization', '').startswith('Basic ') or req.headers.get('Solution-key') != self.skey:
+            raise FakeError(HTTPStatus.UNAUTHORIZED, "Invalid basic token or solution key")
+        body = req.json or {}
+        if not body.get('username') or not body.get('password'):
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Username and password are required")
+        return self._tokens_body()
+
+    def _refresh_token(self, req: FakeRequest):
+        token = (req.json or {}).get('refreshtoken')
+        if token not in self._refresh_tokens:
+            raise FakeError(HTTPStatus.UNAUTHORIZED, "Invalid refresh token")
+        self._refresh_tokens.discard(token)
+        return self._tokens_body()
+
+    # ---- Entity and User ----
+
+    def _entity_lookup(self, req: FakeRequest):
+        return list(self.entities.values())
+
+    def _user_list(self, req: FakeRequest):
+        return self._filter(self.users.values(), req.params)
+
+    def _user_availability(self, req: FakeRequest, email: str):
+        for u in self.users.values():
+            if u['userId'].lower() == email.lower():
+                return [{"guid": u['userGuid'], "userId": u['userId']}]
+        return HTTPStatus.NO_CONTENT, None
+
+    def _user_get(self, req: FakeRequest, guid: str):
+        u = self.users.get(guid.upper())
+        if u is None:
+            raise FakeError(HTTPStatus.NOT_FOUND, "User not found")
+        return [u]
+
+    # ---- Templates and Commands ----
+
+    def _template_list(self, req: FakeRequest):
+        return self._filter(self.templates.values(), req.params)
+
+    def _template_create(self, req: FakeRequest):
+        if 'file' not in req.files:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Template file is required")
+        _, content = _read_file(req.files['file'])
+        try:
+            t = jsonlib.loads(content)
+        except ValueError:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Invalid template file")
+        code = t.get('code')
+        if not code:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Template code is required")
+        if any(x['templateCode'] == code for x in self.templates.values()):
+            raise FakeError(HTTPStatus.CONFLICT, "Template code already exists")
+        guid = _new_guid()
+        now = _now_iso()
+        self.templates[guid] = {
+            "guid": guid,
+            "templateCode": code,
+            "templateName": t.get('name', code),
+            "isEdgeSupport": False,
+            "isIotEdgeEnable": False,
+            "authType": t.get('authType'),
+            "tag": None,
+            "messageVersion": t.get('messageVersion'),
+            "greenGrass": t.get('greenGrass') not in (None, '0', 0, False),
+            "attributeCount": len(t.get('attributes', [])),
+            "createdDate": now,
+        }
+        self.commands[guid] = [{
+            "guid": _new_guid(),
+            "command": c.get('command'),
+            "name": c.get('name'),
+            "requiredParam": c.get('requiredParam', False),
+            "requiredAck": c.get('requiredAck', False),
+            "isOTACommand": c.get('isOTACommand', False),
+            "isTemplateCommandUsed": False,
+            "updatedDate": now,
+            "createdDate": now,
+        } for c in t.get('commands', [])]
+        return [{"deviceTemplateGuid": guid.lower()}]
+
+    def _template_get_by_code(self, req: FakeRequest, code: str):
+        ret = [t for t in self.templates.values() if t['templateCode'] == code]
+        if not len(ret):
+            raise FakeError(HTTPStatus.CONFLICT, "Template not found")
+        return ret
+
+    def _template_get(self, req: FakeRequest, guid: str):
+        t = self.templates.get(guid.upper())
+        if t is None:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Template not found")
+        return [t]
+
+    def _template_delete(self, req: FakeRequest, guid: str):
+        guid = guid.upper()
+        if guid not in self.templates:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Template not found")
+        if any(d['deviceTemplateGuid'] == guid for d in self.devices.values()):
+            raise FakeError(HTTPStatus.CONFLICT, "Template is in use by devices")
+        if any(f['deviceTemplateGuid'] == guid and not f['isDeprecated'] for f in self.firmwares.values()):
+            raise FakeError(HTTPStatus.CONFLICT, "Template is in use by firmware")
+        del self.templates[guid]
+        del self.commands[guid]
+        return []
+
+    def _command_list(self, req: FakeRequest, template_guid: str):
+        commands = self.commands.get(template_guid.upper())
+        if commands is None:
+            raise FakeError(HTTPStatus.CONFLICT, "Template not found")
+        return commands
+
+    def _command_send(self, req: FakeRequest, device_guid: str):
+        d = self.devices.get(device_guid.upper())
+        if d is None:
+            raise FakeError(HTTPStatus.CONFLICT, "Device not found")
+        body = req.json or {}
+        if not any(c['guid'] == body.get('commandGuid') for c in self.commands.get(d['deviceTemplateGuid'], [])):
+            raise FakeError(HTTPStatus.CONFLICT, "Command not found")
+        self.sent_commands.append({"deviceGuid": d['guid'], "commandGuid": body.get('commandGuid'), "parameterValue": body.get('parameterValue')})
+        return []
+
+    # ---- Devices ----
+
+    def _device_list(self, req: FakeRequest):
+        return self._filter(self.devices.values(), self._rename(req.params, templateGuid='deviceTemplateGuid'))
+
+    def _device_create(self, req: FakeRequest):
+        body = req.json or {}
+        template_guid = (body.get('deviceTemplateGuid') or '').upper()
+        t = self.templates.get(template_guid)
+        if t is None:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Invalid device template")
+        duid = body.get('uniqueId')
+        if not duid:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Unique ID is required")
+        if body.get('entityGuid') not in self.entities:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Invalid entity")
+        if any(d['uniqueId'] == duid for d in self.devices.values()):
+            raise FakeError(HTTPStatus.CONFLICT, "Device unique ID already exists")
+        guid = _new_guid()
+        self.devices[guid] = {
+            "guid": guid,
+            "uniqueId": duid,
+            "displayName": body.get('displayName') or duid,
+            "isAcquired": 0,
+            "isActive": True,
+            "isEdgeSupport": False,
+            "isParentAcquired": False,
+            "deviceTemplateGuid": template_guid,
+            "messageVersion": t['messageVersion'],
+            "entityGuid": body['entityGuid'],
+            "certificateText": body.get('certificateText'),
+        }
+        return [{"newid": guid, "entityGuid": body['entityGuid'], "uniqueId": duid}]
+
+    def _device_get_by_duid(self, req: FakeRequest, duid: str):
+        ret = [d for d in self.devices.values() if d['uniqueId'] == duid]
+        if not len(ret):
+            raise FakeError(HTTPStatus.CONFLICT, "Device not found")
+        return ret
+
+    def _device_get(self, req: FakeRequest, guid: str):
+        d = self.devices.get(guid.upper())
+        if d is None:
+            raise FakeError(HTTPStatus.CONFLICT, "Device not found")
+        return [d]
+
+    def _device_delete(self, req: FakeRequest, guid: str):
+        if self.devices.pop(guid.upper(), None) is None:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Device not found")
+        return []
+
+    # ---- Firmware, upgrades and OTA ----
+
+    def _firmware_view(self, fw: dict) -> dict:
+        upgrades = [u for u in self.upgrades.values() if u['firmwareguid'] == fw['guid']]
+        return dict(
+            fw,
+            releaseCount=sum(1 for u in upgrades if u['isDraft'] == 'Released'),
+            draftCount=sum(1 for u in upgrades if u['isDraft'] == 'Draft'),
+            Upgrades=upgrades
+        )
+
+    def _firmware_list(self, req: FakeRequest):
+        params = dict(req.params)
+        name = params.pop('Name', None)
+        ret = [self._firmware_view(f) for f in self.firmwares.values() if name is None or f['name'] == name]
+        ret = self._filter(ret, params)
+        if name is not None and not len(ret):
+            return HTTPStatus.NO_CONTENT, None
+        return ret
+
+    def _firmware_create(self, req: FakeRequest):
+        body = req.json or {}
+        t = self.templates.get((body.get('deviceTemplateGuid') or '').upper())
+        if t is None:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Invalid device template")
+        name = body.get('firmwareName')
+        if not name or not body.get('hardware') or not body.get('software'):
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Firmware name, hardware and software versions are required")
+        if any(f['name'] == name for f in self.firmwares.values()):
+            raise FakeError(HTTPStatus.CONFLICT, "Firmware name already exists")
+        guid = _new_guid()
+        now = _now_iso()
+        self.firmwares[guid] = {
+            "guid": guid,
+            "name": name,
+            "hardware": body['hardware'],
+            "isDeprecated": False,
+            "deviceTemplateGuid": t['guid'],
+            "deviceTemplateCode": t['templateCode'],
+            "deviceTemplateName": t['templateName'],
+            "description": body.get('FirmwareDescription'),
+            "firmwareDescription": body.get('FirmwareDescription'),
+            "createdDate": now,
+            "createdBy": self.user_guid,
+            "updatedDate": now,
+            "updatedBy": self.user_guid,
+        }
+        upgrade_guid = self._new_upgrade(guid, body['software'], body.get('firmwareUpgradeDescription'))
+        return [{"newId": guid, "firmwareUpgradeGuid": upgrade_guid}]
+
+    def _firmware_get(self, req: FakeRequest, guid: str):
+        fw = self.firmwares.get(guid.upper())
+        if fw is None:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Firmware not found")
+        return [self._firmware_view(fw)]
+
+    def _firmware_deprecate(self, req: FakeRequest, guid: str):
+        fw = self.firmwares.get(guid.upper())
+        if fw is None:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Firmware not found")
+        fw['isDeprecated'] = True
+        fw['updatedDate'] = _now_iso()
+        return []
+
+    def _new_upgrade(self, firmware_guid: str, software: str, description: Optional[str]) -> str:
+        fw = self.firmwares[firmware_guid]
+        if any(u['firmwareguid'] == firmware_guid and u['software'] == software for u in self.upgrades.values()):
+            raise FakeError(HTTPStatus.CONFLICT, "Software version already exists")
+        guid = _new_guid()
+        now = _now_iso()
+        self.upgrades[guid] = {
+            "guid": guid,
+            "software": software,
+            "description": description,
+            "isDraft": "Draft",
+            "createdDate": now,
+            "createdBy": self.user_guid,
+            "updatedDate": now,
+            "updatedBy": self.user_guid,
+            "fileName": None,
+            "fileUrl": None,
+            "urls": [],
+            "firmwareguid": firmware_guid,
+            "name": fw['name'],
+            "hardware": fw['hardware'],
+            "firmwareUpgradeDescription": description,
+        }
+        return guid
+
+    def _upgrade_list(self, req: FakeRequest):
+        return self._filter(self.upgrades.values(), self._rename(req.params, type='isDraft'))
+
+    def _upgrade_create(self, req: FakeRequest):
+        body = req.json or {}
+        firmware_guid = (body.get('firmwareGuid') or '').upper()
+        if firmware_guid not in self.firmwares:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Firmware not found")
+        if not body.get('software'):
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Software version is required")
+        return [{"newId": self._new_upgrade(firmware_guid, body['software'], body.get('description'))}]
+
+    def _upgrade_get(self, req: FakeRequest, guid: str):
+        u = self.upgrades.get(guid.upper())
+        if u is None:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Firmware upgrade not found")
+        return [u]
+
+    def _upgrade_publish(self, req: FakeRequest, guid: str):
+        u = self.upgrades.get(guid.upper())
+        if u is None:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Firmware upgrade not found")
+        u['isDraft'] = "Released"
+        u['updatedDate'] = _now_iso()
+        return []
+
+    def _upgrade_delete(self, req: FakeRequest, guid: str):
+        u = self.upgrades.get(guid.upper())
+        if u is None:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Firmware upgrade not found")
+        if u['isDraft'] == "Released":
+            raise FakeError(HTTPStatus.CONFLICT, "Released firmware upgrades cannot be deleted")
+        del self.upgrades[u['guid']]
+        return []
+
+    def _ota_update(self, req: FakeRequest):
+        body = req.json or {}
+        u = self.upgrades.get((body.get('firmwareUpgradeGuid') or '').upper())
+        if u is None:
+            raise FakeError(HTTPStatus.NOT_FOUND, "Firmware upgrade not found")
+        if body.get('target') == 3:  # ota.OTA_TARGET_DEVICE
+            guids = body.get('deviceGuids') or []
+            if not len(guids) or any(g.upper() not in self.devices for g in guids):
+                raise FakeError(HTTPStatus.BAD_REQUEST, "Invalid device list")
+            if u['isDraft'] == "Draft" and not body.get('isTrialDraft'):
+                raise FakeError(HTTPStatus.CONFLICT, "Draft upgrades can only be pushed as trial drafts")
+        else:
+            if body.get('entityGuid') not in self.entities:
+                raise FakeError(HTTPStatus.BAD_REQUEST, "Invalid entity")
+            if u['isDraft'] == "Draft":
+                raise FakeError(HTTPStatus.CONFLICT, "Draft upgrades cannot be pushed to an entity")
+        self.ota_updates.append(dict(body, guid=_new_guid()))
+        return []
+
+    # ---- Files ----
+
+    def _file_create(self, req: FakeRequest):
+        ref_guid = req.data.get('fileRefGuid')
+        module_type = req.data.get('ModuleType')
+        if not ref_guid or not module_type or 'fileData' not in req.files:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "fileRefGuid, ModuleType and fileData are required")
+        name, content = _read_file(req.files['fileData'])
+        guid = _new_guid()
+        url = f'{BASE_URL}/blob/{module_type}/{guid}'
+        self.files[guid] = {
+            "guid": guid,
+            "file": url,
+            "name": name or guid,
+            "tag": req.data.get('Tag'),
+            "createdDate": _now_iso(),
+            "state": None,
+            "moduleType": module_type,
+            "fileRefGuid": ref_guid.upper(),
+            "size": len(content),
+        }
+        u = self.upgrades.get(ref_guid.upper())
+        if module_type == 'firmware' and u is not None:
+            u['urls'].append({"name": name or guid, "url": url})
+        return [{"guid": guid}]
+
+    def _file_list(self, req: FakeRequest, module_type: str, ref_guid: str):
+        keys = ('guid', 'file', 'name', 'tag', 'createdDate', 'state')
+        ret = [{k: f[k] for k in keys} for f in self.files.values() if f['moduleType'] == module_type and f['fileRefGuid'] == ref_guid.upper()]
+        return {"fileData": ret}
+
+    def _file_delete(self, req: FakeRequest, module_type: str, guid: str):
+        f = self.files.get(guid.upper())
+        if f is None or f['moduleType'] != module_type:
+            raise FakeError(HTTPStatus.NOT_FOUND, "File not found")
+        del self.files[f['guid']]
+        u = self.upgrades.get(f['fileRefGuid'])
+        if u is not None:
+            u['urls'] = [x for x in u['urls'] if x['url'] != f['file']]
+        return []
+
+    @staticmethod
+    def _page(items: list, params: dict) -> list:
+        """ Returns the page selected by the pageNo (starting at 1) and pageSize parameters """
+        try:
+            page_no, page_size = int(params.get('pageNo', 1)), int(params['pageSize'])
+        except ValueError:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Invalid paging parameters")
+        if page_no < 1 or page_size < 1:
+            raise FakeError(HTTPStatus.BAD_REQUEST, "Invalid paging parameters")
+        return items[(page_no - 1) * page_size:page_no * page_size]
+
+    @staticmethod
+    def _rename(params: dict, **names: str) -> dict:
+        """ Renames query parameters whose names differ from the item fields that they filter by """
+        return {names.get(k, k): v for k, v in params.items()}
+
+    @staticmethod
+    def _filter(items, params: dict) -> list[dict]:
+        """ Apply query parameters that match item fields (case-insensitively) as equality filters. Other parameters are ignored. """
+        items = list(items)
+        if not len(items) or not len(params):
+            return items
+        names = {k.lower(): k for k in items[0].keys()}
+        for name, value in params.items():
+            key = names.get(name.lower())
+            if key is not None:
+                items = [x for x in items if str(x.get(key)).lower() == str(value).lower()]
+        return items
+
+
+_previous: Optional[transport.Transport] = None
+_previous_config_file: Optional[str] = None
+
+
+def install(backend: Optional[FakeBackend] = None, login: bool = True) -> FakeBackend:
+    """
+    Install the fake backend as the API transport and configure the API endpoints with its discovery URL.
+    The configuration file is not modified.
+
+    :param backend: The backend to install. A new FakeBackend is created if not provided.
+    :param login: If True, an access token is issued and set in the in-memory configuration so that API calls can be made right away.
+    :return: The installed backend.
+    """
+    global _previous, _previous_config_file
+    if backend is None:
+        backend = FakeBackend()
+    previous = transport.set_transport(backend)
+    if _previous is None:
+        _previous = previous
+        # token refreshes write the configuration, so that fake tokens go to a temporary file
+        _previous_config_file = config._app_config_file
+        config._app_config_file = os.path.join(tempfile.mkdtemp(prefix='iotc-fake-'), 'apicfg.ini')
+    config.skey = backend.skey
+    apiurl.configure_using_discovery()
+    if login:
+        config.username = backend.users[backend.user_guid]['userId']
+        config.access_token, config.refresh_token = backend.issue_token()
+        config.token_time = datetime.datetime.now(datetime.timezone.utc).timestamp()
+        config.token_expiry = config.token_time + TOKEN_LIFETIME
+    return backend
+
+
+def uninstall() -> None:
+    """ Restore the transport that was used before install() """
+    global _previous, _previous_config_file
+    transport.set_transport(_previous)
+    _previous = None
+    if _previous_config_file is not None:
+        config._app_config_file, _previous_config_file = _previous_config_file, None
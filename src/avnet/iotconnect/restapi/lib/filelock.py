@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides advisory file locks, which coordinate processes (and threads) that share files,
+like the configuration file that holds the access token.
+
+The locks are held on separate lock files, so that the locked file itself can be replaced atomically.
+Locks are released by the operating system if the process exits while holding them.
+"""
+
+import contextlib
+import os
+import time
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+POLL_INTERVAL = 0.05  # seconds between attempts to acquire a lock held by another process
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def locked(path: str, timeout: Optional[float] = None) -> Iterator[bool]:
+    """
+    Hold an exclusive lock on the lock file at path, which is created if needed.
+    Yields True if the lock was acquired, or False if it could not be acquired within timeout seconds,
+    or the lock file could not be created. The caller decides whether to proceed without the lock.
+
+    :param timeout: Maximum number of seconds to wait for the lock. None waits indefinitely.
+    """
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        yield False
+        return
+    try:
+        end = None if timeout is None else time.monotonic() + timeout
+        acquired = _try_lock(fd)
+        while not acquired and (end is None or time.monotonic() < end):
+            time.sleep(POLL_INTERVAL)
+            acquired = _try_lock(fd)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                _unlock(fd)
+    finally:
+        os.close(fd)
@@ -4,14 +4,14 @@
 
 from dataclasses import dataclass, field
 from http import HTTPMethod, HTTPStatus
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterator
 
-from . import apiurl, upgrade, util
+from . import apiurl, apirequest, upgrade, util, decoder, paging, queryplan
 from .apirequest import request
 from .error import UsageError, NotFoundResponseError
 
 
-@dataclass
+@dataclass(slots=True)
 class Firmware:
     guid: str
     name: str
@@ -51,9 +51,8 @@ class Firmware:
 
     def __post_init__(self):
         if self.Upgrades is not None:
-            # noinspection PyTypeChecker
-            # - complains about item, upgrade.Upgrade
-            self.Upgrades = [upgrade.Upgrade(**util.normalize_keys(util.filter_dict_to_dataclass_fields(item, upgrade.Upgrade))) for item in self.Upgrades]
+            decode = decoder.get_decoder(upgrade.Upgrade)
+            self.Upgrades = [decode(item) if isinstance(item, dict) else item for item in self.Upgrades]
         else:
             self.Upgrades = []
 
@@ -71,7 +70,7 @@ class Firmware:
 
 
 
-@dataclass
+@dataclass(slots=True)
 class FirmwareCreateResult:
     newId: str
     firmwareUpgradeGuid: str
@@ -86,9 +85,32 @@ def _validate_firmware_name(firmware_name: str):
         raise UsageError('"firmware_name" parameter must be upper case and contain only alphanumeric characters')
 
 
+# Fields of the firmwares that query() filters by on the server. See the queryplan module.
+FILTER_PARAMS = {
+    'name': 'Name',
+}
+
+
 def query(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> list[Firmware]:
-    response = request(apiurl.ep_firmware, '/Firmware')
-    return response.data.get(query_str=query_str, params=params, dc=Firmware)
+    response = request(apiurl.ep_firmware, '/Firmware', params=queryplan.server_params(query_str, params, FILTER_PARAMS), codes_ok=[HTTPStatus.NO_CONTENT])
+    return response.data.get(query_str, dc=Firmware, params=params)
+
+
+def stream() -> Iterator[Firmware]:
+    """
+    Same as query() without a query, but yields the firmwares one at a time while the listing is received and parsed,
+    so that memory use does not depend on the number of firmwares. Stop the iteration early to close the connection.
+    """
+    decode = decoder.get_decoder(Firmware)
+    return (decode(item) for item in apirequest.stream(apiurl.ep_firmware, '/Firmware') if item is not None)
+
+
+def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> Iterator[Firmware]:
+    """
+    Yields all firmwares, requesting them page_size at a time. While the firmwares of a page are processed,
+    the next page is requested in the background. See the paging module.
+    """
+    return paging.iter_items(apiurl.ep_firmware, '/Firmware', Firmware, page_size, prefetch=prefetch)
 
 
 def get_by_name(name: str) -> Optional[Firmware]:
@@ -103,35 +125,20 @@ def get_by_guid(guid: str) -> Optional[Firmware]:
     if guid is None or len(guid) == 0:
         raise UsageError('get_by_guid: The firmware guid argument is missing')
     try:
-        response = request(apiurl.ep_firmware, f'/Firmware/{guid}')
+        response = request(apiurl.ep_firmware, f'/Firmware/{guid}', hedge=True)
         return response.data.get_one(dc=Firmware)
     except NotFoundResponseError:
         return None
 
 
-def create(
+def _create_data(
         template_guid: str,
         name: str,
         hw_version: str,
-        initial_sw_version: str = None,
-        description: Optional[str] = None,
-        upgrade_description: Optional[str] = None,
-) -> FirmwareCreateResult:
-    """
-    Creates a firmware entry in IoTconnect. Firmware is associated with a template and can have different versions of
-    firmware upgrades that can be uploaded and that are associated with it.
-    When creating a firmware entry, an initial firmware upgrade version is required.
-
-    :param template_guid: GUID of the device template.
-    :param name: Name of this template. This code must be uppercase alphanumeric an up to 10 characters in length.
-    :param hw_version: Hardware Version of the firmware.
-    :param initial_sw_version: Optional Software Version of the initial upgrade object. If not provided, a unique "build version" will be generated based on current time like 250317.185311.483.
-    :param description: Optional description that can be added to the firmware.
-    :param upgrade_description: Optional description that can be added to the firmware upgrade.
-
-    :return: FirmwareCreateResult with new Firmware GUID and Firmware Upgrade GUID that was newly created.
-    """
-
+        initial_sw_version: Optional[str],
+        description: Optional[str],
+        upgrade_description: Optional[str]
+) -> dict:
     _validate_firmware_name(name)
 
     if initial_sw_version is None:
@@ -152,7 +159,33 @@ def create(
         data["FirmwareDescription"] = description
     if upgrade_description is not None:
         data["firmwareUpgradeDescription"] = description
+    return data
+
+
+def create(
+        template_guid: str,
+        name: str,
+        hw_version: str,
+        initial_sw_version: str = None,
+        description: Optional[str] = None,
+        upgrade_description: Optional[str] = None,
+) -> FirmwareCreateResult:
+    """
+    Creates a firmware entry in IoTconnect. Firmware is associated with a template and can have different versions of
+    firmware upgrades that can be uploaded and that are associated with it.
+    When creating a firmware entry, an initial firmware upgrade version is required.
+
+    :param template_guid: GUID of the device template.
+    :param name: Name of this template. This code must be uppercase alphanumeric an up to 10 characters in length.
+    :param hw_version: Hardware Version of the firmware.
+    :param initial_sw_version: Optional Software Version of the initial upgrade object. If not provided, a unique "build version" will be generated based on current time like 250317.185311.483.
+    :param description: Optional description that can be added to the firmware.
+    :param upgrade_description: Optional description that can be added to the firmware upgrade.
+
+    :return: FirmwareCreateResult with new Firmware GUID and Firmware Upgrade GUID that was newly created.
+    """
 
+    data = _create_data(template_guid, name, hw_version, initial_sw_version, description, upgrade_description)
     response = request(apiurl.ep_firmware, '/Firmware', json=data)
     return response.data.get_one(dc=FirmwareCreateResult)
 
@@ -164,8 +197,7 @@ def deprecate_match_guid(guid: str) -> None:
     """
     if guid is None:
         raise UsageError('delete_match_guid: The template guid argument is missing')
-    response = request(apiurl.ep_firmware, f'/Firmware/{guid}/deprecate', method=HTTPMethod.PUT)
-    response.data.get_one()  # we expect data to be empty -- 'data': [] on success
+    request(apiurl.ep_firmware, f'/Firmware/{guid}/deprecate', method=HTTPMethod.PUT)
 
 
 def deprecate_match_name(name: str) -> None:
@@ -0,0 +1,198 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides hedged requests for latency-sensitive idempotent lookups.
+
+When hedging is enabled and a lookup (like device.get_by_duid()) has not completed within
+a percentile (p95 by default) of the recent latencies of its endpoint, a second identical request is sent
+and whichever completes first is used. To limit the additional load on the server, at most
+MAX_HEDGE_RATIO of the requests to an endpoint are hedged.
+
+Requests that may be hedged are sent by a pool of MAX_WORKERS threads, so that the caller can use whichever
+response arrives first. Requests are never queued behind that pool: when all of its threads are busy,
+the request is sent by the caller's thread and is not hedged.
+
+Hedging is disabled by default:
+
+    hedging.enabled = True
+"""
+
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Awaitable, Callable, Optional
+
+from . import apiurl
+
+enabled = False  # set to True to hedge lookups that support it
+
+PERCENTILE = 0.95  # send the hedge request after this percentile of recent latencies
+MIN_SAMPLES = 20  # do not hedge until this many latencies have been recorded for the endpoint
+SAMPLE_SIZE = 200  # number of recent latencies used to compute the percentile
+MAX_HEDGE_RATIO = 0.1  # maximum ratio of hedged requests among recent requests
+MAX_WORKERS = 32  # threads used for sending requests that may be hedged
+
+_executor: Optional[ThreadPoolExecutor] = None
+_slots: Optional[threading.Semaphore] = None  # threads of the executor that are not sending a request
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> tuple[ThreadPoolExecutor, threading.Semaphore]:
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='iotc-hedge')
+            _slots = threading.Semaphore(MAX_WORKERS)
+        return _executor, _slots
+
+
+class LatencyTracker:
+    """ Thread-safe record of recent latencies and hedge decisions for a single endpoint """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self._hedged: deque[bool] = deque(maxlen=SAMPLE_SIZE)
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self) -> Optional[float]:
+        """ Returns the number of seconds after which a hedge request should be sent, or None if hedging is not possible """
+        with self._lock:
+            if len(self._latencies) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+            return ordered[min(len(ordered) - 1, math.ceil(PERCENTILE * len(ordered)) - 1)]
+
+    def try_hedge(self, hedged: bool) -> bool:
+        """ Record whether the request wanted a hedge and return True if the hedge is within the MAX_HEDGE_RATIO budget """
+        with self._lock:
+            allowed = hedged and sum(self._hedged) < MAX_HEDGE_RATIO * max(len(self._hedged), 1)
+            self._hedged.append(allowed)
+            return allowed
+
+
+_trackers_lock = threading.Lock()
+_trackers: dict[str, LatencyTracker] = {}
+
+
+def get_tracker(endpoint: str) -> LatencyTracker:
+    key = apiurl.endpoint_key(endpoint)
+    tracker = _trackers.get(key)
+    if tracker is None:
+        with _trackers_lock:
+            tracker = _trackers.setdefault(key, LatencyTracker())
+    return tracker
+
+
+def call(endpoint: str, fn: Callable[[], Any]) -> Any:
+    """
+    Call fn, which must perform an idempotent request to the endpoint, and hedge it with a second call if it is slow.
+    If hedging is disabled, fn is simply called and its latency is recorded.
+    """
+    tracker = get_tracker(endpoint)
+
+    def timed() -> Any:
+        start = time.monotonic()
+        ret = fn()
+        tracker.record(time.monotonic() - start)
+        return ret
+
+    delay = tracker.hedge_delay() if enabled else None
+    if delay is None:
+        tracker.try_hedge(False)
+        return timed()
+    executor, slots = _get_executor()
+    if not slots.acquire(blocking=False):
+        tracker.try_hedge(False)
+        return timed()  # all threads are busy. Waiting for one would delay the request more than hedging saves.
+
+    def pooled() -> Any:
+        try:
+            return timed()
+        finally:
+            slots.release()
+
+    first = executor.submit(contextvars.copy_context().run, pooled)
+    done, _ = wait([first], timeout=delay)
+    if done or not slots.acquire(blocking=False):
+        tracker.try_hedge(False)  # every request counts towards the MAX_HEDGE_RATIO budget, not only slow ones
+        return first.result()
+    if not tracker.try_hedge(True):
+        slots.release()
+        return first.result()
+
+    second: Future = executor.submit(contextvars.copy_context().run, pooled)
+    pending = {first, second}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            if f.exception() is None:
+                return f.result()  # the other request completes in the background and its result is discarded
+            error = f.exception()
+    raise error
+
+
+_background: set[asyncio.Task] = set()  # losing attempts of call_async() that have not completed yet
+
+
+def _finished(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if not task.cancelled():
+        task.exception()  # retrieved, so that the error of a discarded attempt is not logged
+
+
+async def call_async(endpoint: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """ Asyncio counterpart of call(). The attempts are tasks of the current event loop. """
+    tracker = get_tracker(endpoint)
+
+    async def timed() -> Any:
+        start = time.monotonic()
+        ret = await fn()
+        tracker.record(time.monotonic() - start)
+        return ret
+
+    delay = tracker.hedge_delay() if enabled else None
+    if delay is None:
+        tracker.try_hedge(False)
+        return await timed()
+
+    first = asyncio.create_task(timed())
+    try:
+        done, _ = await asyncio.wait([first], timeout=delay)
+    except asyncio.CancelledError:
+        first.cancel()
+        raise
+    if done:
+        tracker.try_hedge(False)
+        return first.result()
+    if not tracker.try_hedge(True):
+        return await first
+
+    pending = {first, asyncio.create_task(timed())}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is None:
+                    for loser in pending:
+                        # the other request completes in the background and its result is discarded
+                        _background.add(loser)
+                        loser.add_done_callback(_finished)
+                    pending = set()
+                    return t.result()
+                error = t.exception()
+    finally:
+        for t in pending:
+            t.cancel()  # the caller was cancelled
+    raise error
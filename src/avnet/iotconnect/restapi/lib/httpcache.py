@@ -0,0 +1,174 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides an HTTP conditional-request cache for GET responses.
+
+Responses that carry an ETag or a Last-Modified validator are stored, and subsequent identical requests
+send If-None-Match or If-Modified-Since. When the server replies with 304 (Not Modified),
+the cached payload is used instead of downloading it again.
+
+Servers that do not send validators can still be cached by setting a TTL policy for specific paths,
+in which case responses are reused without contacting the server until they expire:
+
+    httpcache.set_ttl('/Entity/lookup', 60)
+    httpcache.set_ttl('/device-template*', 300)
+
+The cache keeps the status, headers and payload bytes of each response. Each use of a cached response decodes
+a new copy of the payload, so callers never share decoded values, and the cache memory is bounded by
+the number of entries and the total size of cached payloads and headers. Least recently used entries are evicted first.
+"""
+
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Mapping
+
+enabled = True  # set to False to disable the cache
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # total size of cached response payloads and headers
+
+
+class StoredResponse:
+    """ The parts of a response that are kept by the cache, with the same attribute names as requests.Response """
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+class CacheEntry:
+    def __init__(self, endpoint: str, path: str, response: StoredResponse, size: int, etag: Optional[str], last_modified: Optional[str], ttl: Optional[float]):
+        self.endpoint = endpoint
+        self.path = path
+        self.response = response
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.ttl = ttl
+        self.stored_at = time.monotonic()
+
+    def is_fresh(self) -> bool:
+        """ True if this entry can be used without contacting the server """
+        return self.ttl is not None and time.monotonic() - self.stored_at < self.ttl
+
+    def validators(self) -> dict[str, str]:
+        """ Conditional request headers for revalidating this entry """
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """ Thread-safe LRU cache of responses """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._size = 0
+        self._ttl_policies: list[tuple[str, float]] = []
+
+    def set_ttl(self, path_pattern: str, seconds: Optional[float]) -> None:
+        """
+        Reuse responses for paths matching the pattern for the given number of seconds without contacting the server.
+
+        :param path_pattern: Path pattern with shell-style wildcards, like "/device-template*" or "/template-command/*".
+        :param seconds: Time to live of the cached responses. None removes the policy.
+        """
+        with self._lock:
+            self._ttl_policies = [p for p in self._ttl_policies if p[0] != path_pattern]
+            if seconds is not None:
+                self._ttl_policies.append((path_pattern, seconds))
+
+    def _ttl_for(self, path: str) -> Optional[float]:
+        for pattern, seconds in self._ttl_policies:
+            if fnmatch.fnmatchcase(path, pattern):
+                return seconds
+        return None
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: Hashable, endpoint: str, path: str, status: int, headers: Mapping[str, str], content: bytes) -> None:
+        """
+        Store the response if it has validators or a TTL policy applies to its path.
+
+        :param key: Cache key that identifies the request.
+        :param endpoint: Request endpoint. Used for invalidation.
+        :param path: Request path. Used for TTL policies and invalidation.
+        :param status: HTTP status of the response.
+        :param headers: HTTP response headers.
+        :param content: The response payload as received.
+        """
+        if 'no-store' in headers.get('Cache-Control', ''):
+            return
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        size = len(content) + sum(len(k) + len(v) for k, v in headers.items())
+        with self._lock:
+            ttl = self._ttl_for(path)
+            if (etag is None and last_modified is None and ttl is None) or size > self.max_bytes:
+                return
+            self._remove(key)
+            response = StoredResponse(status, dict(headers), content)
+            self._entries[key] = CacheEntry(endpoint, path, response, size, etag, last_modified, ttl)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def refresh(self, key: Hashable) -> None:
+        """ The server confirmed that the entry is still valid. Restart its TTL. """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.monotonic()
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def invalidate(self, endpoint: str, path_prefix: str) -> None:
+        """ Remove entries for the endpoint with paths that start with the given prefix """
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.endpoint == endpoint and e.path.startswith(path_prefix)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size}
+
+
+_default_cache = ResponseCache()
+
+
+def get_cache() -> ResponseCache:
+    return _default_cache
+
+
+def set_ttl(path_pattern: str, seconds: Optional[float]) -> None:
+    _default_cache.set_ttl(path_pattern, seconds)
+
+
+def clear() -> None:
+    _default_cache.clear()
@@ -0,0 +1,192 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides incremental parsing of JSON payloads with large arrays, like the "data" array of the device listing.
+
+The payload is fed to ItemParser in chunks as it is received, and the items of the array are returned as soon
+as they are complete, so that memory use depends on the chunk and item sizes rather than on the payload size.
+Members of the top-level object other than the array are parsed and discarded.
+
+The parser is push-based, so that it can be used with both blocking and asyncio responses:
+
+    parser = ItemParser('data')
+    for chunk in response.iter_content(CHUNK_SIZE):
+        for item in parser.feed(chunk):
+            process(item)
+    for item in parser.close():
+        process(item)
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, Optional
+
+CHUNK_SIZE = 64 * 1024  # size of the chunks read from the response
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER = re.compile(r'[-+0-9.eE]*')
+_scan_once = json.JSONDecoder().scan_once  # the scanner of raw_decode(), without its wrapper
+
+# parser states
+_START = 0  # before the top-level value
+_FIRST_KEY = 1  # after "{", expecting a key or "}"
+_KEY = 2  # after ",", expecting a key
+_COLON = 3  # after a key
+_MEMBER = 4  # after ":" of a member other than the array
+_ARRAY = 5  # after ":" of the array member
+_FIRST_ITEM = 6  # after "[", expecting an item or "]"
+_ITEM = 7  # after ",", expecting an item
+_AFTER_ITEM = 8  # expecting "," or "]"
+_AFTER_MEMBER = 9  # expecting "," or "}"
+_DONE = 10
+
+_INCOMPLETE = object()
+
+
+class ItemParser:
+    """ Parses a JSON payload fed in chunks and returns the items of an array as they are completed """
+
+    def __init__(self, key: Optional[str] = 'data'):
+        """
+        :param key: Name of the member of the top-level object that holds the array.
+            If None, the top-level value is expected to be the array.
+        """
+        self.key = key
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._state = _START
+        self._member = None
+
+    def feed(self, chunk: bytes) -> list:
+        """ Add the next chunk of the payload and return the items that were completed by it """
+        self._buf += self._text.decode(chunk)
+        return self._parse(False)
+
+    def close(self) -> list:
+        """ Signal the end of the payload and return the remaining items. Raises ValueError if the payload is invalid or incomplete. """
+        self._buf += self._text.decode(b'', final=True)
+        items = self._parse(True)
+        if self._state != _DONE:
+            raise json.JSONDecodeError('Unexpected end of the JSON payload', self._buf, len(self._buf))
+        return items
+
+    def _value(self, pos: int, final: bool) -> tuple[Any, int]:
+        buf = self._buf
+        if not final and buf[pos] in '-0123456789' and _NUMBER.match(buf, pos).end() == len(buf):
+            return _INCOMPLETE, pos  # the number may continue in the next chunk
+        try:
+            return _scan_once(buf, pos)
+        except StopIteration as ex:
+            if final:
+                raise json.JSONDecodeError('Expecting value', buf, ex.value) from None
+            return _INCOMPLETE, pos
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return _INCOMPLETE, pos
+
+    def _unexpected(self, pos: int, expected: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(f'Expecting {expected}', self._buf, pos)
+
+    def _parse(self, final: bool) -> list:
+        items = []
+        buf = self._buf
+        pos = 0
+        state = self._state
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            c = buf[pos]
+            if state == _DONE:
+                raise json.JSONDecodeError('Extra data', buf, pos)
+            elif state == _START:
+                if self.key is None and c == '[':
+                    state = _FIRST_ITEM
+                elif self.key is not None and c == '{':
+                    state = _FIRST_KEY
+                else:
+                    raise self._unexpected(pos, '"["' if self.key is None else '"{"')
+                pos += 1
+            elif state == _FIRST_KEY and c == '}':
+                state = _DONE
+                pos += 1
+            elif state in (_FIRST_KEY, _KEY):
+                if c != '"':
+                    raise self._unexpected(pos, 'property name enclosed in double quotes')
+                value, pos = self._value(pos, final)
+                if value is _INCOMPLETE:
+                    break
+                self._member = value
+                state = _COLON
+            elif state == _COLON:
+                if c != ':':
+                    raise self._unexpected(pos, '":" delimiter')
+                state = _ARRAY if self._member == self.key else _MEMBER
+                pos += 1
+            elif state == _ARRAY and c == '[':
+                state = _FIRST_ITEM
+                pos += 1
+            elif state in (_MEMBER, _ARRAY):
+                value, pos = self._value(pos, final)
+                if value is _INCOMPLETE:
+                    break
+                if state == _ARRAY and value is not None:
+                    raise json.JSONDecodeError(f'The "{self.key}" value is not an array', buf, pos)
+                state = _AFTER_MEMBER
+            elif state == _FIRST_ITEM and c == ']':
+                state = _AFTER_MEMBER if self.key is not None else _DONE
+                pos += 1
+            elif state in (_FIRST_ITEM, _ITEM):
+                value, pos = self._value(pos, final)
+                if value is _INCOMPLETE:
+                    break
+                items.append(value)
+                state = _AFTER_ITEM
+                # parse the following items in place, which is the common case
+                while True:
+                    pos = _WHITESPACE.match(buf, pos).end()
+                    if pos == len(buf) or buf[pos] != ',':
+                        break
+                    state = _ITEM
+                    pos = _WHITESPACE.match(buf, pos + 1).end()
+                    if pos == len(buf):
+                        break
+                    value, pos = self._value(pos, final)
+                    if value is _INCOMPLETE:
+                        break
+                    items.append(value)
+                    state = _AFTER_ITEM
+                if value is _INCOMPLETE:
+                    break
+            elif state == _AFTER_ITEM:
+                if c == ',':
+                    state = _ITEM
+                elif c == ']':
+                    state = _AFTER_MEMBER if self.key is not None else _DONE
+                else:
+                    raise self._unexpected(pos, '"," or "]"')
+                pos += 1
+            else:  # _AFTER_MEMBER
+                if c == ',':
+                    state = _KEY
+                elif c == '}':
+                    state = _DONE
+                else:
+                    raise self._unexpected(pos, '"," or "}"')
+                pos += 1
+        # keep only the text that was not parsed yet
+        self._buf = buf[pos:]
+        self._state = state
+        return items
+
+
+def iter_items(chunks: Iterable[bytes], key: Optional[str] = 'data') -> Iterator[Any]:
+    """ Yields the items of the array in the JSON payload made of the chunks. See ItemParser. """
+    parser = ItemParser(key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
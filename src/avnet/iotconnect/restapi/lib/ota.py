@@ -15,6 +15,36 @@ OTA_TARGET_ENTITY_WITH_SIBLINGS=2 # not supported
 OTA_TARGET_DEVICE=3
 
 
+def _entity_push_data(upgrade_guid: str, entity_guid: str, force: bool, scheduled_on: Optional[str]) -> dict:
+    data = {
+      "firmwareUpgradeGuid": upgrade_guid,
+      "entityGuid": entity_guid,
+      "isForceUpdate": force,
+      # "isTrialDraft": False,  # We gain nothing by providing this value and drafts will fail pushing to entity anyway
+      "target": OTA_TARGET_ENTITY,
+      # "reportingGroupGuid": "string", # not supported yet
+      # "isSphere": True    # not supported
+    }
+    if scheduled_on is not None:
+        data['scheduledOn'] = scheduled_on
+    return data
+
+
+def _device_push_data(upgrade_guid: str, device_guids: List[str], is_draft: bool, force: bool) -> dict:
+    if device_guids is None or (len(device_guids) == 0):
+        raise UsageError('device_guids parameter must be a list with at least one entry')
+
+    return {
+      "firmwareUpgradeGuid": upgrade_guid,
+      "isForceUpdate": force,
+      "deviceGuids": device_guids,
+      "isTrialDraft": is_draft,
+      "target": OTA_TARGET_DEVICE,
+      # "reportingGroupGuid": "string", # not supported yet
+      # "isSphere": True    # not supported
+    }
+
+
 def push_to_entity(upgrade_guid: str, entity_guid: Optional[str] = None, force: bool = True, scheduled_on: str = None):
     """
     Pushes the upgrade to the devices under the target entity and sub-entities of that entity.
@@ -35,18 +65,7 @@ def push_to_entity(upgrade_guid: str, entity_guid: Optional[str] = None, force:
     if entity_guid is None:
        entity_guid = entity.get_root_entity().guid
 
-    data = {
-      "firmwareUpgradeGuid": upgrade_guid,
-      "entityGuid": entity_guid,
-      "isForceUpdate": force,
-      # "isTrialDraft": False,  # We gain nothing by providing this value and drafts will fail pushing to entity anyway
-      "target": OTA_TARGET_ENTITY,
-      # "reportingGroupGuid": "string", # not supported yet
-      # "isSphere": True    # not supported
-    }
-    if scheduled_on is not None:
-        data['scheduledOn'] = scheduled_on
-
+    data = _entity_push_data(upgrade_guid, entity_guid, force, scheduled_on)
     response = request(apiurl.ep_firmware, '/ota-update', method=HTTPMethod.POST, json=data)
     return response.data.get_one()
 
@@ -65,19 +84,7 @@ def push_to_device(upgrade_guid: str, device_guids: List[str], is_draft=False, f
         to schedule the OTA to start on a specific date and time.
     """
 
-    if device_guids is None or (len(device_guids) == 0):
-        raise UsageError('device_guids parameter must be a list with at least one entry')
-
-
-    data = {
-      "firmwareUpgradeGuid": upgrade_guid,
-      "isForceUpdate": force,
-      "deviceGuids": device_guids,
-      "isTrialDraft": is_draft,
-      "target": OTA_TARGET_DEVICE,
-      # "reportingGroupGuid": "string", # not supported yet
-      # "isSphere": True    # not supported
-    }
+    data = _device_push_data(upgrade_guid, device_guids, is_draft, force)
     response = request(apiurl.ep_firmware, '/ota-update', method=HTTPMethod.POST, json=data)
     return response.data.get_one()
 
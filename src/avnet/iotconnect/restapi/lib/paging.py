@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides paginated iteration over listing endpoints, like the device listing.
+
+Instead of requesting a whole listing at once, pages of page_size items are requested lazily with the
+pageNo and pageSize query parameters, which bounds the latency and memory of each request.
+While the caller processes a page, the next page is requested by a background thread, so that the
+network round trip overlaps with the processing. Iteration can be stopped at any time,
+in which case no further pages are requested:
+
+    for d in device.iter_all(page_size=500):
+        if d.uniqueId == duid:
+            break
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Iterator, Optional
+
+from . import decoder
+from .apirequest import request
+
+DEFAULT_PAGE_SIZE = 100
+MAX_WORKERS = 8  # threads used for prefetching pages
+
+PAGE_NO_PARAM = 'pageNo'  # page number parameter. Pages are numbered starting at 1.
+PAGE_SIZE_PARAM = 'pageSize'
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='iotc-paging')
+        return _executor
+
+
+def _fetch(endpoint: str, path: str, params: Optional[dict], page_no: int, page_size: int) -> tuple[list, Optional[int]]:
+    """ Returns the items of the page and the total item count reported by the server, if any """
+    response = request(endpoint, path, params=dict(params or {}, **{PAGE_NO_PARAM: page_no, PAGE_SIZE_PARAM: page_size}))
+    items = response.data.value if isinstance(response.data.value, list) else []
+    count = response.body.get_object_value('count')
+    return items, count if isinstance(count, int) else None
+
+
+def iter_pages(
+        endpoint: str,
+        path: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        params: Optional[dict] = None,
+        prefetch: bool = True
+) -> Iterator[list[dict]]:
+    """
+    Yields the pages of the listing at path as lists of JSON objects (dictionaries).
+    The last page is the one that does not have exactly page_size items, or that reaches the total count reported by the server.
+    A page that starts and ends with the same items as the previous page is not yielded and ends the iteration,
+    so that a server that ignores pageNo does not cause an endless loop.
+
+    :param page_size: Number of items requested per page.
+    :param params: Additional query parameters, sent with each page request.
+    :param prefetch: If True, the next page is requested in the background while the current page is processed.
+    """
+    if page_size < 1:
+        raise ValueError('page_size must be at least 1')
+    page_no = 1
+    pending: Optional[Future] = None
+    previous: Optional[tuple[Any, Any]] = None  # first and last item of the previous page
+    try:
+        items, count = _fetch(endpoint, path, params, page_no, page_size)
+        while True:
+            if len(items) and (items[0], items[-1]) == previous:
+                return  # the server ignored pageNo and returned the previous page again
+            # more items than requested means that the server ignored the paging parameters and returned everything
+            last = len(items) != page_size or (count is not None and page_no * page_size >= count)
+            if not last and prefetch:
+                # the context carries the deadline and other context variables of the caller
+                ctx = contextvars.copy_context()
+                pending = _get_executor().submit(ctx.run, _fetch, endpoint, path, params, page_no + 1, page_size)
+            if len(items):
+                yield items
+            if last:
+                return
+            previous = items[0], items[-1]
+            page_no += 1
+            if pending is not None:
+                items, count = pending.result()
+                pending = None
+            else:
+                items, count = _fetch(endpoint, path, params, page_no, page_size)
+    finally:
+        if pending is not None:
+            # the iteration was stopped early. The prefetched page is discarded.
+            pending.cancel()
+
+
+def iter_items(
+        endpoint: str,
+        path: str,
+        dc: Optional[type] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        params: Optional[dict] = None,
+        prefetch: bool = True
+) -> Iterator[Any]:
+    """ Yields the items of each page of iter_pages(), optionally converted to the dataclass dc """
+    decode: Callable[[dict], Any] = decoder.get_decoder(dc) if dc is not None else (lambda item: item)
+    for page in iter_pages(endpoint, path, page_size, params, prefetch):
+        for item in page:
+            if item is not None:
+                yield decode(item)
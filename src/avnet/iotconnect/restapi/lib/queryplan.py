@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides the query planner used by the query() functions to push simple filters down to the server.
+
+The JMESPath expression passed to query() is analysed once (plans are cached along with the compiled expressions).
+If it is a top-level filter like "[?uniqueId==param('duid')]" or "[?deviceTemplateGuid=='...' && isActive==`true`].guid",
+the equality predicates on fields that the listing endpoint can filter by are sent as query parameters,
+so that only the matching items are transferred.
+
+The whole expression is still evaluated on the returned items. Predicates that cannot be translated
+(like "||", "!=", functions or fields the server cannot filter by) are therefore applied client-side,
+and the result is the same as without pushdown, also if the server matches values case-insensitively or ignores a parameter.
+"""
+
+import functools
+from typing import Any, Mapping, Optional
+
+import jmespath
+
+from . import expression
+
+# kinds of predicate values
+_LITERAL = 'literal'
+_PARAM = 'param'
+
+
+def _conjuncts(node: dict) -> list[dict]:
+    """ Returns the operands of nested && expressions """
+    if node.get('type') == 'and_expression':
+        return [c for child in node['children'] for c in _conjuncts(child)]
+    return [node]
+
+
+def _operand(node: dict) -> Optional[tuple[str, Any]]:
+    """ Returns the kind and value of a literal or param('name') operand, or None """
+    if node.get('type') == 'literal':
+        return _LITERAL, node['value']
+    if node.get('type') == 'function_expression' and node.get('value') == 'param':
+        args = node.get('children', [])
+        if len(args) == 1 and args[0].get('type') == 'literal' and isinstance(args[0].get('value'), str):
+            return _PARAM, args[0]['value']
+    return None
+
+
+def _predicate(node: dict) -> Optional[tuple[str, str, Any]]:
+    """ Returns (field, kind, value) for field==value predicates, or None if the node is not one """
+    if node.get('type') != 'comparator' or node.get('value') != 'eq':
+        return None
+    left, right = node['children']
+    if left.get('type') != 'field':
+        left, right = right, left
+    if left.get('type') != 'field':
+        return None
+    operand = _operand(right)
+    if operand is None:
+        return None
+    return left['value'], operand[0], operand[1]
+
+
+@functools.lru_cache(maxsize=expression.MAX_CACHED_EXPRESSIONS)
+def _predicates(expr: str) -> tuple[tuple[str, str, Any], ...]:
+    """ Returns the equality predicates of a top-level filter expression that can be pushed down """
+    try:
+        parsed = jmespath.compile(expr).parsed
+    except jmespath.exceptions.JMESPathError:
+        return ()  # the error is reported when the expression is evaluated
+    if parsed.get('type') != 'filter_projection' or parsed['children'][0].get('type') != 'identity':
+        return ()
+    return tuple(p for p in map(_predicate, _conjuncts(parsed['children'][2])) if p is not None)
+
+
+def _param_value(value: Any) -> Optional[str]:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return None  # null, objects and arrays are not sent
+
+
+def server_params(expr: str, params: Optional[dict], filters: Mapping[str, str]) -> Optional[dict[str, str]]:
+    """
+    Returns the query parameters that push the equality predicates of the expression down to the server, or None.
+
+    :param expr: The JMESPath expression of query().
+    :param params: Values for the param() function used in the expression.
+    :param filters: Maps item field names to the names of query parameters that the listing endpoint filters by.
+    """
+    if not filters or expr == '[*]':
+        return None
+    ret = {}
+    for field, kind, value in _predicates(expr):
+        name = filters.get(field)
+        if name is None or name in ret:
+            continue
+        if kind == _PARAM:
+            if params is None or value not in params:
+                continue  # reported when the expression is evaluated
+            value = params[value]
+        value = _param_value(value)
+        if value is not None:
+            ret[name] = value
+    return ret or None
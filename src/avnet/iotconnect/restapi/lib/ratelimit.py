@@ -0,0 +1,146 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides process-wide request rate limiting for each API endpoint (like apiurl.ep_device).
+
+Each endpoint has a token bucket that can be shared across threads. By default, the rate is not limited,
+but when the server throttles us with a 429 (Too Many Requests) or a 503 (Service Unavailable) and a Retry-After header,
+all requests to that endpoint are held back until the server indicated time passes.
+"""
+
+import email.utils
+import threading
+import time
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Optional, Mapping
+
+from . import apiurl
+
+THROTTLE_STATUSES = (HTTPStatus.TOO_MANY_REQUESTS.value, HTTPStatus.SERVICE_UNAVAILABLE.value)
+DEFAULT_THROTTLE_DELAY = 1.0  # seconds to hold back after a 429 without a Retry-After header
+MAX_THROTTLE_DELAY = 300.0  # never honor unreasonably large Retry-After values
+MAX_THROTTLE_RETRIES = 3  # how many times a throttled request is sent again
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """ Parse a Retry-After header value (delay in seconds or an HTTP date) and return the delay in seconds """
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    Callers reserve a token and then wait for the returned delay, which allows it to be used by blocking and asyncio code.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None):
+        """
+        :param rate: Sustained number of requests per second. None means unlimited.
+        :param burst: Maximum number of requests that can be sent at once after a period of inactivity. Defaults to rate.
+        """
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate or 1))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+
+    def reserve(self) -> float:
+        """ Take a token and return the number of seconds that the caller needs to wait before sending the request """
+        with self._lock:
+            now = time.monotonic()
+            blocked_delay = max(0.0, self._blocked_until - now)
+            if self.rate is None:
+                return blocked_delay
+            self._tokens = min(float(self.burst), self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            rate_delay = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(rate_delay, blocked_delay)
+
+    def acquire(self) -> float:
+        """ Blocking variant of reserve(). Returns the number of seconds waited. """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def pause(self, seconds: float) -> None:
+        """ Hold back all requests for the given number of seconds """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + min(seconds, MAX_THROTTLE_DELAY))
+
+
+class RateLimiter:
+    """ Thread-safe registry of token buckets keyed by endpoint """
+
+    def __init__(self, default_rate: Optional[float] = None, default_burst: Optional[int] = None):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def configure(self, endpoint: str, rate: Optional[float], burst: Optional[int] = None) -> None:
+        """
+        Set the maximum sustained request rate for the given endpoint.
+
+        :param endpoint: Endpoint URL, like apiurl.ep_device.
+        :param rate: Number of requests per second. None means unlimited.
+        :param burst: Maximum number of requests that can be sent at once. Defaults to rate.
+        """
+        with self._lock:
+            self._buckets[apiurl.endpoint_key(endpoint)] = TokenBucket(rate, burst)
+
+    def get_bucket(self, endpoint: str) -> TokenBucket:
+        key = apiurl.endpoint_key(endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(self.default_rate, self.default_burst)
+                    self._buckets[key] = bucket
+        return bucket
+
+    def on_response(self, endpoint: str, status: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Record the response status. If the server throttled the request, all requests to this endpoint will be held back.
+
+        :return: The number of seconds that the endpoint is held back, or None if the request was not throttled.
+        """
+        if status not in THROTTLE_STATUSES:
+            return None
+        delay = parse_retry_after(headers.get('Retry-After'))
+        if delay is None:
+            if status != HTTPStatus.TOO_MANY_REQUESTS.value:
+                return None  # a plain 503 is not throttling
+            delay = DEFAULT_THROTTLE_DELAY
+        self.get_bucket(endpoint).pause(delay)
+        return delay
+
+
+_default_limiter = RateLimiter()
+
+
+def get_limiter() -> RateLimiter:
+    return _default_limiter
+
+
+def configure(endpoint: str, rate: Optional[float], burst: Optional[int] = None) -> None:
+    _default_limiter.configure(endpoint, rate, burst)
@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides pooled keep-alive HTTP sessions, one per endpoint host.
+
+The endpoints resolved by apiurl.configure_using_discovery() (ep_auth, ep_user, ep_device, ep_firmware, ep_file...)
+are served by a handful of hosts. Reusing one session per host allows the underlying connections
+(and their TLS handshakes) to be reused across API calls and threads.
+"""
+
+import atexit
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+DEFAULT_POOL_MAXSIZE = 10  # maximum number of keep-alive connections kept per host
+
+
+def host_key(endpoint: str) -> str:
+    """ Returns the scheme://host[:port] portion of an endpoint URL, which is used to key the pooled sessions """
+    parts = urlsplit(endpoint)
+    if not parts.netloc:
+        # a bare host name was passed
+        return endpoint.lower()
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class SessionPool:
+    """
+    Thread-safe container of requests.Session objects keyed by endpoint host.
+    Sessions are created lazily on first use and can be closed and recreated at any time.
+    """
+
+    def __init__(self, default_pool_maxsize: int = DEFAULT_POOL_MAXSIZE):
+        self.default_pool_maxsize = default_pool_maxsize
+        self._lock = threading.Lock()
+        self._sessions: dict[str, requests.Session] = {}
+        self._pool_sizes: dict[str, int] = {}
+
+    def _new_session(self, pool_maxsize: int) -> requests.Session:
+        s = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.1)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retries)
+        s.mount('https://', adapter)
+        s.mount('http://', adapter)
+        return s
+
+    def configure_host(self, endpoint: str, pool_maxsize: int) -> None:
+        """
+        Set the maximum number of pooled connections for the host of the given endpoint.
+        If a session for that host already exists, it is closed and will be recreated with the new size on next use.
+
+        :param endpoint: Endpoint URL (like apiurl.ep_device) or the host name.
+        :param pool_maxsize: Maximum number of keep-alive connections to keep for this host.
+        """
+        if pool_maxsize < 1:
+            raise ValueError("pool_maxsize must be at least 1")
+        key = host_key(endpoint)
+        with self._lock:
+            self._pool_sizes[key] = pool_maxsize
+            old = self._sessions.pop(key, None)
+        if old is not None:
+            old.close()
+
+    def get(self, endpoint: str) -> requests.Session:
+        """ Returns the shared session for the host of the given endpoint, creating it if needed """
+        key = host_key(endpoint)
+        s = self._sessions.get(key)
+        if s is not None:
+            return s
+        with self._lock:
+            s = self._sessions.get(key)
+            if s is None:
+                s = self._new_session(self._pool_sizes.get(key, self.default_pool_maxsize))
+                self._sessions[key] = s
+            return s
+
+    def hosts(self) -> list[str]:
+        """ Returns the list of hosts that currently have an open session """
+        with self._lock:
+            return list(self._sessions.keys())
+
+    def close(self, endpoint: Optional[str] = None) -> None:
+        """
+        Close the pooled session for the host of the given endpoint, or all sessions if endpoint is not provided.
+        Closed sessions will be transparently recreated if API calls are made afterward.
+        """
+        with self._lock:
+            if endpoint is None:
+                closing = list(self._sessions.values())
+                self._sessions.clear()
+            else:
+                s = self._sessions.pop(host_key(endpoint), None)
+                closing = [s] if s is not None else []
+        for s in closing:
+            s.close()
+
+
+_default_pool = SessionPool()
+
+
+def get_session(endpoint: str) -> requests.Session:
+    return _default_pool.get(endpoint)
+
+
+def configure_host(endpoint: str, pool_maxsize: int) -> None:
+    _default_pool.configure_host(endpoint, pool_maxsize)
+
+
+def close(endpoint: Optional[str] = None) -> None:
+    _default_pool.close(endpoint)
+
+
+atexit.register(close)
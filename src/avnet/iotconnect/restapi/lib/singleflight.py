@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides single-flight call coalescing.
+
+When multiple threads make the same call at the same time, only the first thread (the leader) executes it.
+The other threads wait for the leader and receive the same result or the same exception.
+Unlike a cache, nothing is kept once the call completes, so results are never stale.
+AsyncGroup does the same for the tasks of an event loop.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+enabled = True  # set to False to disable coalescing of identical GET requests in apirequest.request()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class Group:
+    """ Thread-safe group of in-flight calls keyed by a hashable key """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Execute fn, unless a call with the same key is already in flight, in which case wait for its outcome.
+
+        :param key: Key that identifies identical calls.
+        :param fn: The call to execute.
+        :param timeout: Maximum number of seconds to wait for a call in flight. TimeoutError is raised if it expires.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError("Timed out waiting for the call in flight")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncGroup:
+    """ Asyncio counterpart of Group for the tasks of a single event loop """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """ See Group.do() """
+        call = self._calls.get(key)
+        if call is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(call), timeout)
+            except asyncio.CancelledError:
+                if not call.cancelled():
+                    raise  # this task was cancelled
+                return await self.do(key, fn, timeout)  # the task that made the call was cancelled. Make the call again.
+            except asyncio.TimeoutError:
+                raise TimeoutError("Timed out waiting for the call in flight")
+
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        try:
+            result = await fn()
+            call.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as ex:
+            call.set_exception(ex)
+            call.exception()  # retrieved, so that the error is not logged again if no task waits for it
+            raise
+        finally:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
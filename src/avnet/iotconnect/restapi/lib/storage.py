@@ -42,7 +42,7 @@ FILE_MODULE_TYPES = (
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class File:
     guid: str
     file: str
@@ -51,7 +51,7 @@ class File:
     createdDate: str = field(default=None)
     state: str = field(default=None)
 
-@dataclass
+@dataclass(slots=True)
 class FileLookupResult:
     fileData: List[File]
 
@@ -73,8 +73,7 @@ def get_files(module_type: str, file_ref_guid: str) -> List[File]:
 
     try:
         response = request(apiurl.ep_file, f'/File/{module_type}/{file_ref_guid}')
-        ret = response.data.get(expr='fileData')
-        return [File(**x) for x in ret]
+        return response.data.get(expr='fileData', dc=File)
     except ConflictResponseError:
         return []
 
@@ -146,5 +145,4 @@ def delete_match_guid(module_type: str, file_guid: str) -> None:
     """
     if file_guid is None:
         raise UsageError('delete_match_guid: The template guid argument is missing')
-    response = request(apiurl.ep_file, f'/File/{module_type}/{file_guid}', method=HTTPMethod.DELETE)
-    response.data.get_one()  # we expect data to be empty -- 'data': [] on success
+    request(apiurl.ep_file, f'/File/{module_type}/{file_guid}', method=HTTPMethod.DELETE)
@@ -0,0 +1,362 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides columnar (struct-of-arrays) tables for analytics over large query results,
+like the device inventory of an account, where a list of dataclass instances is the wrong shape.
+
+Each model field is stored in its own column:
+- Strings and other low cardinality values are dictionary-encoded. Each distinct value is stored once
+  and rows hold compact integer codes in an array.array.
+- Boolean flags like isActive are bit-packed, eight rows per byte. Null flags are stored as false.
+- Other values (like upgrade URL lists) are kept in a plain list.
+
+Filters return a Mask with one byte per row, which can be combined with &, | and ~.
+Filtering and counting is done by bytes.translate(), big integer operations and C-level iterators,
+rather than a Python loop per row.
+
+    devices = device.query_table()
+    mask = devices.active() & devices.equals('deviceTemplateGuid', template.guid)
+    print(mask.count(), devices.filter(mask).count_by_template())
+
+The tables for the models are defined along with them, like device.DeviceTable, template.TemplateTable and upgrade.UpgradeTable.
+
+The to_numpy() methods export the columns to NumPy arrays. Code arrays and masks are exported
+without copying. NumPy is not a dependency of this package and is only imported when exporting.
+"""
+
+import dataclasses
+import itertools
+from array import array
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+from . import decoder
+
+# maps each bit-packed byte to the eight bytes of its flags and back
+_UNPACK = [bytes((b >> i) & 1 for i in range(8)) for b in range(256)]
+_PACK = {flags: b for b, flags in enumerate(_UNPACK)}
+_INVERT = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as ex:
+        raise ImportError('Exporting tables to NumPy arrays requires the numpy package. Install it with: python3 -m pip install numpy') from ex
+    return numpy
+
+
+def _typecode(size: int) -> str:
+    """ Returns the smallest unsigned array typecode that can hold codes for a dictionary of the given size """
+    if size <= 0x100:
+        return 'B'
+    if size <= 0x10000:
+        return 'H'
+    return 'I'
+
+
+def _pack(flags: bytes) -> bytearray:
+    """ Packs one byte per row 0/1 flags into bits, eight rows per byte, least significant bit first """
+    padding = -len(flags) % 8
+    if padding:
+        flags = flags + bytes(padding)
+    return bytearray(map(_PACK.__getitem__, (flags[i:i + 8] for i in range(0, len(flags), 8))))
+
+
+def _unpack(bits: bytes, length: int) -> bytes:
+    return b''.join(map(_UNPACK.__getitem__, bits))[:length]
+
+
+class Mask:
+    """
+    Row selection with one byte (0 or 1) per row. Combine masks with &, | and ~ and pass them to Table.filter().
+    """
+    __slots__ = ('flags',)
+
+    def __init__(self, flags: bytes):
+        self.flags = bytes(flags)
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def _combine(self, other: 'Mask') -> tuple[int, int]:
+        if not isinstance(other, Mask):
+            raise TypeError(f'Cannot combine a Mask with {type(other).__name__}')
+        if len(other.flags) != len(self.flags):
+            raise ValueError(f'Mask length mismatch: {len(self.flags)} != {len(other.flags)}')
+        return int.from_bytes(self.flags, 'little'), int.from_bytes(other.flags, 'little')
+
+    def __and__(self, other: 'Mask') -> 'Mask':
+        a, b = self._combine(other)
+        return Mask((a & b).to_bytes(len(self.flags), 'little'))
+
+    def __or__(self, other: 'Mask') -> 'Mask':
+        a, b = self._combine(other)
+        return Mask((a | b).to_bytes(len(self.flags), 'little'))
+
+    def __invert__(self) -> 'Mask':
+        return Mask(self.flags.translate(_INVERT))
+
+    def count(self) -> int:
+        """ Returns the number of selected rows """
+        return self.flags.count(1)
+
+    def indices(self) -> list[int]:
+        """ Returns the indices of the selected rows """
+        return list(itertools.compress(range(len(self.flags)), self.flags))
+
+    def to_numpy(self):
+        """ Returns a read-only numpy bool array that shares memory with this mask """
+        return _numpy().frombuffer(self.flags, dtype=bool)
+
+
+class Column:
+    def __len__(self) -> int:
+        raise NotImplementedError()
+
+    def __getitem__(self, index: int) -> Any:
+        raise NotImplementedError()
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def filter(self, mask: Mask) -> 'Column':
+        raise NotImplementedError()
+
+    def to_numpy(self):
+        raise NotImplementedError()
+
+
+class DictionaryColumn(Column):
+    """
+    Dictionary-encoded column. Each distinct value is stored once in "values", and "codes" holds the index of the value of each row.
+    """
+
+    def __init__(self, values: list, codes: array):
+        self.values = values
+        self.codes = codes
+
+    @classmethod
+    def encode(cls, data: Iterable[Any]) -> 'DictionaryColumn':
+        index: dict[Any, int] = {}
+        codes = [index.setdefault(v, len(index)) for v in data]
+        return cls(list(index), array(_typecode(len(index)), codes))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Any:
+        return self.values[self.codes[index]]
+
+    def __iter__(self):
+        return map(self.values.__getitem__, self.codes)
+
+    def isin(self, values: Iterable[Any]) -> Mask:
+        """ Selects the rows with any of the given values """
+        wanted = set(values)
+        selected = [code for code, value in enumerate(self.values) if value in wanted]
+        if self.codes.typecode == 'B':
+            table = bytearray(256)
+            for code in selected:
+                table[code] = 1
+            return Mask(self.codes.tobytes().translate(table))
+        if len(selected) == 1:
+            return Mask(bytes(map(selected[0].__eq__, self.codes)))
+        return Mask(bytes(map(frozenset(selected).__contains__, self.codes)))
+
+    def equals(self, value: Any) -> Mask:
+        """ Selects the rows with the given value """
+        return self.isin((value,))
+
+    def counts(self, mask: Optional[Mask] = None) -> dict[Any, int]:
+        """ Returns the number of rows with each value, optionally only for the rows selected by the mask """
+        codes = self.codes if mask is None else itertools.compress(self.codes, mask.flags)
+        return {self.values[code]: count for code, count in Counter(codes).most_common()}
+
+    def filter(self, mask: Mask) -> 'DictionaryColumn':
+        # the dictionary is shared and may contain values that are no longer referenced
+        return DictionaryColumn(self.values, array(self.codes.typecode, itertools.compress(self.codes, mask.flags)))
+
+    def to_numpy(self):
+        """ Returns a numpy array of the codes that shares memory with this column. Use the "values" list to look up the codes. """
+        return _numpy().frombuffer(self.codes, dtype=self.codes.typecode)
+
+
+class BoolColumn(Column):
+    """ Bit-packed boolean column, eight rows per byte, least significant bit first """
+
+    def __init__(self, bits: bytearray, length: int):
+        self.bits = bits
+        self.length = length
+
+    @classmethod
+    def encode(cls, data: Iterable[Any]) -> 'BoolColumn':
+        flags = bytes(map(bool, data))
+        return cls(_pack(flags), len(flags))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> bool:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('BoolColumn index out of range')
+        return bool(self.bits[index >> 3] >> (index & 7) & 1)
+
+    def __iter__(self):
+        return map(bool, self.mask().flags)
+
+    def mask(self) -> Mask:
+        """ Selects the rows where the flag is set """
+        return Mask(_unpack(self.bits, self.length))
+
+    def count(self) -> int:
+        """ Returns the number of rows where the flag is set """
+        return int.from_bytes(self.bits, 'little').bit_count()
+
+    def filter(self, mask: Mask) -> 'BoolColumn':
+        flags = bytes(itertools.compress(_unpack(self.bits, self.length), mask.flags))
+        return BoolColumn(_pack(flags), len(flags))
+
+    def to_numpy(self, packed: bool = False):
+        """
+        Returns a numpy bool array of the flags.
+        If packed is True, returns a uint8 array of the bit-packed flags that shares memory with this column.
+        """
+        numpy = _numpy()
+        bits = numpy.frombuffer(self.bits, dtype=numpy.uint8)
+        if packed:
+            return bits
+        return numpy.unpackbits(bits, count=self.length, bitorder='little').view(bool)
+
+
+class ListColumn(Column):
+    """ Column of values that are not encoded, like lists """
+
+    def __init__(self, values: list):
+        self.values = values
+
+    @classmethod
+    def encode(cls, data: Iterable[Any]) -> 'ListColumn':
+        return cls(list(data))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> Any:
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def filter(self, mask: Mask) -> 'ListColumn':
+        return ListColumn(list(itertools.compress(self.values, mask.flags)))
+
+    def to_numpy(self):
+        numpy = _numpy()
+        ret = numpy.empty(len(self.values), dtype=object)
+        ret[:] = self.values
+        return ret
+
+
+class Table:
+    """
+    Base class for the model tables. Subclasses set "model" to the dataclass of the rows,
+    and list the boolean fields in "flags" and the fields that are not dictionary-encoded in "lists".
+    """
+    model: type = None
+    flags: tuple[str, ...] = ()
+    lists: tuple[str, ...] = ()
+
+    def __init__(self, columns: dict[str, Column], length: int):
+        self.columns = columns
+        self.length = length
+
+    @classmethod
+    def _encode(cls, name: str, data: Iterable[Any]) -> Column:
+        if name in cls.flags:
+            return BoolColumn.encode(data)
+        if name in cls.lists:
+            return ListColumn.encode(data)
+        return DictionaryColumn.encode(data)
+
+    @classmethod
+    def field_names(cls) -> list[str]:
+        return [f.name for f in dataclasses.fields(cls.model) if f.init]
+
+    @classmethod
+    def from_items(cls, items: Iterable[dict]):
+        """
+        Create a table from JSON objects (dictionaries), like Response.data.get(). Missing keys are stored as null.
+        Raises ValueError if an item is not a JSON object, like the values of a query that projects a field.
+        """
+        items = items if isinstance(items, list) else list(items)
+        if not all(isinstance(x, dict) for x in items):
+            item = next(x for x in items if not isinstance(x, dict))
+            raise ValueError(
+                f'{cls.__name__} rows must be JSON objects, got {type(item).__name__} {item!r}. '
+                'Use a query that selects whole items, like "[?isActive]" rather than "[*].guid".'
+            )
+        columns = {name: cls._encode(name, [x.get(name) for x in items]) for name in cls.field_names()}
+        return cls(columns, len(items))
+
+    @classmethod
+    def from_objects(cls, objects: Iterable[Any]):
+        """ Create a table from model dataclass instances, like the result of query() """
+        objects = objects if isinstance(objects, list) else list(objects)
+        columns = {name: cls._encode(name, [getattr(x, name) for x in objects]) for name in cls.field_names()}
+        return cls(columns, len(objects))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, name: str) -> Column:
+        return self.columns[name]
+
+    def row(self, index: int) -> Any:
+        """ Returns the row at the given index as a model dataclass instance """
+        return decoder.get_decoder(self.model)({name: column[index] for name, column in self.columns.items()})
+
+    def __iter__(self):
+        decode = decoder.get_decoder(self.model)
+        names = list(self.columns)
+        for values in zip(*self.columns.values()):
+            yield decode(dict(zip(names, values)))
+
+    def to_objects(self) -> list:
+        """ Returns the rows as a list of model dataclass instances """
+        return list(self)
+
+    def flag(self, name: str) -> Mask:
+        """ Selects the rows where the boolean field is set """
+        return self.columns[name].mask()
+
+    def equals(self, name: str, value: Any) -> Mask:
+        """ Selects the rows where the field has the given value """
+        return self.columns[name].equals(value)
+
+    def isin(self, name: str, values: Iterable[Any]) -> Mask:
+        """ Selects the rows where the field has any of the given values """
+        return self.columns[name].isin(values)
+
+    def filter(self, mask: Mask):
+        """ Returns a new table with the rows selected by the mask """
+        if len(mask) != self.length:
+            raise ValueError(f'Mask length {len(mask)} does not match the table length {self.length}')
+        return type(self)({name: column.filter(mask) for name, column in self.columns.items()}, mask.count())
+
+    def count_by(self, name: str, mask: Optional[Mask] = None) -> dict[Any, int]:
+        """ Returns the number of rows with each value of the field, optionally only for the rows selected by the mask """
+        column = self.columns[name]
+        if isinstance(column, BoolColumn):
+            selected = column.mask() if mask is None else column.mask() & mask
+            total = self.length if mask is None else mask.count()
+            return {True: selected.count(), False: total - selected.count()}
+        return column.counts(mask)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """ Returns a dictionary of numpy arrays for each column. See the to_numpy() method of each column type. """
+        return {name: column.to_numpy() for name, column in self.columns.items()}
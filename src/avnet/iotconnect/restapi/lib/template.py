@@ -3,12 +3,11 @@
 # Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
 
 import io
-import json
 from dataclasses import dataclass, field
 from http import HTTPMethod
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator
 
-from . import apiurl
+from . import apiurl, apirequest, table, decoder, paging, queryplan
 from .apirequest import request
 from .error import UsageError, ConflictResponseError, NotFoundResponseError
 
@@ -20,7 +19,7 @@ AT_SYMMETRIC_KEY = 5
 AT_CA_INDIVIDUAL = 7
 
 
-@dataclass
+@dataclass(slots=True)
 class Template:
     guid: str
     templateCode: str
@@ -33,7 +32,7 @@ class Template:
     greenGrass: bool = field(default=None)
 
 
-@dataclass
+@dataclass(slots=True)
 class TemplateCreateResult:
     deviceTemplateGuid: str
 
@@ -46,9 +45,36 @@ def _validate_template_code(code: str):
     elif not code.isalnum():
         raise UsageError('"code" parameter must contain only alphanumeric characters')
 
+class TemplateTable(table.Table):
+    """ Columnar table of templates. See the table module. """
+    model = Template
+    flags = ('isEdgeSupport', 'isIotEdgeEnable', 'greenGrass')
+
+
+# Fields of the templates that query() filters by on the server. See the queryplan module.
+FILTER_PARAMS = {
+    'templateCode': 'templateCode',
+    'templateName': 'templateName',
+}
+
+
 def query(query_str: str = '[*]', params: Optional[Dict[str,any]] = None) -> list[Template]:
-    response = request(apiurl.ep_firmware, '/device-template')
-    return response.data.get(query_str=query_str, params=params, dc=Template)
+    response = request(apiurl.ep_device, '/device-template', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return response.data.get(query_str, dc=Template, params=params)
+
+
+def stream() -> Iterator[Template]:
+    """
+    Same as query() without a query, but yields the templates one at a time while the listing is received and parsed,
+    so that memory use does not depend on the number of templates. Stop the iteration early to close the connection.
+    """
+    decode = decoder.get_decoder(Template)
+    return (decode(item) for item in apirequest.stream(apiurl.ep_device, '/device-template') if item is not None)
+
+def query_table(query_str: str = '[*]', params: Optional[Dict[str,any]] = None) -> TemplateTable:
+    """ Same as query(), but returns the templates as a TemplateTable """
+    response = request(apiurl.ep_device, '/device-template', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return TemplateTable.from_items(response.data.get(query_str, params=params))
 
 def get(params: dict[str, any]) -> Optional[Template]:
     try:
@@ -58,6 +84,14 @@ def get(params: dict[str, any]) -> Optional[Template]:
         return None
 
 
+def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> Iterator[Template]:
+    """
+    Yields all templates, requesting them page_size at a time. While the templates of a page are processed,
+    the next page is requested in the background. See the paging module.
+    """
+    return paging.iter_items(apiurl.ep_device, '/device-template', Template, page_size, prefetch=prefetch)
+
+
 def get_by_template_code(template_code: str) -> Optional[Template]:
     """ Lookup an template by template code - unique template ID supplied during creation """
     _validate_template_code(template_code)
@@ -71,7 +105,7 @@ def get_by_template_code(template_code: str) -> Optional[Template]:
 def get_by_guid(guid: str) -> Optional[Template]:
     """ Lookup a template by GUID """
     try:
-        response = request(apiurl.ep_device, f'/device-template/{guid}')
+        response = request(apiurl.ep_device, f'/device-template/{guid}', hedge=True)
         return response.data.get_one(dc=Template)
     except NotFoundResponseError:
         return None
@@ -100,6 +134,29 @@ def create(
         raise UsageError(f'Could not open file {template_json_path}')
 
 
+def _prepare_template_json(
+        template_json_string: str,
+        new_template_code: Optional[str] = None,
+        new_template_name: Optional[str] = None
+) -> str:
+    """ Applies the new code and name to the template json and returns the json string that should be uploaded """
+    try:
+        template_obj = apirequest.json_loads(template_json_string)
+    except ValueError as ex:
+        raise UsageError(ex)
+
+    if new_template_code is not None:
+        _validate_template_code(new_template_code)
+        template_obj["code"] = new_template_code
+    if new_template_name is not None:
+        template_obj["name"] = new_template_name
+
+    # compact json, encoded with the JSON backend selected in apirequest
+    new_template_str = apirequest.json_dumps(template_obj).decode('utf-8')
+    # try fix the template delete issue with some invalid xml when deleting by forcing windows newlines
+    return new_template_str.replace('\r\n', '\n').replace('\n', '\r\n')
+
+
 def create_from_json_str(
         template_json_string: str,
         new_template_code: Optional[str] = None,
@@ -117,23 +174,11 @@ def create_from_json_str(
     :return: TemplateCreateResult with newId populated with guid of the newly created template
     """
 
-    try:
-        template_obj = json.loads(template_json_string)
-    except json.JSONDecodeError as ex:
-        raise UsageError(ex)
-
-    if new_template_code is not None:
-        _validate_template_code(new_template_code)
-        template_obj["code"] = new_template_code
-    if new_template_name is not None:
-        template_obj["name"] = new_template_name
+    new_template_str = _prepare_template_json(template_json_string, new_template_code, new_template_name)
 
     # now back to converting it into a file for the upload
     with io.StringIO() as string_file:
-        # separators = compress the json
-        new_template_str = json.dumps(template_obj, separators=(',', ':'))
-        # try fix the template delete issue with some invalid xml when deleting by forcing windows newlines
-        string_file.write(new_template_str.replace('\r\n', '\n').replace('\n', '\r\n'))
+        string_file.write(new_template_str)
         string_file.seek(0)  # reset the file pointer after writing
         f = {"file": string_file}
         response = request(apiurl.ep_device, '/device-template/quick', files=f)
@@ -152,8 +197,7 @@ def delete_match_guid(guid: str) -> None:
     if guid is None:
         raise UsageError('delete_match_guid: The template guid argument is missing')
 
-    response = request(apiurl.ep_device, f'/device-template/{guid}', method=HTTPMethod.DELETE)
-    response.data.get_one()  # we expect data to be empty -- 'data': [] on success
+    request(apiurl.ep_device, f'/device-template/{guid}', method=HTTPMethod.DELETE)
 
 
 def delete_match_code(code: str) -> None:
@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+"""
+This module provides the transport that sends HTTP requests for apirequest.request() and for endpoint discovery
+in apiurl.configure_using_discovery().
+
+The default transport sends requests with the pooled sessions of the sessionpool module.
+It can be replaced with set_transport(), for example with the in-process fake backend of the fakebackend module
+in order to run or load-test the API without network access.
+"""
+
+import threading
+from typing import Optional
+
+import requests
+
+from . import sessionpool
+
+
+class Transport:
+    """
+    Base class for transports.
+
+    A transport sends a single HTTP request and returns a requests.Response, or raises a requests.exceptions.RequestException
+    (like requests.exceptions.Timeout) if the request could not be completed.
+    Transports must be thread-safe.
+    """
+
+    def send(
+            self,
+            method: str,
+            url: str,
+            params: Optional[dict] = None,
+            data: Optional[dict] = None,
+            json: Optional[dict] = None,
+            headers: Optional[dict[str, str]] = None,
+            files=None,
+            timeout: Optional[tuple[float, float]] = None,
+            stream: bool = False
+    ) -> requests.Response:
+        """
+        :param method: HTTP method, like "GET".
+        :param url: Full request URL.
+        :param params: Query parameters.
+        :param data: Form data.
+        :param json: JSON body.
+        :param headers: Request headers.
+        :param files: Files for a multipart upload, in the same format as accepted by requests.
+        :param timeout: (connect, read) timeouts in seconds.
+        :param stream: If True, the payload may be read incrementally with iter_content() and the response must be closed.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """ Release resources held by this transport. The transport can still be used afterward. """
+        pass
+
+
+class RequestsTransport(Transport):
+    """ Sends requests with pooled keep-alive sessions from a sessionpool.SessionPool """
+
+    def __init__(self, pool: Optional[sessionpool.SessionPool] = None):
+        """ :param pool: The session pool to use. If not provided, the default pool of the sessionpool module is used. """
+        self.pool = pool
+
+    def send(self, method, url, params=None, data=None, json=None, headers=None, files=None, timeout=None, stream=False) -> requests.Response:
+        s = self.pool.get(url) if self.pool is not None else sessionpool.get_session(url)
+        return s.request(method, url, params=params, data=data, json=json, headers=headers, files=files, timeout=timeout, stream=stream)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+        else:
+            sessionpool.close()
+
+
+_lock = threading.Lock()
+_transport: Transport = RequestsTransport()
+
+
+def get_transport() -> Transport:
+    return _transport
+
+
+def set_transport(transport: Optional[Transport]) -> Transport:
+    """
+    Replace the transport used by all subsequent API calls.
+
+    :param transport: The new transport. None restores the default transport that uses the sessionpool module.
+    :return: The previous transport, so that it can be restored later.
+    """
+    global _transport
+    with _lock:
+        previous = _transport
+        _transport = transport if transport is not None else RequestsTransport()
+        return previous
@@ -5,9 +5,9 @@
 import os
 from dataclasses import dataclass, field
 from http import HTTPMethod
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterator
 
-from . import apiurl, credentials, util, entity
+from . import apiurl, apirequest, credentials, util, entity, decoder, table, paging, queryplan
 from .apirequest import request, Headers
 from .error import UsageError, NotFoundResponseError
 
@@ -17,13 +17,13 @@ TYPE_DRAFT = "Draft"
 TYPE_BOTH = "both"  # either released or draft firmware
 
 
-@dataclass
+@dataclass(slots=True)
 class Url:
     name: str  # file name associated with this URL (original file name during upload)
     url: str  # file name associated with this URL (original file name during upload)
 
 
-@dataclass
+@dataclass(slots=True)
 class Upgrade:
     guid: str
     software: str  # software version
@@ -59,19 +59,18 @@ class Upgrade:
 
     def __post_init__(self):
         if self.urls is not None:
-            # noinspection PyTypeChecker
-            # - complains about item, Url
-            self.urls = [Url(**util.normalize_keys(util.filter_dict_to_dataclass_fields(item, Url))) for item in self.urls]
+            decode = decoder.get_decoder(Url)
+            self.urls = [decode(item) if isinstance(item, dict) else item for item in self.urls]
         else:
             self.urls = []
 
 
-@dataclass
+@dataclass(slots=True)
 class UpgradeCreateResult:
     newId: str
 
 
-@dataclass
+@dataclass(slots=True)
 class UploadResult:
     guid: str
 
@@ -85,9 +84,55 @@ def _validate_version(version: str, what: str):
         raise UsageError(f'"{what}" parameter must contain only alphanumeric characters or periods')
 
 
+class UpgradeTable(table.Table):
+    """ Columnar table of upgrades. See the table module. """
+    model = Upgrade
+    lists = ('urls',)
+
+    def drafts(self) -> table.Mask:
+        return self.equals('isDraft', TYPE_DRAFT)
+
+    def released(self) -> table.Mask:
+        return self.equals('isDraft', TYPE_RELEASED)
+
+    def count_by_firmware(self, mask: Optional[table.Mask] = None) -> dict[str, int]:
+        """ Returns the number of upgrades for each firmware GUID, optionally only for the upgrades selected by the mask """
+        return self.count_by('firmwareguid', mask)
+
+
+# Fields of the upgrades that query() filters by on the server. See the queryplan module.
+FILTER_PARAMS = {
+    'firmwareguid': 'firmwareGuid',
+    'isDraft': 'type',
+}
+
+
 def query(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> list[Upgrade]:
-    response = request(apiurl.ep_firmware, '/firmware-upgrade')
-    return response.data.get(query_str=query_str, params=params, dc=Upgrade)
+    response = request(apiurl.ep_firmware, '/firmware-upgrade', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return response.data.get(query_str, dc=Upgrade, params=params)
+
+
+def stream() -> Iterator[Upgrade]:
+    """
+    Same as query() without a query, but yields the upgrades one at a time while the listing is received and parsed,
+    so that memory use does not depend on the number of upgrades. Stop the iteration early to close the connection.
+    """
+    decode = decoder.get_decoder(Upgrade)
+    return (decode(item) for item in apirequest.stream(apiurl.ep_firmware, '/firmware-upgrade') if item is not None)
+
+
+def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> Iterator[Upgrade]:
+    """
+    Yields all upgrades, requesting them page_size at a time. While the upgrades of a page are processed,
+    the next page is requested in the background. See the paging module.
+    """
+    return paging.iter_items(apiurl.ep_firmware, '/firmware-upgrade', Upgrade, page_size, prefetch=prefetch)
+
+
+def query_table(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> UpgradeTable:
+    """ Same as query(), but returns the upgrades as an UpgradeTable """
+    response = request(apiurl.ep_firmware, '/firmware-upgrade', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return UpgradeTable.from_items(response.data.get(query_str, params=params))
 
 
 def get_by_guid(guid: str) -> Optional[Upgrade]:
@@ -101,6 +146,21 @@ def get_by_guid(guid: str) -> Optional[Upgrade]:
         return None
 
 
+def _create_data(firmware_guid: str, sw_version: Optional[str], description: Optional[str]) -> dict:
+    if sw_version is None:
+        sw_version = util.generate_unique_timestamp_string()
+
+    _validate_version('sw_version', sw_version)
+
+    data = {
+        "firmwareGuid": firmware_guid,
+        "software": sw_version
+    }
+    if description is not None:
+        data["description"] = description
+    return data
+
+
 def create(
         firmware_guid: str,
         sw_version: Optional[str] = None,
@@ -117,18 +177,7 @@ def create(
     :return: GUID of the newly created upgrade.
     """
 
-    if sw_version is None:
-        sw_version = util.generate_unique_timestamp_string()
-
-    _validate_version('sw_version', sw_version)
-
-    data = {
-        "firmwareGuid": firmware_guid,
-        "software": sw_version
-    }
-    if description is not None:
-        data["description"] = description
-
+    data = _create_data(firmware_guid, sw_version, description)
     response = request(apiurl.ep_firmware, '/firmware-upgrade', json=data)
     return response.data.get_one(dc=UpgradeCreateResult)
 
@@ -177,5 +226,4 @@ def delete_match_guid(guid: str) -> None:
     """
     if guid is None:
         raise UsageError('delete_match_guid: The template guid argument is missing')
-    response = request(apiurl.ep_firmware, f'/firmware-upgrade/{guid}', method=HTTPMethod.DELETE)
-    response.data.get_one()  # we expect data to be empty -- 'data': [] on success
+    request(apiurl.ep_firmware, f'/firmware-upgrade/{guid}', method=HTTPMethod.DELETE)
@@ -4,23 +4,37 @@
 
 from dataclasses import dataclass
 from http import HTTPStatus
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator
 
-from . import apiurl, accesstoken
+from . import apiurl, accesstoken, paging, queryplan
 from .apirequest import request
 from .error import UsageError, ConflictResponseError, NotFoundResponseError
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     userGuid: str
     userId: str
     companyCpid: str # It is recommended to use the token module to decode the access token to get this info
 
 
+# Fields of the users that query() filters by on the server. See the queryplan module.
+FILTER_PARAMS = {
+    'userId': 'userId',
+}
+
+
 def query(query_str: str = '[*]', params: Optional[Dict[str, any]] = None) -> list[User]:
-    response = request(apiurl.ep_firmware, '/User')
-    return response.data.get(query_str=query_str, params=params, dc=User)
+    response = request(apiurl.ep_user, '/User', params=queryplan.server_params(query_str, params, FILTER_PARAMS))
+    return response.data.get(query_str, dc=User, params=params)
+
+
+def iter_all(page_size: int = paging.DEFAULT_PAGE_SIZE, prefetch: bool = True) -> Iterator[User]:
+    """
+    Yields all users, requesting them page_size at a time. While the users of a page are processed,
+    the next page is requested in the background. See the paging module.
+    """
+    return paging.iter_items(apiurl.ep_user, '/User', User, page_size, prefetch=prefetch)
 
 
 def get_own_user() -> Optional[User]:
@@ -37,12 +51,12 @@ def get_by_email(email: str) -> Optional[User]:
         raise UsageError('get_by_email: The email parameter is missing')
     try:
         response = request(apiurl.ep_user, f'/User/{email}/availability', codes_ok=[HTTPStatus.NO_CONTENT])
-        u = response.data.get_one(dc=User)
+        u = response.data.get_one()
         if u is None:
             return None
         # we have to re-fetch because the availability result is missing the CPID!
         # also availability returns a different model, so convert u.guid to u.userGuid
-        response = request(apiurl.ep_user, f'/User/{u.guid}', codes_ok=[HTTPStatus.NO_CONTENT])
+        response = request(apiurl.ep_user, f'/User/{u.get("guid")}', codes_ok=[HTTPStatus.NO_CONTENT])
         return response.data.get_one(dc=User)
     except ConflictResponseError:
         return None
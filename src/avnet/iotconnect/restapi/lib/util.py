@@ -6,10 +6,11 @@ import hashlib
 # For more information about ChatGPT, visit https://openai.com/
 
 from dataclasses import Field, fields
-from dataclasses import is_dataclass
 from datetime import datetime, timezone
 from typing import TypeVar, Protocol, ClassVar, Any, Type
-from typing import Union, get_type_hints
+from typing import Union
+
+from . import decoder
 
 
 # Credit: "intgr" at stackoverflow example https://stackoverflow.com/questions/61736151/how-to-make-a-typevar-generic-type-in-python-with-dataclass-constraint
@@ -41,44 +42,9 @@ def file_md5(filename: str):
             file_hash.update(chunk)
         return file_hash.hexdigest()
 
-def _is_optional_or_dataclass(field_type, value):
-    """
-    Check if a field type is either an Optional or a dataclass.
-    """
-    if hasattr(field_type, '__origin__') and field_type.__origin__ is Union:
-        # Check for Optional[Type]
-        inner_types = field_type.__args__
-        if len(inner_types) == 2 and type(None) in inner_types:
-            inner_type = [t for t in inner_types if t is not type(None)][0]
-            return is_dataclass(inner_type)
-    return is_dataclass(field_type)
-
 def deserialize_dataclass(cls: Type[T], data: Union[dict, list]) -> T:
     """
     Recursively deserialize data into a dataclass or a list of dataclasses.
+    The conversion function for each class is built once and cached by the decoder module.
     """
-    if isinstance(data, list):
-        # Handle lists of dataclasses
-        inner_type = cls.__args__[0] if hasattr(cls, '__args__') else None
-        if inner_type and is_dataclass(inner_type):
-            return [deserialize_dataclass(inner_type, item) for item in data]
-        return data
-
-    if isinstance(data, dict) and is_dataclass(cls):
-        field_types = get_type_hints(cls)
-        return cls(
-            **{
-                key: deserialize_dataclass(field_types[key], value)
-                if key in field_types and _is_optional_or_dataclass(field_types[key], value)
-                else (
-                    deserialize_dataclass(field_types[key], value)
-                    if key in field_types
-                       and hasattr(field_types[key], '__origin__')
-                       and field_types[key].__origin__ == list
-                    else value
-                )
-                for key, value in data.items()
-                if key in field_types  # Ignore unexpected fields
-            }
-        )
-    return data
\ No newline at end of file
+    return decoder.deserialize(cls, data)
@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+# This test runs the asyncio API against the in-process fake backend and does not require an account or network access.
+
+import asyncio
+from http import HTTPStatus
+
+import httpx
+
+from avnet.iotconnect.restapi.lib import fakebackend, transport, apiurl, concurrency, httpcache, deadline, config, credentials
+from avnet.iotconnect.restapi.lib.aio import apirequest, entity, template, device, command, user
+from avnet.iotconnect.restapi.lib.error import DeadlineExceededError
+
+TEMPLATE_CODE = 'apidemo2'
+DUID = 'apidemodev02'
+
+backend = fakebackend.install(fakebackend.FakeBackend(seed=2))
+
+
+def forward(request: httpx.Request) -> httpx.Response:
+    """ httpx.MockTransport handler that serves the requests of the httpx client from the fake backend """
+    r = backend.send(
+        request.method, str(request.url.copy_with(query=None)), params=dict(request.url.params),
+        data=request.content or None, headers=dict(request.headers)
+    )
+    return httpx.Response(r.status_code, headers=r.headers, content=r.content)
+
+
+async def main():
+    # the fake backend is a custom transport, which is called in a worker thread
+    assert await entity.get_root_entity() is not None and await user.get_own_user() is not None
+    t = await template.create('sample-device-template.json', new_template_code=TEMPLATE_CODE, new_template_name="AioExample")
+    _, cert_pem = config.generate_ec_cert_and_pkey(DUID)
+    d = await device.create(template_guid=t.deviceTemplateGuid, duid=DUID, device_certificate=cert_pem)
+    assert (await device.get_by_duid(DUID)).guid == d.newid and len(await device.query()) == 1
+
+    # identical lookups of concurrent tasks share one request, and each decodes its own copy of the payload
+    backend.latency = 0.05
+    lookups = backend.counts['GET /Entity/lookup']
+    results = await asyncio.gather(*(apirequest.request(apiurl.ep_user, '/Entity/lookup') for _ in range(5)))
+    backend.latency = 0.0
+    assert backend.counts['GET /Entity/lookup'] == lookups + 1 and len({id(r.data.value) for r in results}) == 5
+
+    # the response cache of the client is used
+    httpcache.set_ttl('/Entity/lookup', 60)
+    lookups = backend.counts['GET /Entity/lookup']
+    assert await entity.get_root_entity() == await entity.get_root_entity()
+    assert backend.counts['GET /Entity/lookup'] == lookups + 1
+    httpcache.set_ttl('/Entity/lookup', None)
+    httpcache.clear()
+
+    # requests rejected because the token expired are replayed with a refreshed token
+    backend.expire_access_tokens()
+    config.token_time -= credentials.REAUTH_MIN_AGE
+    refreshes = backend.counts['POST /Auth/refresh-token']
+    assert await entity.get_root_entity() is not None and backend.counts['POST /Auth/refresh-token'] == refreshes + 1
+
+    # tasks wait for a concurrency slot without blocking the event loop, and give up when the deadline is exceeded
+    concurrency.configure(apiurl.ep_user, initial_window=1, max_window=1)
+    window = concurrency.get_controller().get_limit(apiurl.ep_user)
+    start = window.acquire()  # occupy the only slot
+    try:
+        with deadline.budget(0.1):
+            await entity.get_root_entity()
+        raise AssertionError("Expected DeadlineExceededError")
+    except DeadlineExceededError:
+        pass
+    waiting = asyncio.create_task(entity.get_root_entity())
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+    window.release(start, HTTPStatus.OK)
+    assert await waiting is not None
+    concurrency.configure(apiurl.ep_user)
+
+    # with the default transport, requests are sent with the httpx client of the event loop
+    transport.set_transport(None)
+    apirequest._clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(forward))
+    assert (await device.get_by_guid(d.newid)).guid == d.newid
+    cmd = await command.get_with_name(t.deviceTemplateGuid, 'sample_command')
+    await command.send(cmd.guid, d.newid, "argument1 argument2")
+    assert len(backend.sent_commands) == 1
+    await apirequest.aclose()
+    transport.set_transport(backend)
+
+    await device.delete_match_duid(DUID)
+    await template.delete_match_code(TEMPLATE_CODE)
+    assert await device.query() == []
+
+
+asyncio.run(main())
+print('requests=', sum(backend.counts.values()), dict(backend.status_counts))
+fakebackend.uninstall()
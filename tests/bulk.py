@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+# This test does not require an account or network access.
+
+import contextvars
+import threading
+import time
+
+from avnet.iotconnect.restapi.lib import bulk, deadline
+
+executor = bulk.BulkExecutor(max_workers=4, max_queued=4)
+
+
+def sleep_and_return(value, seconds):
+    time.sleep(seconds)
+    return value
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+# results are returned in input order, even though later operations complete first, and errors are captured
+results = executor.run([bulk.op(sleep_and_return, i, 0.05 * (4 - i)) for i in range(4)] + [bulk.op(fail, 'failed')])
+assert [r.index for r in results] == [0, 1, 2, 3, 4] and [r.value for r in results[:4]] == [0, 1, 2, 3]
+assert not results[4].ok() and isinstance(results[4].error, ValueError)
+try:
+    results[4].get()
+    raise AssertionError("Expected ValueError")
+except ValueError:
+    pass
+
+# as_completed() yields the results in the order in which the operations complete
+completed = [r.index for r in executor.as_completed(bulk.op(sleep_and_return, i, 0.05 * (4 - i)) for i in range(4))]
+assert completed == [3, 2, 1, 0]
+assert sorted(r.index for r in executor.run((bulk.op(sleep_and_return, i, 0) for i in range(10)), ordered=False)) == list(range(10))
+
+# the operations are consumed lazily: no more than max_queued operations are pending at any time
+release = threading.Event()
+pulled = []
+
+
+def operations(count):
+    for i in range(count):
+        pulled.append(i)
+        yield bulk.op(release.wait)
+
+
+results = []
+consumer = threading.Thread(target=lambda: results.extend(executor.run(operations(20))))
+consumer.start()
+time.sleep(0.1)
+assert len(pulled) == executor.max_queued
+release.set()
+consumer.join()
+assert len(results) == 20 and len(pulled) == 20
+
+# operations that have not started are not run when the caller stops early
+started = []
+
+
+def record(i):
+    started.append(i)
+    time.sleep(0.05)
+    return i
+
+
+for r in executor.as_completed(bulk.op(record, i) for i in range(100)):
+    break
+time.sleep(0.2)
+assert len(started) <= executor.max_queued
+
+# operations run in a copy of the caller's context, so that context variables like deadlines carry over
+tenant = contextvars.ContextVar('tenant', default=None)
+tenant.set('tenant1')
+with deadline.budget(10):
+    results = executor.run(bulk.op(lambda: (tenant.get(), deadline.remaining())) for _ in range(8))
+assert all(r.value[0] == 'tenant1' and 0 < r.value[1] <= 10 for r in results)
+assert executor.run([bulk.op(deadline.remaining)])[0].value is None
+
+executor.shutdown()
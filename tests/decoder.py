@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+# This test does not require an account or network access.
+
+import traceback
+from dataclasses import dataclass, field
+from typing import Optional
+
+from avnet.iotconnect.restapi.lib import decoder
+
+constructed = []
+
+
+@dataclass
+class Checked:
+    name: str
+    settings: dict
+    level: int = 0
+
+    def __post_init__(self):
+        constructed.append(self.name)
+        self.mode = self.settings['mode']  # KeyError if the settings lack a mode
+
+
+@dataclass
+class Outer:
+    guid: str
+    inner: Checked
+    tags: list = field(default_factory=list)
+    note: Optional[str] = None
+
+
+# decoders keep the matching keys and use defaults for the missing ones
+assert decoder.get_decoder(Checked)({'name': 'a', 'settings': {'mode': 1}, 'other': 2}) == Checked('a', {'mode': 1})
+outer = decoder.deserialize(Outer, {'guid': 'g', 'inner': {'name': 'b', 'settings': {'mode': 2}}})
+assert outer.inner.mode == 2 and outer.tags == [] and outer.note is None
+
+# a missing required field is reported by the constructor, as it would be without the decoder
+try:
+    decoder.get_decoder(Checked)({'settings': {'mode': 1}})
+    raise AssertionError("Expected TypeError")
+except TypeError as ex:
+    assert 'name' in str(ex)
+
+# a KeyError raised by the constructor is not taken for a missing field. The constructor runs once and the error is kept.
+for decode, item in (
+        (decoder.get_decoder(Checked), {'name': 'c', 'settings': {}}),
+        (decoder.get_deserializer(Outer), {'guid': 'g', 'inner': {'name': 'c', 'settings': {}}}),
+):
+    constructed.clear()
+    try:
+        decode(item)
+        raise AssertionError("Expected KeyError")
+    except KeyError as ex:
+        assert ex.args == ('mode',) and constructed == ['c']
+        assert '__post_init__' in ''.join(traceback.format_tb(ex.__traceback__))
@@ -0,0 +1,246 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+# This test runs against the in-process fake backend and does not require an account or network access.
+
+import configparser
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from avnet.iotconnect.restapi.lib import fakebackend, template, device, entity, user, firmware, upgrade, ota, command, storage, config, deadline, credentials, client, apiurl, circuitbreaker, concurrency, httpcache, apirequest
+from avnet.iotconnect.restapi.lib.apirequest import request
+from avnet.iotconnect.restapi.lib.error import InvalidActionError, ResponseError, DeadlineExceededError, AuthError
+
+TEMPLATE_CODE = 'apidemo1'
+FIRMWARE_NAME = 'APIDEMO1FW'
+DUID = 'apidemodev01'
+
+backend = fakebackend.install(fakebackend.FakeBackend(seed=1))
+
+print('root entity=', entity.get_root_entity())
+print('own user=', user.get_own_user())
+assert user.get_by_email('user@example.com') is not None
+
+t = template.create('sample-device-template.json', new_template_code=TEMPLATE_CODE, new_template_name="ApiExample")
+print('template create=', t)
+assert template.get_by_template_code(TEMPLATE_CODE).guid == t.deviceTemplateGuid
+
+pkey_pem, cert_pem = config.generate_ec_cert_and_pkey(DUID)
+d = device.create(template_guid=t.deviceTemplateGuid, duid=DUID, device_certificate=cert_pem)
+print('device create=', d)
+assert device.get_by_duid(DUID).guid == d.newid
+devices = device.query_table()
+assert devices.count_by_template() == {t.deviceTemplateGuid: 1}
+assert devices.to_objects() == device.query() == list(device.stream()) == list(device.iter_all(page_size=1))
+# servers that ignore the paging parameters, without reporting the total count, do not cause an endless iteration
+for backend.paging in (fakebackend.PAGING_SIZE_ONLY, fakebackend.PAGING_IGNORED):
+    assert list(device.iter_all(page_size=1)) == devices.to_objects()
+backend.paging = fakebackend.PAGING_FULL
+# simple filters are sent to the server, the rest of the expression is evaluated on the returned devices
+assert device.query("[?deviceTemplateGuid==param('t') && uniqueId==param('duid')]", params={'t': t.deviceTemplateGuid, 'duid': DUID})[0].guid == d.newid
+assert device.query_table("[?uniqueId=='nonexistent' || uniqueId==param('duid')]", params={'duid': DUID}).to_objects() == devices.to_objects()
+assert device.query("[?uniqueId=='nonexistent']") == []
+
+cmd = command.get_with_name(t.deviceTemplateGuid, 'sample_command')
+command.send(cmd.guid, d.newid, "argument1 argument2")
+assert len(backend.sent_commands) == 1
+
+fw = firmware.create(template_guid=t.deviceTemplateGuid, name=FIRMWARE_NAME, hw_version="1.0", initial_sw_version="v1.0")
+upgrade.upload(fw.firmwareUpgradeGuid, 'test.zip', file_name="filename-changed.zip")
+upgrade.publish(fw.firmwareUpgradeGuid)
+ota.push_to_device(fw.firmwareUpgradeGuid, [d.newid])
+ota.push_to_entity(fw.firmwareUpgradeGuid)
+final_fw = firmware.get_by_guid(fw.newId)
+print('firmware=', final_fw)
+assert final_fw.release_count() == 1 and final_fw.Upgrades[0].urls[0].name == "filename-changed.zip"
+assert len(backend.ota_updates) == 2
+assert list(firmware.stream()) == firmware.query() and list(upgrade.stream()) == upgrade.query()
+assert firmware.query(f"[?name=='{FIRMWARE_NAME}']")[0].guid == fw.newId and firmware.query("[?name=='nonexistent']") == []
+assert len(upgrade.query("[?isDraft=='Released']")) == 1
+
+f = storage.create(storage.FILE_MODULE_CUSTOM, d.newid, 'test.zip')
+assert len(storage.get_files(storage.FILE_MODULE_CUSTOM, d.newid)) == 1
+storage.delete_match_guid(storage.FILE_MODULE_CUSTOM, f['guid'])
+
+# throttled requests are retried transparently
+backend.retry_after = 0.1
+backend.fail_next(2, HTTPStatus.TOO_MANY_REQUESTS)
+assert device.get_by_guid(d.newid) is not None
+
+# injected server errors are reported
+backend.fail_next(1, HTTPStatus.INTERNAL_SERVER_ERROR)
+try:
+    entity.get_root_entity()
+    raise AssertionError("Expected ResponseError")
+except ResponseError as ex:
+    print("Injected error:", ex.message)
+
+# the token is renewed in the background before it needs to be refreshed, without delaying API calls
+token = config.access_token
+credentials.stop_refresher()
+config.token_time = time.time() - credentials.REFRESH_INTERVAL + 60  # a minute before check() would refresh it
+credentials.start_refresher()  # renews the token right away
+for _ in range(50):
+    if config.access_token != token:
+        break
+    time.sleep(0.05)
+credentials.stop_refresher()
+assert config.access_token != token and entity.get_root_entity() is not None
+
+# the background refresher backs off while the server rejects the refresh token
+retry_interval, credentials.REFRESH_RETRY_INTERVAL = credentials.REFRESH_RETRY_INTERVAL, 0.02
+backend.revoke_tokens()
+credentials.stop_refresher()
+config.token_time = time.time() - credentials.REFRESH_INTERVAL + 60
+refreshes = backend.counts['POST /Auth/refresh-token']
+credentials.start_refresher()
+time.sleep(0.5)
+credentials.stop_refresher()
+credentials.REFRESH_RETRY_INTERVAL = retry_interval
+assert 2 <= backend.counts['POST /Auth/refresh-token'] - refreshes <= 6  # would be about 25 without backing off
+config.access_token, config.refresh_token = backend.issue_token()
+config.token_time = time.time()
+
+# requests rejected because the token expired during a run share one refresh and are replayed
+backend.expire_access_tokens()
+config.token_time -= credentials.REAUTH_MIN_AGE
+refreshes, rejected = backend.counts['POST /Auth/refresh-token'], backend.status_counts[HTTPStatus.UNAUTHORIZED]
+backend.latency = 0.05  # so that the requests are in flight at the same time
+with ThreadPoolExecutor(max_workers=3) as pool:
+    results = [pool.submit(device.get_by_duid, DUID), pool.submit(device.get_by_guid, d.newid), pool.submit(entity.get_root_entity)]
+    assert all(r.result() is not None for r in results)
+backend.latency = 0.0
+assert backend.status_counts[HTTPStatus.UNAUTHORIZED] == rejected + 3 and backend.counts['POST /Auth/refresh-token'] == refreshes + 1
+
+# a permission error is reported without refreshing the token. Only a 403 that blames the token is replayed.
+config.token_time -= credentials.REAUTH_MIN_AGE
+refreshes = backend.counts['POST /Auth/refresh-token']
+backend.fail_next(1, HTTPStatus.FORBIDDEN)
+try:
+    entity.get_root_entity()
+    raise AssertionError("Expected AuthError")
+except AuthError:
+    pass
+assert backend.counts['POST /Auth/refresh-token'] == refreshes
+assert apirequest._is_auth_failure(apirequest.Response(httpcache.StoredResponse(HTTPStatus.FORBIDDEN, {}, b'{"message": "Token has expired"}')))
+
+# a token refreshed by another process and stored in the configuration file is used instead of refreshing again
+backend.expire_access_tokens()
+config.token_time -= credentials.REAUTH_MIN_AGE
+other = configparser.ConfigParser()
+other.read(config._app_config_file)
+other[config.SECTION_USER]['access_token'], other[config.SECTION_USER]['refresh_token'] = backend.issue_token()
+with open(config._app_config_file + '.other', 'w') as fp:
+    other.write(fp)
+os.replace(config._app_config_file + '.other', config._app_config_file)
+refreshes = backend.counts['POST /Auth/refresh-token']
+assert entity.get_root_entity() is not None and backend.counts['POST /Auth/refresh-token'] == refreshes
+assert config.access_token == other[config.SECTION_USER]['access_token']
+
+# storing refreshed tokens keeps the sections written by other processes
+other = configparser.ConfigParser()
+other.read(config._app_config_file)
+other['other'] = {'setting': 'kept'}
+with open(config._app_config_file + '.other', 'w') as fp:
+    other.write(fp)
+os.replace(config._app_config_file + '.other', config._app_config_file)
+credentials.refresh()
+other = configparser.ConfigParser()
+other.read(config._app_config_file)
+assert other['other']['setting'] == 'kept' and other[config.SECTION_USER]['access_token'] == config.access_token
+
+# slow responses do not exceed the deadline
+backend.latency = 0.5
+try:
+    with deadline.budget(0.2):
+        entity.get_root_entity()
+    raise AssertionError("Expected DeadlineExceededError")
+except DeadlineExceededError as ex:
+    print("Deadline:", ex.message)
+
+# a caller without a deadline that shares a request in flight is not failed by the deadline of the caller that sent it
+with ThreadPoolExecutor(max_workers=2) as pool:
+    def lookup_with_budget():
+        with deadline.budget(0.2):
+            return entity.get_root_entity()
+    leader = pool.submit(lookup_with_budget)
+    time.sleep(0.05)
+    follower = pool.submit(entity.get_root_entity)
+    assert follower.result() is not None
+    try:
+        leader.result()
+        raise AssertionError("Expected DeadlineExceededError")
+    except DeadlineExceededError:
+        pass
+backend.latency = 0.0
+
+# a request that runs out of time waiting for a concurrency slot does not keep the half-open circuit from closing
+circuitbreaker.configure(apiurl.ep_user, failure_threshold=1, reset_timeout=0.1)
+concurrency.configure(apiurl.ep_user, initial_window=1, max_window=1)
+backend.fail_next(1, HTTPStatus.INTERNAL_SERVER_ERROR)
+try:
+    entity.get_root_entity()
+    raise AssertionError("Expected ResponseError")
+except ResponseError:
+    pass
+time.sleep(0.15)
+assert circuitbreaker.get_state(apiurl.ep_user) == circuitbreaker.STATE_HALF_OPEN
+window = concurrency.get_controller().get_limit(apiurl.ep_user)
+start = window.acquire()  # occupy the only slot
+try:
+    with deadline.budget(0.1):
+        entity.get_root_entity()
+    raise AssertionError("Expected DeadlineExceededError")
+except DeadlineExceededError:
+    pass
+window.release(start, HTTPStatus.OK)
+assert entity.get_root_entity() is not None and circuitbreaker.get_state(apiurl.ep_user) == circuitbreaker.STATE_CLOSED
+circuitbreaker.configure(apiurl.ep_user)
+concurrency.configure(apiurl.ep_user)
+
+# cached responses are decoded separately for each caller and are kept when the token is refreshed
+httpcache.set_ttl('/Entity/lookup', 60)
+lookups = backend.counts['GET /Entity/lookup']
+first, second = request(apiurl.ep_user, '/Entity/lookup'), request(apiurl.ep_user, '/Entity/lookup')
+assert first is not second and first.data.value == second.data.value and first.data.value is not second.data.value
+credentials.refresh()
+assert request(apiurl.ep_user, '/Entity/lookup').data.value == first.data.value
+assert backend.counts['GET /Entity/lookup'] == lookups + 1 and httpcache.get_cache().stats()['bytes'] > len(first.content)
+httpcache.set_ttl('/Entity/lookup', None)
+httpcache.clear()
+
+# a client of another solution has its own endpoints, tokens and connections, and does not affect the default client
+backend2 = fakebackend.FakeBackend(skey='tenant2', cpid='TENANT2')
+access_token, refresh_token = backend2.issue_token()
+tenant = client.Client(
+    skey=backend2.skey, transport=backend2, access_token=access_token, refresh_token=refresh_token,
+    token_time=time.time(), token_expiry=time.time() + 3600
+)
+with tenant.use():
+    assert device.query() == [] and user.get_own_user() is not None
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert len(pool.submit(device.query).result()) == 1  # other threads use the default client
+assert backend2.counts['GET /Device'] == 1 and len(device.query()) == 1
+assert config.access_token != access_token and client.current() is client.default
+# assigning a module-level endpoint sets the endpoint of the default client only
+ep_device, apiurl.ep_device = apiurl.ep_device, 'https://elsewhere.test/device/api/v2'
+with tenant.use():
+    assert apiurl.ep_device == tenant.endpoints.ep_device
+assert apiurl.default_endpoints.ep_device == 'https://elsewhere.test/device/api/v2'
+apiurl.ep_device = ep_device
+tenant.close()
+
+device.delete_match_duid(DUID)
+try:
+    template.delete_match_code(TEMPLATE_CODE)
+    raise AssertionError("Expected InvalidActionError")
+except InvalidActionError:
+    print("Template with firmware was not deleted, as expected.")
+firmware.deprecate_match_name(FIRMWARE_NAME)
+template.delete_match_code(TEMPLATE_CODE)
+
+print('requests=', sum(backend.counts.values()), dict(backend.status_counts))
+fakebackend.uninstall()
@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+# This test does not require an account or network access.
+
+import asyncio
+import time
+
+from avnet.iotconnect.restapi.lib import hedging, apiurl
+
+ENDPOINT = 'https://hedging.test/api/v2'
+HEDGE_DELAY = 0.02
+SLOW = 0.1
+
+
+class FixedDelayTracker(hedging.LatencyTracker):
+    def hedge_delay(self):
+        return HEDGE_DELAY
+
+
+def lookup(slow: bool):
+    """ Returns a call whose first attempt is slow if requested, and whose later attempts are fast """
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if slow and len(attempts) == 1:
+            time.sleep(SLOW)
+            return 'primary'
+        return 'hedge' if len(attempts) > 1 else 'primary'
+    return fn, attempts
+
+
+hedging.enabled = True
+hedging._trackers[apiurl.endpoint_key(ENDPOINT)] = FixedDelayTracker()
+
+# the slow first attempt is hedged, the hedge wins and the late result of the first attempt is discarded
+fn, attempts = lookup(slow=True)
+start = time.monotonic()
+assert hedging.call(ENDPOINT, fn) == 'hedge'
+assert time.monotonic() - start < SLOW and len(attempts) == 2
+
+# fast lookups are not hedged
+fn, attempts = lookup(slow=False)
+assert hedging.call(ENDPOINT, fn) == 'primary' and len(attempts) == 1
+
+# the hedge ratio is counted over all requests, so 1 in 5 slow lookups get hedges up to MAX_HEDGE_RATIO of all lookups
+hedging._trackers[apiurl.endpoint_key(ENDPOINT)] = FixedDelayTracker()
+total, hedged = 200, 0
+for i in range(total):
+    fn, attempts = lookup(slow=i % 5 == 0)
+    if hedging.call(ENDPOINT, fn) == 'hedge':
+        hedged += 1
+print('hedged=', hedged, 'of', total)
+assert 0.75 * hedging.MAX_HEDGE_RATIO * total <= hedged <= hedging.MAX_HEDGE_RATIO * total + 1
+
+
+
+# asyncio lookups are hedged the same way, with the attempts as tasks of the event loop
+async def lookup_async(slow: bool):
+    fn, attempts = lookup(slow)
+
+    async def attempt():
+        if slow and not attempts:
+            attempts.append(1)
+            await asyncio.sleep(SLOW)
+            return 'primary'
+        return fn()
+    start = time.monotonic()
+    result = await hedging.call_async(ENDPOINT, attempt)
+    return result, time.monotonic() - start, len(attempts)
+
+
+hedging._trackers[apiurl.endpoint_key(ENDPOINT)] = FixedDelayTracker()
+result, elapsed, count = asyncio.run(lookup_async(slow=True))
+assert result == 'hedge' and elapsed < SLOW and count == 2
+assert asyncio.run(lookup_async(slow=False))[::2] == ('primary', 1)
+
+hedging.enabled = False
+time.sleep(SLOW)  # let the discarded first attempts complete
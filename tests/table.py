@@ -0,0 +1,59 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 Avnet
+# Authors: Nikola Markovic <nikola.markovic@avnet.com> et al.
+
+# This test does not require an account or network access. The NumPy export is tested if numpy is installed.
+
+from avnet.iotconnect.restapi.lib import device
+
+items = [
+    {
+        "guid": f"GUID-{i}",
+        "uniqueId": f"dev{i}",
+        "displayName": f"Device {i}",
+        "isAcquired": i % 3,
+        "isActive": i % 2 == 0,
+        "isEdgeSupport": False,
+        "isParentAcquired": None,
+        "deviceTemplateGuid": f"TEMPLATE-{i % 4}",
+        "messageVersion": "2.1",
+    } for i in range(21)
+]
+devices = device.DeviceTable.from_items(items)
+assert len(devices) == 21 and [d.guid for d in devices] == [x['guid'] for x in items]
+
+# isAcquired is a number, which is kept as is
+assert [d.isAcquired for d in devices] == [i % 3 for i in range(21)]
+assert devices.acquired().indices() == [i for i in range(21) if i % 3]
+assert devices.count_by('isAcquired') == {0: 7, 1: 7, 2: 7}
+
+active = devices.active()
+assert active.count() == 11 and devices.flag('isParentAcquired').count() == 0
+subset = devices.filter(active & devices.equals('deviceTemplateGuid', 'TEMPLATE-0'))
+assert [d.uniqueId for d in subset] == ['dev0', 'dev4', 'dev8', 'dev12', 'dev16', 'dev20']
+assert devices.count_by_template(~active) == {'TEMPLATE-1': 5, 'TEMPLATE-3': 5}
+
+# items that are not JSON objects, like the values of a projection, are reported
+for projected in (["GUID-0", "GUID-1"], [items[0], None]):
+    try:
+        device.DeviceTable.from_items(projected)
+        raise AssertionError("Expected ValueError")
+    except ValueError as ex:
+        print("Not a table:", ex)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+    print("numpy is not installed. Skipping the NumPy export.")
+
+if numpy is not None:
+    arrays = devices.to_numpy()
+    assert arrays['isActive'].dtype == bool and arrays['isActive'].tolist() == [i % 2 == 0 for i in range(21)]
+    assert numpy.packbits(arrays['isActive'], bitorder='little').tobytes() == bytes(devices['isActive'].to_numpy(packed=True))
+    column = devices['deviceTemplateGuid']
+    assert [column.values[code] for code in arrays['deviceTemplateGuid']] == [x['deviceTemplateGuid'] for x in items]
+    assert [devices['isAcquired'].values[code] for code in arrays['isAcquired']] == [i % 3 for i in range(21)]
+    assert active.to_numpy().sum() == active.count()
+    # code arrays and masks share memory with the table
+    assert not arrays['deviceTemplateGuid'].flags.owndata and not active.to_numpy().flags.owndata